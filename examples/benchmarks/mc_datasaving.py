@@ -0,0 +1,83 @@
+"""
+Benchmark of the data saving of MeasurementControl for soft sweeps with the
+Dummy_Detector_Soft.
+
+Compares a run that writes every data point to the datafile
+(data_flush_interval=0) with a run that writes in batches, a run that writes
+every data point in the background worker, and a reference
+loop that reproduces the former per-point pattern of resizing the dataset
+and reading back the old values for the soft average.
+
+Usage:
+    python mc_datasaving.py [nr_points] [soft_avg] [delay]
+
+where delay is the acquisition time per point of the detector in seconds.
+"""
+import sys
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from pycqed.measurement import measurement_control
+from pycqed.measurement.sweep_functions import None_Sweep
+import pycqed.measurement.detector_functions as det
+
+
+def resize_per_point(filename, nr_points, soft_avg):
+    """Reference: per-point resize and read-modify-write of the dataset."""
+    with h5py.File(filename, 'w') as f:
+        dset = f.create_dataset('Data', (0, 3), maxshape=(None, 3),
+                                dtype='float64')
+        for j in range(soft_avg):
+            for i in range(nr_points):
+                dset.resize((max(dset.shape[0], i + 1), 3))
+                new_data = np.array([i, np.sin(i), np.cos(i)])
+                old_vals = dset[i:i + 1, :]
+                dset[i:i + 1, :] = (new_data + old_vals * j) / (1 + j)
+
+
+def run_mc(MC, nr_points, soft_avg, data_flush_interval,
+           background_writing=False, delay=0):
+    MC.soft_avg(soft_avg)
+    MC.data_flush_interval(data_flush_interval)
+    MC.background_writing(background_writing)
+    MC.set_sweep_function(None_Sweep())
+    MC.set_sweep_points(np.arange(nr_points))
+    MC.set_detector_function(det.Dummy_Detector_Soft(delay=delay))
+    t0 = time.time()
+    MC.run('datasaving_benchmark')
+    return time.time() - t0
+
+
+def main(nr_points=20000, soft_avg=1, delay=0):
+    with tempfile.TemporaryDirectory() as datadir:
+        MC = measurement_control.MeasurementControl(
+            'MC', live_plot_enabled=False, verbose=False, datadir=datadir)
+        try:
+            t0 = time.time()
+            resize_per_point(datadir + '/reference.hdf5', nr_points,
+                             soft_avg)
+            t_reference = time.time() - t0
+            t_every_point = run_mc(MC, nr_points, soft_avg, 0,
+                                   delay=delay)
+            t_batched = run_mc(MC, nr_points, soft_avg, 1, delay=delay)
+            t_background = run_mc(MC, nr_points, soft_avg, 0,
+                                  background_writing=True, delay=delay)
+        finally:
+            MC.close()
+
+    nr_values = nr_points * soft_avg
+    print(f'{nr_points} points, {soft_avg} soft averages, '
+          f'{1e6 * delay:.0f} us acquisition time per point')
+    for label, t in [('reference (resize per point, HDF5 only)', t_reference),
+                     ('MC, flush every point', t_every_point),
+                     ('MC, flush every 1 s', t_batched),
+                     ('MC, flush every point in background', t_background)]:
+        print(f'{label:40s} {t:8.3f} s  {1e6 * t / nr_values:8.1f} us/pt')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]],
+         *[float(a) for a in sys.argv[3:4]])
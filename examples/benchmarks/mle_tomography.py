@@ -0,0 +1,50 @@
+"""
+Benchmark of tomography_qudev.mle_tomography for 1 to 4 qubits.
+
+Reconstructs a noisy, slightly mixed random state from the expectation
+values of the projectors onto the eigenstates of all Pauli operators and
+prints the time for a single reconstruction and for a batch of bootstrap
+resamples, together with the fidelity to the prepared state.
+
+Usage:
+    python mle_tomography.py [max_nr_qubits] [nr_bootstrap]
+"""
+import sys
+import time
+
+import numpy as np
+import qutip as qtp
+
+from pycqed.analysis_v2 import tomography_qudev as tomo
+
+
+def main(max_nr_qubits=4, nr_bootstrap=100):
+    rng = np.random.RandomState(0)
+    print(f'{"qubits":>6s} {"operators":>10s} {"single":>10s} '
+          f'{"batch":>10s} {"fidelity":>10s}')
+    for nr_qubits in range(1, max_nr_qubits + 1):
+        d = 2 ** nr_qubits
+        Fs = [(qtp.qeye(d) + P) / 2 for P in
+              tomo.generate_pauli_set(nr_qubits)[1]]
+        psi = rng.normal(size=d) + 1j * rng.normal(size=d)
+        psi /= np.linalg.norm(psi)
+        rho = qtp.Qobj(0.9 * np.outer(psi, psi.conj()) + 0.1 * np.eye(d) / d)
+        mus = np.array([(rho * F).tr().real for F in Fs])
+        mus_noisy = mus + rng.normal(scale=0.02, size=len(mus))
+
+        t0 = time.time()
+        rho_mle = tomo.mle_tomography(mus_noisy, Fs)
+        dt_single = time.time() - t0
+
+        mus_bootstrap = mus_noisy + rng.normal(
+            scale=0.02, size=(nr_bootstrap, len(mus)))
+        t0 = time.time()
+        tomo.mle_tomography(mus_bootstrap, Fs)
+        dt_batch = time.time() - t0
+
+        print(f'{nr_qubits:6d} {len(Fs):10d} {dt_single:9.3f}s '
+              f'{dt_batch:9.3f}s {tomo.fidelity(rho_mle, rho):10.4f}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
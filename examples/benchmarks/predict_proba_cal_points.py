@@ -0,0 +1,73 @@
+"""
+Benchmark of analysis_toolbox.predict_gm_proba_from_cal_points for qutrit
+single shots in two readout channels.
+
+Compares the vectorized solver with the former implementation, which ran a
+SLSQP minimization for every single shot, and shows the scaling of the
+vectorized solver up to 10^6 shots. The reference is only run for the
+smallest sizes.
+
+Usage:
+    python predict_proba_cal_points.py [max_nr_shots_reference]
+"""
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, minimize
+
+from pycqed.analysis import analysis_toolbox as a_tools
+
+
+def predict_proba_slsqp(X, cal_points):
+    """Former implementation: one SLSQP minimization per data point."""
+    def find_prob(p, s, mu):
+        approx = 0
+        for mu_i, p_i in zip(mu, p):
+            approx += mu_i*p_i
+        diff = np.abs(s - approx)
+        return np.sum(diff)
+    probas = []
+    initial_guess = np.ones(cal_points.shape[0])/cal_points.shape[0]
+    proba_bounds = Bounds(np.zeros(cal_points.shape[0]),
+                          np.ones(cal_points.shape[0]))
+    proba_sum_constr = LinearConstraint(np.ones(cal_points.shape[0]),
+                                        [1.], [1.])
+    for pt in X:
+        opt_results = minimize(find_prob, initial_guess,
+                               args=(pt, cal_points), method='SLSQP',
+                               bounds=proba_bounds,
+                               constraints=proba_sum_constr)
+        probas.append(opt_results.x)
+    return np.array(probas)
+
+
+def l1_distance(X, cal_points, probas):
+    return np.sum(np.abs(X - probas @ cal_points), axis=1)
+
+
+def main(max_nr_shots_reference=1000):
+    rng = np.random.default_rng(0)
+    cal_points = np.array([[0., 0.], [1., 0.2], [0.3, 1.]])
+    print(f'{"shots":>8s} {"SLSQP":>10s} {"vectorized":>12s} '
+          f'{"max excess L1 distance":>24s}')
+    for nr_shots in [10**k for k in range(2, 7)]:
+        states = rng.integers(0, 3, nr_shots)
+        X = cal_points[states] + rng.normal(0, 0.2, (nr_shots, 2))
+        t0 = time.time()
+        probas = a_tools.predict_gm_proba_from_cal_points(X, cal_points)
+        t_new = time.time() - t0
+        if nr_shots <= max_nr_shots_reference:
+            t0 = time.time()
+            probas_ref = predict_proba_slsqp(X, cal_points)
+            t_ref = f'{time.time() - t0:9.3f}s'
+            excess = np.max(l1_distance(X, cal_points, probas) -
+                            l1_distance(X, cal_points, probas_ref))
+            excess = f'{excess:24.2e}'
+        else:
+            t_ref, excess = f'{"-":>10s}', f'{"-":>24s}'
+        print(f'{nr_shots:8d} {t_ref} {t_new:11.3f}s {excess}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
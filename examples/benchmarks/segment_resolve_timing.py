@@ -0,0 +1,73 @@
+"""
+Benchmark of Segment.resolve_timing for segments with many pulses.
+
+Builds segments resembling repeated rounds of parity measurements: every
+round consists of simultaneous pulses on all data qubits, referenced to
+the previous round with a list of reference pulses, and one readout pulse
+per round. Prints the time spent in resolve_timing and the time per pulse,
+which stays roughly constant as timing resolution scales linearly with the
+number of pulses.
+
+Usage:
+    python segment_resolve_timing.py [max_nr_pulses]
+"""
+import sys
+import time
+
+from pycqed.instrument_drivers.virtual_instruments.virtual_AWG8 import \
+    VirtualAWG8
+import pycqed.measurement.waveform_control.pulsar as ps
+from pycqed.measurement.waveform_control.segment import Segment
+
+NR_DATA_QUBITS = 4
+
+
+def drag_pulse(name, **kw):
+    pulse = {'name': name,
+             'pulse_type': 'SSB_DRAG_pulse',
+             'I_channel': 'AWG8_ch1',
+             'Q_channel': 'AWG8_ch2',
+             'amplitude': 0.1,
+             'sigma': 10e-9,
+             'nr_sigma': 4,
+             'mod_frequency': 100e6}
+    pulse.update(kw)
+    return pulse
+
+
+def parity_rounds(nr_pulses):
+    pulses = []
+    ref = 'segment_start'
+    r = 0
+    while len(pulses) < nr_pulses:
+        names = [f'r{r}_q{q}' for q in range(NR_DATA_QUBITS)]
+        for name in names:
+            pulses.append(drag_pulse(name, ref_pulse=ref))
+        pulses.append(drag_pulse(f'r{r}_ro', ref_pulse=names,
+                                 pulse_delay=10e-9))
+        ref = f'r{r}_ro'
+        r += 1
+    return pulses[:nr_pulses]
+
+
+def main(max_nr_pulses=50000):
+    awg = VirtualAWG8('AWG8')
+    pulsar = ps.Pulsar('Pulsar')
+    pulsar.define_awg_channels(awg)
+    print(f'{"pulses":>8s} {"resolve_timing":>16s} {"per pulse":>12s}')
+    try:
+        for nr_pulses in [100, 500, 1000, 5000, 10000, 50000]:
+            if nr_pulses > max_nr_pulses:
+                break
+            seg = Segment('seg', parity_rounds(nr_pulses))
+            t0 = time.time()
+            seg.resolve_timing()
+            dt = time.time() - t0
+            print(f'{nr_pulses:8d} {dt:15.3f}s {dt / nr_pulses * 1e6:10.1f}us')
+    finally:
+        pulsar.close()
+        awg.close()
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
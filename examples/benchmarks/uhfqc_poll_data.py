@@ -0,0 +1,87 @@
+"""
+Benchmark of UHFQC_Base.poll_data against emulated UHFQCs (MockDAQServer),
+which return one vector of qas/0/result/length samples per poll.
+
+Compares poll_data with the former implementation, which polled the UHFs
+one after the other with a fixed interval of 10 ms and appended every
+polled vector with np.concatenate.
+
+Usage:
+    python uhfqc_poll_data.py [nr_samples] [samples_per_poll] [nr_UHFs]
+"""
+import sys
+import time
+
+import numpy as np
+
+import pycqed.instrument_drivers.physical_instruments.ZurichInstruments.UHFQuantumController as UHF
+import pycqed.measurement.detector_functions as det
+
+
+def poll_data_concatenate(detector):
+    """Former implementation of UHFQC_Base.poll_data (without AWG)."""
+    acq_paths = {UHF.name: UHF._acquisition_nodes for UHF in detector.UHFs}
+    data = {UHF.name: {k: [] for k, _ in enumerate(UHF._acquisition_nodes)}
+            for UHF in detector.UHFs}
+    gotem = {UHF.name: [False] * len(UHF._acquisition_nodes)
+             for UHF in detector.UHFs}
+    accumulated_time = 0
+    while accumulated_time < detector.UHFs[0].timeout() and \
+            not all(np.concatenate(list(gotem.values()))):
+        dataset = {}
+        for UHF in detector.UHFs:
+            if not all(gotem[UHF.name]):
+                time.sleep(0.01)
+                dataset[UHF.name] = UHF.poll(0.01)
+        for UHFname in dataset.keys():
+            for n, p in enumerate(acq_paths[UHFname]):
+                if p in dataset[UHFname]:
+                    for v in dataset[UHFname][p]:
+                        data[UHFname][n] = np.concatenate(
+                            (data[UHFname][n], v['vector']))
+                        if len(data[UHFname][n]) >= detector.detectors[
+                                detector.UHF_map[UHFname]].nr_sweep_points:
+                            gotem[UHFname][n] = True
+        accumulated_time += 0.01 * len(detector.UHFs)
+    return {UHF.name: np.array([data[UHF.name][key]
+                                for key in sorted(data[UHF.name].keys())])
+            for UHF in detector.UHFs}
+
+
+def main(nr_samples=1000000, samples_per_poll=10000, nr_UHFs=2):
+    UHFs = [UHF.UHFQC(name=f'UHF{i}', server='emulator',
+                      device=f'dev{2110 + i}', interface='1GbE')
+            for i in range(nr_UHFs)]
+    try:
+        detectors = []
+        for uhf in UHFs:
+            uhf.timeout(600)
+            uhf.qudev_acquisition_initialize(
+                samples=samples_per_poll, averages=1, loop_cnt=1,
+                channels=(0, 1))
+            d = det.UHFQC_Base(UHFQC=uhf)
+            d.nr_sweep_points = nr_samples
+            detectors.append(d)
+        detector = det.UHFQC_Base(detectors=detectors)
+
+        t0 = time.time()
+        data = detector.poll_data()
+        t_new = time.time() - t0
+        t0 = time.time()
+        data_ref = poll_data_concatenate(detector)
+        t_ref = time.time() - t0
+    finally:
+        for uhf in UHFs:
+            uhf.close()
+
+    for name in data:
+        assert data[name].shape == data_ref[name].shape
+    print(f'{nr_UHFs} UHFs, 2 nodes each, {nr_samples} samples per node '
+          f'in vectors of {samples_per_poll}')
+    print(f'np.concatenate, serial:   {t_ref:8.3f} s')
+    print(f'preallocated, concurrent: {t_new:8.3f} s')
+    print(f'speedup: {t_ref / t_new:.1f}x')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:4]])
@@ -0,0 +1,72 @@
+"""
+Benchmark of the waveform upload of the Pulsar to ZI instruments: CSV files
+in the LabOne waves directory versus binary upload to the waveform nodes of
+the AWG. Runs against the emulated HDAWG (MockDAQServer), i.e. it measures
+the time spent on the host for converting and transferring the waveforms.
+
+Usage:
+    python zi_waveform_upload.py [nr_waveforms] [waveform_length]
+"""
+import os
+import sys
+import tempfile
+import timeit
+from unittest import mock
+
+import numpy as np
+
+import pycqed.instrument_drivers.physical_instruments.ZurichInstruments.ZI_HDAWG8 as HDAWG
+import pycqed.measurement.waveform_control.pulsar as ps
+
+
+def flux_waveforms(nr_waveforms, length):
+    """Long, smooth waveforms as for flux pulses, normalized to 1."""
+    t = np.linspace(0, 1, length)
+    return {('wf', i): (0.5 + 0.4 * np.tanh(20 * (t - 0.1)) *
+                        np.cos(2 * np.pi * i * t))
+            for i in range(nr_waveforms)}
+
+
+def main(nr_waveforms=32, length=100000, repetitions=3):
+    hd = HDAWG.ZI_HDAWG8(name='HD', server='emulator', device='dev8026',
+                         interface='1GbE')
+    pulsar = ps.Pulsar('Pulsar')
+    pulsar.define_awg_channels(hd)
+    waveforms = flux_waveforms(nr_waveforms, length)
+    hashes = list(waveforms)
+    # one waveform per output, at most 32 indices per sub-AWG
+    pairs = [(hashes[i], None, hashes[i + 1], None)
+             for i in range(0, nr_waveforms - 1, 2)]
+
+    def upload_csv():
+        pulsar._zi_written_waves = {}
+        pulsar._zi_write_waves(waveforms)
+
+    def upload_binary():
+        for index, wave in enumerate(pairs):
+            data = ps._zi_binary_waveform(
+                [None if h is None else waveforms[h] for h in wave], length)
+            hd.setv(f'awgs/0/waveform/waves/{index}', data)
+
+    try:
+        with tempfile.TemporaryDirectory() as wave_dir, \
+                mock.patch.object(ps, '_zi_wave_dir', lambda: wave_dir):
+            t_csv = min(timeit.repeat(upload_csv, number=1,
+                                      repeat=repetitions))
+            size_csv = sum(os.path.getsize(os.path.join(wave_dir, f))
+                           for f in os.listdir(wave_dir))
+        t_binary = min(timeit.repeat(upload_binary, number=1,
+                                     repeat=repetitions))
+        size_binary = nr_waveforms * length * 2
+    finally:
+        pulsar.close()
+        hd.close()
+
+    print(f'{nr_waveforms} waveforms of {length} samples')
+    print(f'csv:    {t_csv:8.3f} s, {size_csv / 1e6:8.1f} MB')
+    print(f'binary: {t_binary:8.3f} s, {size_binary / 1e6:8.1f} MB')
+    print(f'speedup: {t_csv / t_binary:.1f}x')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -1,6 +1,7 @@
 import logging
 log = logging.getLogger(__name__)
 
+import itertools
 import os
 import time
 import h5py
@@ -15,7 +16,6 @@ from sklearn.mixture import GaussianMixture as GM
 from pycqed.utilities.get_default_datadir import get_default_datadir
 from scipy.interpolate import griddata
 from mpl_toolkits.axes_grid1 import make_axes_locatable
-from scipy.optimize import Bounds, LinearConstraint, minimize
 from .tools.plotting import *
 from matplotlib import cm
 
@@ -1317,35 +1317,161 @@ def rotate_and_normalize_data_1ch(data, cal_zero_points=np.arange(-4, -2, 1),
     return normalized_data
 
 
+def rotate_and_normalize_data_IQ_TwoD(data, cal_zero_points=None,
+                                      cal_one_points=None, zero_coord=None,
+                                      one_coord=None, **kw):
+    '''
+    Rotates and normalizes each column of a 2D sweep in the same way as
+    rotate_and_normalize_data_IQ does for 1D data, but for all columns at
+    once.
+    Inputs:
+        data (numpy array) : dataset of shape (2, nr_sweep_pts,
+                             nr_columns) with the I and Q data
+        zero_coord (tuple) : coordinates of reference zero, either shared
+                             by all columns (scalars) or per column
+                             (arrays of length nr_columns)
+        one_coord (tuple) : coordinates of reference one, see zero_coord
+        cal_zero_points (range) : range specifying what indices along the
+                                  sweep points correspond to zero; the cal
+                                  points are averaged for each column
+        cal_one_points (range) : range specifying what indices along the
+                                 sweep points correspond to one
+        **kw : passed to rotate_and_normalize_data_no_cal_points if no
+               cal points are given (PCA in each column)
+    Returns:
+        [normalized_data of shape (nr_sweep_pts, nr_columns),
+         zero_coord, one_coord]
+    '''
+    data = np.asarray(data)
+    if all([v is None for v in
+            [cal_zero_points, cal_one_points, zero_coord, one_coord]]):
+        normalized_data = rotate_and_normalize_data_no_cal_points_TwoD(
+            data, **kw)
+    elif cal_one_points is None and one_coord is None:
+        # the fit of a line through the zero cal point is done per column
+        normalized_data = np.array([rotate_and_normalize_data_IQ(
+            data[:, :, col], cal_zero_points=cal_zero_points,
+            zero_coord=zero_coord)[0] for col in range(data.shape[2])]).T
+    else:
+        if zero_coord is None:
+            zero_coord = tuple(np.mean(data[:, cal_zero_points], axis=1))
+        if one_coord is None:
+            one_coord = tuple(np.mean(data[:, cal_one_points], axis=1))
+        I_zero, Q_zero = zero_coord
+        I_one, Q_one = one_coord
+        # the projection onto the line from zero to one, in units of the
+        # distance between the two, is the rotated first channel
+        delta_I = I_one - I_zero
+        delta_Q = Q_one - Q_zero
+        normalized_data = ((data[0] - I_zero) * delta_I +
+                           (data[1] - Q_zero) * delta_Q) / \
+                          (delta_I**2 + delta_Q**2)
+
+    return [normalized_data, zero_coord, one_coord]
+
+
+def rotate_and_normalize_data_no_cal_points_TwoD(data, **kw):
+    """
+    Projects each column of a 2D sweep onto its principal axis like
+    rotate_and_normalize_data_no_cal_points, for all columns at once.
+    Assumes data has shape (2, nr_sweep_pts, nr_columns) and returns an
+    array of shape (nr_sweep_pts, nr_columns).
+    """
+    trans_data = data - np.mean(data, axis=1, keepdims=True)
+    # covariance matrices of shape (nr_columns, 2, 2)
+    trans_cols = np.moveaxis(trans_data, 2, 0)
+    cov_matrices = trans_cols @ np.swapaxes(trans_cols, 1, 2) / \
+                   (data.shape[1] - 1)
+    eigvals, eigvecs = np.linalg.eig(cov_matrices)
+    principal_axes = np.take_along_axis(
+        eigvecs, np.argmax(eigvals, axis=1)[:, None, None], axis=2)[..., 0]
+    normalized_data = np.einsum('ci,ipc->pc', principal_axes, trans_data)
+
+    if kw.get('data_mostly_g', None) is None:
+        return normalized_data
+
+    # data rotated such that majority of data points is smaller than the mid
+    # point between min and max (if data_mostly_g), separately per column
+    mean = np.mean(normalized_data, axis=0)
+    middle = (np.max(normalized_data, axis=0) +
+              np.min(normalized_data, axis=0)) / 2
+    sign = np.sign(middle - mean)
+    if not kw.get('data_mostly_g'):
+        sign = -sign
+    return normalized_data * sign
+
+
+def rotate_and_normalize_data_1ch_TwoD(data, cal_zero_points=np.arange(-4, -2, 1),
+                                       cal_one_points=np.arange(-2, 0, 1),
+                                       zero_coord=None, one_coord=None, **kw):
+    '''
+    Normalizes each column of a 2D sweep according to calibration points
+    like rotate_and_normalize_data_1ch, for all columns at once.
+    Inputs:
+        data (numpy array) : dataset of shape (nr_sweep_pts, nr_columns)
+        cal_zero_points (range) : range specifying what indices along the
+                                  sweep points correspond to zero
+        cal_one_points (range) : range specifying what indices along the
+                                 sweep points correspond to one
+        zero_coord (float or array) : reference zero shared by all columns
+                                      or per column, instead of the cal
+                                      points
+        one_coord (float or array) : reference one, see zero_coord
+    '''
+    data = np.asarray(data)
+    if zero_coord is None:
+        zero_coord = np.mean(data[cal_zero_points], axis=-2)
+    if one_coord is None:
+        one_coord = np.mean(data[cal_one_points], axis=-2)
+    return (data - zero_coord) / (one_coord - zero_coord)
+
+
 def predict_gm_proba_from_cal_points(X, cal_points):
     """
     For each point of the data array X, predicts the probability of being
     in the states of each cal_point respectively,
     in the limit of narrow gaussians.
+
+    The probabilities p minimize the L1 distance between a point and
+    cal_points.T @ p, with p on the probability simplex. This objective is
+    piecewise linear, such that its minimum is attained at a point where
+    n_states - 1 of the constraints p_k = 0 (state k not populated) and
+    cal_points[:, c] @ p = X[:, c] (channel c exactly reproduced) are
+    active. All these candidates are computed with one matrix product for
+    all data points at once, and the feasible one with the smallest
+    distance is returned.
     Args:
         X: Data (n, n_channels)
         cal_points: array of calpoints where each row is a different state and
         columns are number of channels (n_cal_points, n_channels)
+    Returns: (n, n_cal_points) array of probabilities
     """
-    def find_prob(p, s, mu):
-        approx = 0
-        for mu_i, p_i in zip(mu, p):
-            approx += mu_i*p_i
-        diff = np.abs(s - approx)
-        return np.sum(diff)
-    probas = []
-    initial_guess = np.ones(cal_points.shape[0])/cal_points.shape[0]
-    proba_bounds = Bounds(np.zeros(cal_points.shape[0]),
-                          np.ones(cal_points.shape[0]))
-    proba_sum_constr = LinearConstraint(np.ones(cal_points.shape[0]),
-                                        [1.], [1.])
-    for pt in X:
-        opt_results = minimize(find_prob, initial_guess,
-                               args=(pt, cal_points), method='SLSQP',
-                               bounds=proba_bounds,
-                               constraints=proba_sum_constr)
-        probas.append(opt_results.x)
-    return np.array(probas)
+    X = np.asarray(X, dtype=float)
+    cal_points = np.asarray(cal_points, dtype=float)
+    n_states = cal_points.shape[0]
+    constraints = np.concatenate([np.eye(n_states), cal_points.T])
+    best_cost = np.full(len(X), np.inf)
+    probas = np.full((len(X), n_states), 1 / n_states)
+    for active in itertools.combinations(range(len(constraints)),
+                                         n_states - 1):
+        A = np.concatenate([np.ones((1, n_states)),
+                            constraints[list(active)]])
+        if np.linalg.matrix_rank(A) < n_states:
+            continue
+        b = np.zeros((len(X), n_states))
+        b[:, 0] = 1
+        for i, c in enumerate(active):
+            if c >= n_states:
+                b[:, i + 1] = X[:, c - n_states]
+        p = b @ np.linalg.inv(A).T
+        # tolerate rounding errors for points on the boundary of the simplex
+        feasible = np.all(p > -1e-10, axis=1)
+        cost = np.sum(np.abs(X - p @ cal_points), axis=1)
+        better = feasible & (cost < best_cost)
+        best_cost[better] = cost[better]
+        probas[better] = p[better]
+    probas = np.clip(probas, 0, None)
+    return probas / np.sum(probas, axis=1, keepdims=True)
 
 
 def predict_gm_proba_from_clf(X, clf_params):
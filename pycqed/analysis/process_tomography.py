@@ -7,6 +7,8 @@ from pycqed.analysis.tools.plotting import *
 import time
 import os
 
+_coefficients = None
+
 rotation_matrixes = [qtp.qeye(2).full(),
                      qtp.sigmax().full(),
                      qtp.rotation(qtp.sigmay(), np.pi / 2).full(),
@@ -99,13 +101,54 @@ def dagger(op):
 
 def qtp_matrix_element(mn, lk, beta):
     #     beta is wrong!
-    m, n = unroll_mn(mn)
-    l, k = unroll_lk(lk)
-    element = 0.
-    for j in range(4):
-        element += beta[j]*qpt_matrix_term(l, n, k, j, m)
-#     print(mn,element)
-    return element
+    return np.dot(get_qpt_coefficients()[mn, lk], beta)
+
+
+def get_qpt_coefficients():
+    """
+    Returns the coefficients qpt_matrix_term(l, n, k, j, m) for all indices
+    as a complex array of shape (256, 1296, 4), indexed by the process index
+    mn = 16*m + n, the preparation and tomography index lk = 36*l + k and
+    the measurement index j.
+
+    The tensor is computed once with np.einsum and cached in memory.
+    """
+    global _coefficients
+    if _coefficients is None:
+        _coefficients = _calc_qpt_coefficients()
+    return _coefficients
+
+
+def _calc_qpt_coefficients():
+    rots = np.array([get_rotation(i) for i in range(36)])
+    paulis = np.array([get_pauli(i) for i in range(16)])
+    meas_paulis = np.array([get_measurement_pauli(i) for i in range(4)])
+    # first row of ul^dag pn^dag uk^dag and first column of uk pm ul
+    left = np.einsum('la,nba,kcb->lnkc', rots[:, :, 0].conj(),
+                     paulis.conj(), rots.conj())
+    right = np.einsum('kef,mfg,lg->kmle', rots, paulis, rots[:, :, 0])
+    coeffs = np.einsum('lnkc,jce,kmle->mnlkj', left, meas_paulis, right,
+                       optimize=True)
+    return coeffs.reshape(256, 1296, 4)
+
+
+def qpt_matrix(betas):
+    """
+    Returns the matrix of the linear system relating the chi matrix
+    (flattened) to the tomography measurements, i.e. the matrix with
+    entries qtp_matrix_element(s, i, betas[b, :, l]) in row
+    i + b*1296 and column s, where l = i // 36.
+
+    Args:
+        betas (array): measurement operator coefficients of shape
+            (3, 4, 36), see analyze_qpt.
+
+    Returns:
+        complex array of shape (3*1296, 256)
+    """
+    coeffs = get_qpt_coefficients().reshape(256, 36, 36, 4)
+    return np.einsum('slkj,bjl->blks', coeffs, betas).reshape(
+        len(betas)*1296, 256)
 
 
 def calc_fidelity1(dens_mat1, dens_mat2):
@@ -114,7 +157,12 @@ def calc_fidelity1(dens_mat1, dens_mat2):
     return np.real(fid)
 
 
-def analyze_qpt(t_start, t_stop, label):  # identity tomo
+def analyze_qpt(t_start, t_stop, label, nr_bootstrap=0):  # identity tomo
+    """
+    Analyzes a two-qubit process tomography. If nr_bootstrap > 0, the
+    standard deviation of the chi matrix over nr_bootstrap resamples of the
+    single shots is returned as third return value.
+    """
 
     opt_dict = {'scan_label': label}
 
@@ -142,74 +190,31 @@ def analyze_qpt(t_start, t_stop, label):  # identity tomo
             shots_q1[j, i, :] = tomo_scans.TD_dict['Q'][j][i::nr_segments]
 
     shots_q0q1 = np.multiply(shots_q1, shots_q0)
+    shots = np.array([shots_q0, shots_q1, shots_q0q1])
 
-    avg_h1 = np.mean(shots_q0, axis=2)
-
-    h1_00 = np.mean(avg_h1[:, 36:36+7], axis=1)
-    h1_01 = np.mean(avg_h1[:, 43:43+7], axis=1)
-    h1_10 = np.mean(avg_h1[:, 50:50+7], axis=1)
-    h1_11 = np.mean(avg_h1[:, 57:], axis=1)
-
-    avg_h2 = np.mean(shots_q1, axis=2)
-    h2_00 = np.mean(avg_h2[:, 36:36+7], axis=1)
-    h2_01 = np.mean(avg_h2[:, 43:43+7], axis=1)
-    h2_10 = np.mean(avg_h2[:, 50:50+7], axis=1)
-    h2_11 = np.mean(avg_h2[:, 57:], axis=1)
-
-    avg_h12 = np.mean(shots_q0q1, axis=2)
-    h12_00 = np.mean(avg_h12[:, 36:36+7], axis=1)
-    h12_01 = np.mean(avg_h12[:, 43:43+7], axis=1)
-    h12_10 = np.mean(avg_h12[:, 50:50+7], axis=1)
-    h12_11 = np.mean(avg_h12[:, 57:], axis=1)
-
-    avg_h12 = np.mean(shots_q0q1, axis=2)
-
-    measurements_tomo = np.zeros((measurement_number*measurement_number*3))
-    for i in range(measurement_number):
-        #     measurements_tomo[i*measurement_number*3:(i+1)*measurement_number*3] = (
-        # np.array([avg_h1[i,0:36], avg_h2[i,0:36],
-        # avg_h12[i,0:36]])).flatten()
-        measurements_tomo[i*36:(i+1)*36] = avg_h1[i, 0:36]
-        measurements_tomo[i*36+measurement_number*measurement_number:
-                          (i+1)*36+measurement_number*measurement_number] = avg_h2[i, 0:36]
-        measurements_tomo[i*36+2*measurement_number*measurement_number:
-                          (i+1)*36+2*measurement_number*measurement_number] = avg_h12[i, 0:36]
-    measurements_cal = np.array([[h1_00, h1_01, h1_10, h1_11],
-                                 [h2_00, h2_01, h2_10, h2_11],
-                                 [h12_00, h12_01, h12_10, h12_11]])
+    measurements_tomo, measurements_cal = qpt_measurements(
+        np.mean(shots, axis=3))
 
     t0 = time.time()
     # get the betas
-    betas = np.zeros((3, 4, measurement_number))
     matrix = np.array(
         [[1, 1, 1, 1], [1, -1, 1, -1], [1, 1, -1, -1], [1, -1, -1, 1]])
-    for i in range(measurement_number):
-        betas[0, :, i] = np.dot(
-            np.linalg.inv(matrix), measurements_cal[0, :, i])
-        betas[1, :, i] = np.dot(
-            np.linalg.inv(matrix), measurements_cal[1, :, i])
-        betas[2, :, i] = np.dot(
-            np.linalg.inv(matrix), measurements_cal[2, :, i])
-    # define the matrix
-    qtp_matrix = np.zeros(
-        (measurement_number*measurement_number*3, 16*16), dtype=np.complex128)
-    # fill the matrix
-    for i in range(measurement_number*measurement_number):
-        if ((i % 50) == 0):
-            print(i/(measurement_number*measurement_number))
-        l, k = unroll_lk(i)
-        for s in range(16*16):
-            qtp_matrix[i, s] = qtp_matrix_element(s, i, betas[0, :, l])
-            qtp_matrix[i+measurement_number*measurement_number,
-                       s] = qtp_matrix_element(s, i, betas[1, :, l])
-            qtp_matrix[i+2*measurement_number*measurement_number,
-                       s] = qtp_matrix_element(s, i, betas[2, :, l])
-        t1 = time.time()
-    #     print((t1-t0)/(i+1))
-
-    inv_matrix = np.linalg.pinv(qtp_matrix)
-    chi_mat = np.dot(inv_matrix, measurements_tomo)
+    betas = np.einsum('jc,bci->bji', np.linalg.inv(matrix), measurements_cal)
+    qtp_matrix = qpt_matrix(betas)
+
+    if nr_bootstrap > 0:
+        # resampled shots with the calibration (betas) of the full data set
+        tomo_bootstrap, _ = qpt_measurements(
+            np.dot(shots, bootstrap_weights(shots.shape[3], nr_bootstrap)))
+        measurements_tomo = np.column_stack(
+            [measurements_tomo, tomo_bootstrap])
+    chi_mat = np.linalg.lstsq(qtp_matrix, measurements_tomo, rcond=None)[0]
     t2 = time.time()
+    if nr_bootstrap > 0:
+        chi_bootstrap = chi_mat[:, 1:].reshape((16, 16, nr_bootstrap))
+        chi_mat_std = np.std(chi_bootstrap.real, axis=2) + \
+            1j*np.std(chi_bootstrap.imag, axis=2)
+        chi_mat = chi_mat[:, 0]
 
     chi_mat = chi_mat.reshape((16, 16))
 
@@ -323,9 +328,46 @@ def analyze_qpt(t_start, t_stop, label):  # identity tomo
 #         savefolder, figname))
 #     # value of 450dpi is arbitrary but higher than default
 #     fig.savefig(savename, format='png', dpi=450)
+    if nr_bootstrap > 0:
+        return chi_mat, f_ave_opt, chi_mat_std
     return chi_mat, f_ave_opt
 
 
+def qpt_measurements(avg):
+    """
+    Arranges the averaged results of a process tomography into the
+    tomography measurements and the calibration points.
+
+    Args:
+        avg (array): averaged results of shape (3, 36, 64, ...) for qubit 0,
+            qubit 1 and their product, the 36 measurements and the 64
+            segments, of which the last 28 are calibration points. Trailing
+            axes, e.g. of bootstrap samples, are kept.
+
+    Returns:
+        tomography measurements of shape (3*1296, ...) and calibration
+        points of shape (3, 4, 36, ...)
+    """
+    measurements_tomo = avg[:, :, :36].reshape((3*36*36,) + avg.shape[3:])
+    measurements_cal = np.moveaxis(
+        avg[:, :, 36:].reshape((3, 36, 4, 7) + avg.shape[3:]).mean(axis=3),
+        2, 1)
+    return measurements_tomo, measurements_cal
+
+
+def bootstrap_weights(nr_shots, nr_samples):
+    """
+    Returns an array of shape (nr_shots, nr_samples) such that the dot
+    product of single shots with it gives the averages of nr_samples
+    resamples (with replacement) of the shots.
+    """
+    idxs = np.random.randint(nr_shots, size=(nr_samples, nr_shots))
+    counts = np.bincount(
+        (idxs + nr_shots*np.arange(nr_samples)[:, None]).ravel(),
+        minlength=nr_shots*nr_samples).reshape(nr_samples, nr_shots)
+    return counts.T / nr_shots
+
+
 def chi2PTM():
     return
 
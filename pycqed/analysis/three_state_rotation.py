@@ -143,4 +143,37 @@ def predict_proba_avg_ro(X, cal_points):
             if list(h) == list(c):
                 reordered_idx.append(j)
 
-    return np.array(probas)[:, reordered_idx]
\ No newline at end of file
+    return np.array(probas)[:, reordered_idx]
+
+
+def predict_proba_avg_ro_TwoD(X, cal_points):
+    """
+    Predicts probabilities of each state of average readout data for all
+    columns of a 2D sweep at once. The probabilities predicted by
+    predict_proba_avg_ro are the barycentric coordinates of the data points
+    with respect to the triangle spanned by the 3 calibration points, which
+    are computed here for all points by solving one 2x2 linear system per
+    column.
+    Args:
+        X: (n_samples, n_columns, 2) average readout data points.
+        cal_points: calibration points of shape (3, 2) shared by all
+            columns or (n_columns, 3, 2) for each column.
+    Returns:
+        (n_samples, n_columns, 3) probabilities in the same order as the
+        cal_points.
+    Raises:
+        np.linalg.LinAlgError: if the cal points of a column are collinear,
+            for which the geometric construction of predict_proba_avg_ro
+            does not raise an error.
+    """
+    X = np.asarray(X)
+    assert X.ndim == 3 and X.shape[2] == 2, \
+        "For now measurement data should be of shape (any, any, 2)." + \
+        f" Received shape: {X.shape}."
+    cal_points = np.broadcast_to(cal_points, (X.shape[1], 3, 2))
+    # columns of T are the vectors from the last to the first two cal points
+    T = np.swapaxes(cal_points[:, :2] - cal_points[:, 2:], 1, 2)
+    rhs = np.moveaxis(X - cal_points[:, 2], 0, 2)
+    probas = np.moveaxis(np.linalg.solve(T, rhs), 2, 0)
+    return np.concatenate([probas, 1 - probas.sum(axis=2, keepdims=True)],
+                          axis=2)
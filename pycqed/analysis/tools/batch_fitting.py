@@ -0,0 +1,361 @@
+"""
+Batched least-squares fitting of many independent data slices sharing the
+same lmfit model and independent variables, e.g. the 1D slices of a 2D
+sweep.
+
+Instead of calling model.fit once per slice, the parameters of all slices
+are stacked into a single array and the model function is evaluated for all
+slices at once by broadcasting (or, for model functions which only accept
+scalar parameters, in a plain loop over the slices). A Levenberg-Marquardt
+iteration is then carried out on all slices simultaneously with a
+forward-difference Jacobian. The results are returned as lmfit ModelResult
+objects such that they can be used like the results of model.fit.
+
+Slices which cannot be treated in the batch (e.g. composite models,
+constrained function arguments or fits which do not converge) are returned
+as None and should be fitted individually.
+"""
+import logging
+from copy import deepcopy
+
+import lmfit
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+_EPS = np.sqrt(np.finfo(float).eps)
+
+
+def batch_fit(model, guess_pars_list, data_list, fit_xvals, max_iter=200,
+              ftol=1.5e-8, xtol=1.5e-8, warm_start=True):
+    """
+    Fits the model to all slices in data_list at once.
+
+    Args:
+        model (lmfit.Model): model shared by all slices
+        guess_pars_list (list of lmfit.Parameters): initial guesses, one per
+            slice. The parameters have to agree in name and in which of them
+            are varied. Expressions are only supported for derived
+            parameters which are not arguments of the model function.
+        data_list (list of arrays): data to be fitted, all of the same length
+        fit_xvals (dict): independent variables shared by all slices
+        max_iter (int): maximum number of iterations
+        ftol (float): relative tolerance of the sum of squares
+        xtol (float): relative tolerance of the parameters
+        warm_start (bool): whether slices that did not converge are fitted
+            once more starting from the result of the closest converged
+            slice.
+
+    Returns:
+        list of lmfit.model.ModelResult, with None for the slices which
+        could not be fitted in the batch.
+    """
+    n = len(data_list)
+    if n == 0:
+        return []
+    if not _is_batchable(model, guess_pars_list):
+        return [None] * n
+    # complex data and models (e.g. of resonator transmission) are left to
+    # lmfit, which fits the real and imaginary parts of the residuals
+    if any(np.iscomplexobj(d) for d in data_list):
+        return [None] * n
+    try:
+        ref_vals = {i: model.eval(params=guess_pars_list[i], **fit_xvals)
+                    for i in {0, n - 1}}
+    except Exception as e:
+        log.debug(f'Evaluation of model {model} failed: {e}')
+        return [None] * n
+    if any(np.iscomplexobj(v) for v in ref_vals.values()):
+        return [None] * n
+    ys = np.array([np.asarray(d, dtype=float) for d in data_list])
+    if ys.ndim != 2:
+        return [None] * n
+
+    names = list(guess_pars_list[0].keys())
+    var_names = [k for k in names if guess_pars_list[0][k].vary]
+    # parameters without expression which are not varied
+    fixed_names = [k for k in names if not guess_pars_list[0][k].vary and
+                   guess_pars_list[0][k].expr is None]
+    p0 = np.array([[pars[k].value for k in var_names]
+                   for pars in guess_pars_list], dtype=float).reshape(n, -1)
+    lo = np.array([[pars[k].min for k in var_names]
+                   for pars in guess_pars_list], dtype=float).reshape(n, -1)
+    hi = np.array([[pars[k].max for k in var_names]
+                   for pars in guess_pars_list], dtype=float).reshape(n, -1)
+    fixed = {k: np.array([pars[k].value for pars in guess_pars_list],
+                         dtype=float) for k in fixed_names}
+
+    def model_args(p, idx):
+        kw = {}
+        for k in fixed_names:
+            kw[_func_arg(model, k)] = fixed[k][idx]
+        for j, k in enumerate(var_names):
+            kw[_func_arg(model, k)] = p[:, j]
+        return kw
+
+    def eval_broadcast(p, idx):
+        kw = {k: v[:, np.newaxis] for k, v in model_args(p, idx).items()}
+        kw.update(getattr(model, 'opts', {}))
+        kw.update(fit_xvals)
+        return np.broadcast_to(model.func(**kw), (len(idx), ys.shape[1]))
+
+    def eval_loop(p, idx):
+        # for model functions which only accept scalar parameters
+        kw = model_args(p, idx)
+        vals = np.empty((len(idx), ys.shape[1]))
+        for i in range(len(idx)):
+            vals[i] = model.func(**{k: v[i] for k, v in kw.items()},
+                                 **getattr(model, 'opts', {}), **fit_xvals)
+        return vals
+
+    # use broadcasting if the model function supports it, which is checked
+    # by comparing to the evaluation of single slices
+    p0 = np.clip(p0, lo, hi)
+    model_eval = None
+    for ev in [eval_broadcast, eval_loop]:
+        try:
+            with np.errstate(all='ignore'):
+                vals = ev(p0, np.arange(n))
+                if all(np.allclose(vals[i], ref_vals[i], equal_nan=True)
+                       for i in ref_vals):
+                    model_eval = ev
+                    break
+        except Exception as e:
+            log.debug(f'{ev.__name__} failed for model {model}: {e}')
+    if model_eval is None:
+        return [None] * n
+
+    def residuals(p, idx):
+        with np.errstate(all='ignore'):
+            return model_eval(p, idx) - ys[idx]
+
+    p, converged, nfev = _levenberg_marquardt(
+        residuals, p0, lo, hi, max_iter, ftol, xtol)
+    if warm_start and converged.any() and not converged.all():
+        retry = np.flatnonzero(~converged)
+        conv = np.flatnonzero(converged)
+        closest = conv[np.argmin(np.abs(retry[:, np.newaxis] -
+                                        conv[np.newaxis, :]), axis=1)]
+        p_retry, conv_retry, nfev_retry = _levenberg_marquardt(
+            lambda p, idx: residuals(p, retry[idx]), p[closest],
+            lo[retry], hi[retry], max_iter, ftol, xtol)
+        p[retry] = p_retry
+        converged[retry] = conv_retry
+        nfev[retry] += nfev_retry
+
+    results = [None] * n
+    idx = np.flatnonzero(converged)
+    if len(idx) == 0:
+        return results
+    r = residuals(p[idx], idx)
+    jac = _jacobian(lambda p: residuals(p, idx), p[idx], r)
+    for k, i in enumerate(idx):
+        results[i] = _make_model_result(
+            model, guess_pars_list[i], ys[i], fit_xvals, var_names,
+            p[i], r[k], jac[k], nfev[i])
+    return results
+
+
+def _is_batchable(model, guess_pars_list):
+    if not isinstance(model, lmfit.Model) or \
+            isinstance(model, lmfit.model.CompositeModel):
+        return False
+    names = list(guess_pars_list[0].keys())
+    for pars in guess_pars_list:
+        if list(pars.keys()) != names:
+            return False
+        for k in names:
+            if pars[k].vary != guess_pars_list[0][k].vary or \
+                    (pars[k].expr is None) != \
+                    (guess_pars_list[0][k].expr is None):
+                return False
+            if pars[k].expr is None:
+                if _func_arg(model, k) not in model._func_allargs:
+                    return False
+            elif _func_arg(model, k) in model._func_allargs:
+                # constrained function argument
+                return False
+    return True
+
+
+def _func_arg(model, param_name):
+    if model.prefix and param_name.startswith(model.prefix):
+        return param_name[len(model.prefix):]
+    return param_name
+
+
+def _jacobian(residuals, p, r):
+    """
+    Forward-difference Jacobian of the residuals of all slices, returns an
+    array of shape (n_slices, n_data, n_params).
+
+    The step is relative to the parameter value, but at least relative to
+    the median magnitude of the parameter over all slices, such that
+    parameters which happen to be close to zero in some slices (e.g. a
+    center) are not differentiated with a vanishing step.
+    """
+    jac = np.empty(r.shape + (p.shape[1],))
+    for j in range(p.shape[1]):
+        h = _EPS * np.maximum(np.abs(p[:, j]), np.median(np.abs(p[:, j])))
+        h[h == 0] = _EPS
+        dp = p.copy()
+        dp[:, j] += h
+        jac[..., j] = (residuals(dp) - r) / h[:, np.newaxis]
+    return jac
+
+
+def _levenberg_marquardt(residuals, p0, lo, hi, max_iter, ftol, xtol):
+    """
+    Levenberg-Marquardt minimization of the sum of squares of the residuals
+    of all slices. Every slice has its own damping parameter and leaves the
+    iteration once converged. Steps are projected onto the bounds.
+
+    Returns the parameters, a boolean array indicating convergence and the
+    number of function evaluations per slice.
+    """
+    n, n_par = p0.shape
+    p = p0.copy()
+    r = residuals(p, np.arange(n))
+    cost = np.sum(r**2, axis=1)
+    nfev = np.ones(n, dtype=int)
+    lam = np.full(n, 1e-3)
+    converged = np.zeros(n, dtype=bool)
+    active = np.isfinite(cost)
+    if n_par == 0:
+        return p, active, nfev
+    # residuals of the active slices are kept in r_act
+    idx = np.flatnonzero(active)
+    r_act = r[idx]
+    for _ in range(max_iter):
+        if len(idx) == 0:
+            break
+        jac = _jacobian(lambda q: residuals(q, idx), p[idx], r_act)
+        nfev[idx] += n_par
+        jtj = np.einsum('kmi,kmj->kij', jac, jac)
+        grad = np.einsum('kmi,km->ki', jac, r_act)
+        diag = np.maximum(np.einsum('kii->ki', jtj), 1e-300)
+        try:
+            step = -np.linalg.solve(
+                jtj + lam[idx, np.newaxis, np.newaxis] *
+                (np.eye(n_par) * diag[:, np.newaxis, :]),
+                grad[..., np.newaxis])[..., 0]
+        except np.linalg.LinAlgError:
+            step = -np.array([np.linalg.lstsq(
+                a + l * np.diag(d), g, rcond=None)[0] for a, l, d, g in
+                zip(jtj, lam[idx], diag, grad)])
+        p_new = np.clip(p[idx] + step, lo[idx], hi[idx])
+        r_new = residuals(p_new, idx)
+        nfev[idx] += 1
+        cost_new = np.sum(r_new**2, axis=1)
+        better = np.isfinite(cost_new) & (cost_new <= cost[idx])
+
+        dcost = cost[idx] - cost_new
+        dp = np.abs(p_new - p[idx])
+        done = better & ((dcost <= ftol * cost[idx]) | np.all(
+            dp <= xtol * (np.abs(p[idx]) + xtol), axis=1))
+        done |= cost[idx] == 0
+        # no step reduces the sum of squares, the slice is given up
+        stuck = ~better & (lam[idx] > 1e10) & ~done
+
+        upd = idx[better]
+        p[upd] = p_new[better]
+        cost[upd] = cost_new[better]
+        r_act[better] = r_new[better]
+        lam[idx] = np.where(better, lam[idx] / 10, lam[idx] * 10)
+
+        converged[idx[done]] = True
+        keep = ~done & ~stuck
+        idx, r_act = idx[keep], r_act[keep]
+    return p, converged, nfev
+
+
+def _make_model_result(model, guess_pars, data, fit_xvals, var_names,
+                       best_vals, residual, jac, nfev):
+    """
+    Creates an lmfit ModelResult containing the results of a batched fit,
+    with the attributes set as by ModelResult.fit.
+    """
+    # copying Parameters is expensive, the guess is not modified and serves
+    # as init_params
+    params = deepcopy(guess_pars)
+    for k, v in zip(var_names, best_vals):
+        params[k].value = v
+    res = lmfit.model.ModelResult(model, params, fcn_kws=dict(fit_xvals))
+    res.data = data
+    res.weights = None
+    res.method = 'leastsq'
+    res.init_params = guess_pars
+    res.userargs = (data, None)
+    res.userkws = dict(fit_xvals)
+    res.init_fit = model.eval(params=res.init_params, **res.userkws)
+    res.params = params
+    res.var_names = list(var_names)
+    res.init_vals = [guess_pars[k].value for k in var_names]
+    res.residual = residual
+    res.nfev = int(nfev)
+    res.success = True
+    res.message = 'Fit succeeded.'
+    res.ier = 1
+    res.lmdif_message = 'Converged in batched Levenberg-Marquardt fit.'
+
+    res.nvarys = len(var_names)
+    res.ndata = len(residual)
+    res.nfree = res.ndata - res.nvarys
+    res.chisqr = (residual**2).sum()
+    res.redchi = res.chisqr / max(1, res.nfree)
+    _neg2_log_likel = res.ndata * np.log(max(res.chisqr, 1e-250 * res.ndata)
+                                         / res.ndata)
+    res.aic = _neg2_log_likel + 2 * res.nvarys
+    res.bic = _neg2_log_likel + np.log(res.ndata) * res.nvarys
+
+    res.covar = None
+    res.errorbars = False
+    for k in var_names:
+        params[k].stderr = None
+        params[k].correl = None
+    if res.nfree > 0:
+        try:
+            covar = np.linalg.inv(jac.T @ jac) * res.redchi
+            if np.all(np.diag(covar) >= 0) and np.all(np.isfinite(covar)):
+                res.covar = covar
+                res.errorbars = True
+        except np.linalg.LinAlgError:
+            pass
+    if res.covar is not None:
+        std = np.sqrt(np.diag(res.covar))
+        for i, k in enumerate(var_names):
+            params[k].stderr = std[i]
+            params[k].correl = {
+                k2: res.covar[i, j] / (std[i] * std[j]) if std[i] * std[j]
+                else 0 for j, k2 in enumerate(var_names) if j != i}
+        _derived_stderr(params, var_names, res.covar)
+
+    res.init_values = model._make_all_args(res.init_params)
+    res.best_values = model._make_all_args(params)
+    res.best_fit = model.eval(params=params, **res.userkws)
+    sstot = ((data - data.mean())**2).sum()
+    res.rsquared = 1.0 - res.chisqr / max(np.finfo(float).tiny, sstot)
+    return res
+
+
+def _derived_stderr(params, var_names, covar):
+    """
+    Propagates the covariance of the varied parameters to the parameters
+    defined by an expression, using a forward-difference gradient.
+    """
+    derived = [k for k in params if params[k].expr is not None]
+    if len(derived) == 0:
+        return
+    base = np.array([params[k].value for k in derived])
+    grad = np.empty((len(derived), len(var_names)))
+    for j, k in enumerate(var_names):
+        val = params[k].value
+        h = _EPS * abs(val) or _EPS
+        if val + h > params[k].max:
+            h = -h
+        params[k].value = val + h
+        grad[:, j] = (np.array([params[d].value for d in derived]) - base) / h
+        params[k].value = val
+    std = np.sqrt(np.einsum('di,ij,dj->d', grad, covar, grad))
+    for d, sd in zip(derived, std):
+        params[d].stderr = sd
@@ -0,0 +1,128 @@
+"""
+Executor for running many independent lmfit model fits, either serially or
+distributed over a pool of worker processes.
+
+A fit job is a tuple (model, guess_pars, fit_xvals, fit_yvals, fit_kwargs)
+with the arguments of model.fit. Jobs are sent to the worker processes in
+chunks and the results are returned in the order of the jobs, independent
+of the order in which the workers finish.
+
+Models have to be picklable to be sent to a worker process. This is the
+case for models built from module-level functions, e.g. the models in
+pycqed.analysis.fitting_models, but not for models of lambdas or locally
+defined functions. Such jobs, as well as jobs for which the worker failed
+(e.g. because the fit raised an error or the result could not be pickled),
+are fitted in the calling process.
+"""
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+log = logging.getLogger(__name__)
+
+
+def fit_jobs(jobs, executor='serial', n_workers=None):
+    """
+    Runs the fit jobs with the given executor.
+
+    Args:
+        jobs (list of tuples): (model, guess_pars, fit_xvals, fit_yvals,
+            fit_kwargs) for each fit
+        executor (str): 'serial' to fit in the calling process or
+            'processes' to use a pool of worker processes
+        n_workers (int): number of worker processes, defaults to the number
+            of CPUs
+
+    Returns:
+        list of tuples (fit_res, fit_time) in the order of the jobs, where
+        fit_time is the time in seconds spent in model.fit.
+    """
+    if executor not in ['serial', 'processes']:
+        raise ValueError(f'Unknown fit executor "{executor}". Use "serial" '
+                         f'or "processes".')
+    results = [None] * len(jobs)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if executor == 'processes' and len(jobs) > 1 and n_workers > 1:
+        # models are typically shared by many jobs, and the remaining
+        # arguments (Parameters, arrays and dicts of them) can be pickled
+        picklable_models = {}
+        remote = []
+        for i, job in enumerate(jobs):
+            if id(job[0]) not in picklable_models:
+                picklable_models[id(job[0])] = _is_picklable(job[0])
+            if picklable_models[id(job[0])]:
+                remote.append(i)
+        if len(remote) < len(jobs):
+            log.info(f'{len(jobs) - len(remote)} fits cannot be pickled and '
+                     f'are done in the calling process.')
+        if len(remote) > 1:
+            _fit_in_processes(jobs, remote, results, n_workers)
+
+    for i, job in enumerate(jobs):
+        if results[i] is None:
+            results[i] = _fit(*job)
+    return results
+
+
+def _fit(model, guess_pars, fit_xvals, fit_yvals, fit_kwargs):
+    t0 = time.perf_counter()
+    fit_res = model.fit(**fit_xvals, **fit_yvals, params=guess_pars,
+                        **fit_kwargs)
+    return fit_res, time.perf_counter() - t0
+
+
+def _fit_chunk(jobs):
+    """
+    Fits a list of jobs in a worker process. Failed fits are returned as
+    None and repeated in the calling process, where errors are raised as
+    for serial fitting.
+    """
+    results = []
+    for job in jobs:
+        try:
+            results.append(_fit(*job))
+        except Exception:
+            results.append(None)
+    return results
+
+
+def _fit_in_processes(jobs, remote, results, n_workers):
+    # a few chunks per worker balance the load while keeping the overhead
+    # of the inter-process communication small
+    n_chunks = min(len(remote), 4 * n_workers)
+    chunks = [remote[k::n_chunks] for k in range(n_chunks)]
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futures = []
+            for chunk in chunks:
+                try:
+                    futures.append(ex.submit(_fit_chunk,
+                                             [jobs[i] for i in chunk]))
+                except Exception as e:
+                    log.warning(f'Could not submit fits to worker process, '
+                                f'fitting in the calling process instead: '
+                                f'{e}')
+                    futures.append(None)
+            for chunk, future in zip(chunks, futures):
+                if future is None:
+                    continue
+                try:
+                    for i, res in zip(chunk, future.result()):
+                        results[i] = res
+                except Exception as e:
+                    log.warning(f'Fitting in worker process failed, fitting '
+                                f'in the calling process instead: {e}')
+    except (OSError, RuntimeError) as e:
+        log.warning(f'Could not start worker processes, fitting serially: '
+                    f'{e}')
+
+
+def _is_picklable(obj):
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
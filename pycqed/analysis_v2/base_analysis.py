@@ -15,11 +15,13 @@ from pycqed.analysis import analysis_toolbox as a_tools
 from pycqed.utilities.general import NumpyJsonEncoder
 from pycqed.analysis.analysis_toolbox import get_color_order as gco
 from pycqed.analysis.analysis_toolbox import get_color_list
+from pycqed.analysis.tools import batch_fitting, parallel_fitting
 from pycqed.analysis.tools.plotting import (
     set_axis_label, flex_colormesh_plot_vs_xy, flex_color_plot_vs_x)
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 import datetime
 import json
+import time
 import lmfit
 import h5py
 from pycqed.measurement.hdf5_data import write_dict_to_hdf5
@@ -124,6 +126,9 @@ class BaseDataAnalysis(object):
                                 -'msmt_label'
                                 -'do_individual_traces'
                                 -'exact_label_match'
+                                -'batch_fitting'
+                                -'fit_executor'
+                                -'fit_n_workers'
         :param extract_only: Should we also do the plots?
         :param do_fitting: Should the run_fitting method be executed?
         '''
@@ -578,50 +583,143 @@ class BaseDataAnalysis(object):
         based on the fit_dict options.
         Only model fitting is implemented here. Minimizing fitting should
         be implemented here.
+
+        If the option 'batch_fitting' is True, fit_dicts which share the
+        same model instance and independent variables are fitted together
+        with pycqed.analysis.tools.batch_fitting.batch_fit. Fits which cannot
+        be treated in a batch are done individually.
+
+        The individual fits are independent and are distributed over a pool
+        of worker processes if the option 'fit_executor' is 'processes'
+        (default: 'serial'). The number of processes can be set with the
+        option 'fit_n_workers' (default: number of CPUs). The time spent on
+        each fit is stored in the entry 'fit_time' of its fit_dict.
         '''
         if self.fit_res is None:
             self.fit_res = {}
+        prepared_fits = OrderedDict()
         for key, fit_dict in self.fit_dicts.items():
-            guess_dict = fit_dict.get('guess_dict', None)
-            guess_pars = fit_dict.get('guess_pars', None)
-            guessfn_pars = fit_dict.get('guessfn_pars', {})
-            fit_yvals = fit_dict['fit_yvals']
-            fit_xvals = fit_dict['fit_xvals']
-
-            model = fit_dict.get('model', None)
-            if model is None:
-                fit_fn = fit_dict.get('fit_fn', None)
-                model = fit_dict.get('model', lmfit.Model(fit_fn))
-            fit_guess_fn = fit_dict.get('fit_guess_fn', None)
-            if fit_guess_fn is None and fit_dict.get('fit_guess', True):
-                fit_guess_fn = model.guess
-
-            if guess_pars is None:
-                if fit_guess_fn is not None:
-                    # a fit function should return lmfit parameter objects
-                    # but can also work by returning a dictionary of guesses
-                    guess_pars = fit_guess_fn(**fit_yvals, **fit_xvals, **guessfn_pars)
-                    if not isinstance(guess_pars, lmfit.Parameters):
-                        for gd_key, val in list(guess_pars.items()):
-                            model.set_param_hint(gd_key, **val)
-                        guess_pars = model.make_params()
-
-                    if guess_dict is not None:
-                        for gd_key, val in guess_dict.items():
-                            for attr, attr_val in val.items():
-                                # e.g. setattr(guess_pars['frequency'], 'value', 20e6)
-                                setattr(guess_pars[gd_key], attr, attr_val)
-                    # A guess can also be specified as a dictionary.
-                    # additionally this can be used to overwrite values
-                    # from the guess functions.
-                elif guess_dict is not None:
-                    for key, val in list(guess_dict.items()):
-                        model.set_param_hint(key, **val)
-                    guess_pars = model.make_params()
-            fit_dict['fit_res'] = model.fit(**fit_xvals, **fit_yvals,
-                                            params=guess_pars)
+            prepared_fits[key] = self._prepare_fit(fit_dict)
+
+        if self.get_param_value('batch_fitting', False):
+            self._run_batch_fitting(prepared_fits)
+
+        jobs = [(model, guess_pars, self.fit_dicts[key]['fit_xvals'],
+                 self.fit_dicts[key]['fit_yvals'], {})
+                for key, (model, guess_pars) in prepared_fits.items()]
+        results = parallel_fitting.fit_jobs(
+            jobs, executor=self.get_param_value('fit_executor', 'serial'),
+            n_workers=self.get_param_value('fit_n_workers', None))
+        for key, (fit_res, fit_time) in zip(prepared_fits, results):
+            self.fit_dicts[key]['fit_res'] = fit_res
+            self.fit_dicts[key]['fit_time'] = fit_time
 
+        for key, fit_dict in self.fit_dicts.items():
             self.fit_res[key] = fit_dict['fit_res']
+        if self.verbose and len(self.fit_dicts):
+            fit_times = {k: fd['fit_time'] for k, fd in self.fit_dicts.items()}
+            slowest = max(fit_times, key=fit_times.get)
+            print(f'Fitted {len(fit_times)} fit_dicts in '
+                  f'{sum(fit_times.values()):.3f} s, slowest: {slowest} '
+                  f'({fit_times[slowest]:.3f} s)')
+
+    @staticmethod
+    def _prepare_fit(fit_dict):
+        """
+        Returns the model and the guess parameters for the fit specified by
+        fit_dict.
+        """
+        guess_dict = fit_dict.get('guess_dict', None)
+        guess_pars = fit_dict.get('guess_pars', None)
+        guessfn_pars = fit_dict.get('guessfn_pars', {})
+        fit_yvals = fit_dict['fit_yvals']
+        fit_xvals = fit_dict['fit_xvals']
+
+        model = fit_dict.get('model', None)
+        if model is None:
+            fit_fn = fit_dict.get('fit_fn', None)
+            model = fit_dict.get('model', lmfit.Model(fit_fn))
+        fit_guess_fn = fit_dict.get('fit_guess_fn', None)
+        if fit_guess_fn is None and fit_dict.get('fit_guess', True):
+            fit_guess_fn = model.guess
+
+        if guess_pars is None:
+            if fit_guess_fn is not None:
+                # a fit function should return lmfit parameter objects
+                # but can also work by returning a dictionary of guesses
+                guess_pars = fit_guess_fn(**fit_yvals, **fit_xvals, **guessfn_pars)
+                if not isinstance(guess_pars, lmfit.Parameters):
+                    for gd_key, val in list(guess_pars.items()):
+                        model.set_param_hint(gd_key, **val)
+                    guess_pars = model.make_params()
+
+                if guess_dict is not None:
+                    for gd_key, val in guess_dict.items():
+                        for attr, attr_val in val.items():
+                            # e.g. setattr(guess_pars['frequency'], 'value', 20e6)
+                            setattr(guess_pars[gd_key], attr, attr_val)
+                # A guess can also be specified as a dictionary.
+                # additionally this can be used to overwrite values
+                # from the guess functions.
+            elif guess_dict is not None:
+                for gd_key, val in list(guess_dict.items()):
+                    model.set_param_hint(gd_key, **val)
+                guess_pars = model.make_params()
+        return model, guess_pars
+
+    def _run_batch_fitting(self, prepared_fits):
+        """
+        Fits the fit_dicts in groups sharing the same model instance and
+        independent variables with batch_fitting.batch_fit. The fit results
+        are stored in the fit_dicts and the corresponding entries are
+        removed from prepared_fits.
+
+        Args:
+            prepared_fits (OrderedDict): model and guess parameters for each
+                key of self.fit_dicts, see _prepare_fit.
+        """
+        groups = []
+        for key, (model, guess_pars) in prepared_fits.items():
+            fit_dict = self.fit_dicts[key]
+            if guess_pars is None or len(fit_dict['fit_yvals']) != 1:
+                continue
+            for group in groups:
+                group_dict = self.fit_dicts[group[0]]
+                if prepared_fits[group[0]][0] is model and \
+                        self._same_xvals(group_dict['fit_xvals'],
+                                         fit_dict['fit_xvals']):
+                    group.append(key)
+                    break
+            else:
+                groups.append([key])
+
+        for group in groups:
+            if len(group) < 2:
+                continue
+            model = prepared_fits[group[0]][0]
+            t0 = time.perf_counter()
+            results = batch_fitting.batch_fit(
+                model, [prepared_fits[key][1] for key in group],
+                [next(iter(self.fit_dicts[key]['fit_yvals'].values()))
+                 for key in group],
+                self.fit_dicts[group[0]]['fit_xvals'])
+            # each fit is attributed an equal share of the batch
+            fit_time = (time.perf_counter() - t0) / len(group)
+            for key, fit_res in zip(group, results):
+                if fit_res is not None:
+                    self.fit_dicts[key]['fit_res'] = fit_res
+                    self.fit_dicts[key]['fit_time'] = fit_time
+                    del prepared_fits[key]
+
+    @staticmethod
+    def _same_xvals(xvals_0, xvals_1):
+        if xvals_0.keys() != xvals_1.keys():
+            return False
+        for k in xvals_0:
+            x0, x1 = np.asarray(xvals_0[k]), np.asarray(xvals_1[k])
+            if x0.shape != x1.shape or not np.array_equal(x0, x1):
+                return False
+        return True
 
     def save_fit_results(self):
         """
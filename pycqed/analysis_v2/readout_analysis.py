@@ -1561,9 +1561,16 @@ class MultiQubit_SingleShot_Analysis(ba.BaseDataAnalysis):
         Creates a general table of counts averaging out all but specified set of
         correlations.
 
-        This function has been check with a profiler and 85% of the time is
-        spent on comparison with the mask. Thus there is no trivial optimization
-        possible.
+        The thresholded results of all qubits (and readout shifts) appearing in
+        the observables are packed bitwise into one integer per shot, such
+        that the joint histogram of each readout is obtained at once. The
+        counts of each observable are then a sum over the occupied histogram
+        bins compatible with it. The histogram is dense (np.bincount) if it
+        has at most as many bins as there are shots per readout and sparse
+        (np.unique) otherwise, such that the memory is bounded by the number
+        of shots. If the packed shots would not fit into 64 bit integers, the
+        table is computed by comparing masks of all shots for every
+        observable instead.
 
         Args:
             shots_of_qubits: Dictionary of np.arrays of thresholded shots for
@@ -1585,6 +1592,89 @@ class MultiQubit_SingleShot_Analysis(ba.BaseDataAnalysis):
             np.array: counts with
                 dimensions (n_readouts, len(states_to_be_counted))
         """
+        # bit positions of the (qubit, shift) pairs and of the filter of each
+        # shift appearing in the observables
+        bit_keys = []
+        for states_of_qubits in observables:
+            for qubit in states_of_qubits:
+                key = qubit if isinstance(qubit, tuple) else (qubit, 0)
+                if key not in bit_keys:
+                    bit_keys.append(key)
+        shifts = list(np.unique([0] + [shift for _, shift in bit_keys]))
+        n_bits = len(bit_keys) + len(shifts)
+        if n_bits + int(n_readouts).bit_length() > 62:
+            return MultiQubit_SingleShot_Analysis._probability_table_masks(
+                shots_of_qubits, observables, n_readouts, filter)
+
+        n_shots = next(iter(shots_of_qubits.values())).shape[0]
+        if filter is not None:
+            filter = np.asarray(filter, dtype=bool).reshape(
+                (n_readouts, -1), order='F')
+        else:
+            # keep all shots
+            filter = np.ones((n_readouts, n_shots//n_readouts), dtype=bool)
+
+        # pack the shots: row i of the reshaped results is readout i and
+        # rolling by -shift gives the readout checked for a given shift
+        codes = np.zeros(filter.shape, dtype=np.int64)
+        for bit, (qubit, shift) in enumerate(bit_keys):
+            results = np.asarray(shots_of_qubits[qubit]).astype(bool).reshape(
+                (n_readouts, -1), order='F')
+            codes |= np.roll(results, -shift, axis=0).astype(np.int64) << bit
+        for i, shift in enumerate(shifts):
+            codes |= np.roll(filter, -shift, axis=0).astype(np.int64) << \
+                (len(bit_keys) + i)
+        codes += (np.arange(n_readouts) << n_bits)[:, np.newaxis]
+        if (1 << n_bits) <= filter.shape[1]:
+            histogram = np.bincount(codes.ravel(),
+                                    minlength=n_readouts << n_bits)
+            occupied = np.flatnonzero(histogram)
+            occupied_counts = histogram[occupied]
+        else:
+            occupied, occupied_counts = np.unique(codes, return_counts=True)
+        occupied_readouts = occupied >> n_bits
+        occupied_codes = occupied & ((1 << n_bits) - 1)
+
+        # sum the occupied histogram bins contributing to each observable,
+        # the shots have to pass the filter of every shift checked
+        counts = np.zeros((n_readouts, len(observables)))
+        denominator_shifts = np.zeros(len(observables), dtype=int)
+        for state_n, states_of_qubits in enumerate(observables):
+            mask, value = 0, 0
+            consistent = True
+            obs_shifts = {0} if len(states_of_qubits) == 0 else set()
+            for qubit, state in states_of_qubits.items():
+                key = qubit if isinstance(qubit, tuple) else (qubit, 0)
+                bit = 1 << bit_keys.index(key)
+                if mask & bit and bool(value & bit) != bool(state):
+                    consistent = False
+                mask |= bit
+                value |= bit if state else 0
+                obs_shifts.add(key[1])
+                denominator_shifts[state_n] = key[1]
+            for shift in obs_shifts:
+                bit = 1 << (len(bit_keys) + shifts.index(shift))
+                mask |= bit
+                value |= bit
+            if consistent:
+                selected = (occupied_codes & mask) == value
+                counts[:, state_n] = np.bincount(
+                    occupied_readouts[selected],
+                    weights=occupied_counts[selected], minlength=n_readouts)
+
+        filtered_shots = np.count_nonzero(filter, axis=1)
+        segs = (np.arange(n_readouts)[:, np.newaxis] +
+                denominator_shifts[np.newaxis, :]) % n_readouts
+        return counts / filtered_shots[segs]
+
+    @staticmethod
+    def _probability_table_masks(shots_of_qubits, observables, n_readouts,
+                                 filter=None):
+        """
+        Creates the table of counts of probability_table by comparing boolean
+        masks of all shots for every readout, observable and qubit. Used if
+        the shots cannot be packed into a joint histogram.
+        """
 
         res_e = {}
         res_g = {}
@@ -1609,7 +1699,12 @@ class MultiQubit_SingleShot_Analysis(ba.BaseDataAnalysis):
         for readout_n in range(n_readouts):
             # first result all ground
             for state_n, states_of_qubits in enumerate(observables):
-                mask = np.ones((n_shots//n_readouts), dtype=np.bool)
+                mask = np.ones((n_shots//n_readouts), dtype=bool)
+                # the denominator of an empty observable is the number of
+                # filtered shots of this readout
+                seg = readout_n
+                if len(states_of_qubits) == 0:
+                    mask = np.logical_and(mask, filter[seg])
                 # slow qubit is the first in channel_map list
                 for qubit, state in states_of_qubits.items():
                     if isinstance(qubit, tuple):
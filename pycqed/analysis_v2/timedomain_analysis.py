@@ -21,7 +21,8 @@ from pycqed.analysis.tools.plotting import SI_val_to_msg_str
 from copy import deepcopy
 from pycqed.measurement.calibration_points import CalibrationPoints
 import matplotlib.pyplot as plt
-from pycqed.analysis.three_state_rotation import predict_proba_avg_ro
+from pycqed.analysis.three_state_rotation import predict_proba_avg_ro, \
+    predict_proba_avg_ro_TwoD
 import logging
 
 from pycqed.utilities import math
@@ -620,27 +621,18 @@ class MultiQubit_TimeDomain_Analysis(ba.BaseDataAnalysis):
         rotated_data_dict = OrderedDict()
         rotated_data_dict[qb_name] = OrderedDict()
         cal_pts_idxs = list(cal_states_dict[qb_name].values())
-        cal_points_data = np.zeros((len(cal_pts_idxs), 2))
         if list(meas_res_dict) == channel_map[qb_name]:
             # two RO channels per qubit
-            raw_data_arr = meas_res_dict[list(meas_res_dict)[0]]
+            # raw data is (nr_sweep_points, nr_columns, 2)
+            raw_data = np.stack(list(meas_res_dict.values()), axis=-1)
+            cal_points_data = np.array([np.mean(raw_data[cal_idx], axis=0)
+                                        for cal_idx in cal_pts_idxs])
+            # rotated data is (nr_sweep_points, nr_columns, 3)
+            rotated_data = predict_proba_avg_ro_TwoD(
+                raw_data, np.swapaxes(cal_points_data, 0, 1))
             for i, state in enumerate(list(cal_states_dict[qb_name])):
-                rotated_data_dict[qb_name][f'p{state}'] = np.zeros(
-                    raw_data_arr.shape)
-            for col in range(raw_data_arr.shape[1]):
-                raw_data = np.concatenate([
-                    v[:, col].reshape(len(v[:, col]), 1) for
-                    v in meas_res_dict.values()], axis=1)
-                for i, cal_idx in enumerate(cal_pts_idxs):
-                    cal_points_data[i, :] = np.mean(raw_data[cal_idx, :],
-                                                    axis=0)
-                # rotated data is (raw_data_arr.shape[0], 3)
-                rotated_data = predict_proba_avg_ro(
-                    raw_data, cal_points_data)
-
-                for i, state in enumerate(list(cal_states_dict[qb_name])):
-                    rotated_data_dict[qb_name][f'p{state}'][:, col] = \
-                        rotated_data[:, i]
+                rotated_data_dict[qb_name][f'p{state}'] = \
+                    rotated_data[:, :, i]
         else:
             raise NotImplementedError('Calibration states rotation with 3 '
                                       'cal states only implemented for '
@@ -667,28 +659,19 @@ class MultiQubit_TimeDomain_Analysis(ba.BaseDataAnalysis):
             # one RO channel per qubit
             raw_data_arr = meas_res_dict[list(meas_res_dict)[0]]
             rotated_data_dict[qb_name][data_to_fit[qb_name]] = \
-                deepcopy(raw_data_arr.transpose())
-            for col in range(raw_data_arr.shape[1]):
-                rotated_data_dict[qb_name][data_to_fit[qb_name]][col] = \
-                    a_tools.rotate_and_normalize_data_1ch(
-                        data=raw_data_arr[:, col],
-                        cal_zero_points=cal_zero_points,
-                        cal_one_points=cal_one_points)
+                a_tools.rotate_and_normalize_data_1ch_TwoD(
+                    data=raw_data_arr,
+                    cal_zero_points=cal_zero_points,
+                    cal_one_points=cal_one_points).T
         elif list(meas_res_dict) == channel_map[qb_name]:
             # two RO channels per qubit
-            raw_data_arr = meas_res_dict[list(meas_res_dict)[0]]
-            rotated_data_dict[qb_name][data_to_fit[qb_name]] = \
-                deepcopy(raw_data_arr.transpose())
             if not global_PCA:
-                for col in range(raw_data_arr.shape[1]):
-                    data_array = np.array(
-                        [v[:, col] for v in meas_res_dict.values()])
-                    rotated_data_dict[qb_name][
-                            data_to_fit[qb_name]][col], _, _ = \
-                        a_tools.rotate_and_normalize_data_IQ(
-                            data=data_array,
-                            cal_zero_points=cal_zero_points,
-                            cal_one_points=cal_one_points)
+                data_array = np.array(list(meas_res_dict.values()))
+                rotated_data_dict[qb_name][data_to_fit[qb_name]] = \
+                    a_tools.rotate_and_normalize_data_IQ_TwoD(
+                        data=data_array,
+                        cal_zero_points=cal_zero_points,
+                        cal_one_points=cal_one_points)[0].T
             else:
                 data_array = np.array(
                     [v.flatten() for v in meas_res_dict.values()])
@@ -718,28 +701,19 @@ class MultiQubit_TimeDomain_Analysis(ba.BaseDataAnalysis):
                     # one RO ch per qubit
                     raw_data_arr = meas_res_dict[list(meas_res_dict)[i]]
                     rotated_data_dict[qb_name][ro_suf] = \
-                        deepcopy(raw_data_arr.transpose())
-                    for col in range(raw_data_arr.shape[1]):
-                        rotated_data_dict[qb_name][
-                            ro_suf][col] = \
-                            a_tools.rotate_and_normalize_data_1ch(
-                                data=raw_data_arr[:, col],
-                                cal_zero_points=cal_zero_points,
-                                cal_one_points=cal_one_points)
+                        a_tools.rotate_and_normalize_data_1ch_TwoD(
+                            data=raw_data_arr,
+                            cal_zero_points=cal_zero_points,
+                            cal_one_points=cal_one_points).T
                 else:
                     # two RO ch per qubit
-                    raw_data_arr = meas_res_dict[list(meas_res_dict)[i]]
+                    data_array = np.array(
+                        [v for k, v in meas_res_dict.items() if ro_suf in k])
                     rotated_data_dict[qb_name][ro_suf] = \
-                        deepcopy(raw_data_arr.transpose())
-                    for col in range(raw_data_arr.shape[1]):
-                        data_array = np.array(
-                            [v[:, col] for k, v in meas_res_dict.items()
-                             if ro_suf in k])
-                        rotated_data_dict[qb_name][ro_suf][col], _, _ = \
-                            a_tools.rotate_and_normalize_data_IQ(
-                                data=data_array,
-                                cal_zero_points=cal_zero_points,
-                                cal_one_points=cal_one_points)
+                        a_tools.rotate_and_normalize_data_IQ_TwoD(
+                            data=data_array,
+                            cal_zero_points=cal_zero_points,
+                            cal_one_points=cal_one_points)[0].T
         return rotated_data_dict
 
     @staticmethod
@@ -2174,7 +2148,7 @@ class StateTomographyAnalysis(ba.BaseDataAnalysis):
             self.proc_data_dict['rho'] = rho_ls
             if self.options_dict.get('mle', False):
                 rho_mle = tomo.mle_tomography(
-                    all_mus, all_Fs, None,
+                    all_mus, all_Fs,
                     all_Omegas if self.get_param_value('use_covariance_matrix', False) else None,
                     rho_guess=rho_ls)
                 self.proc_data_dict['rho_mle'] = rho_mle
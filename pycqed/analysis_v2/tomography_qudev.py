@@ -88,14 +88,22 @@ def hermitian_traceless_basis(d: int) -> List[qtp.Qobj]:
 
 def mle_tomography(mus: np.ndarray, Fs: List[qtp.Qobj],
                    Omega: Optional[np.ndarray]=None,
-                   rho_guess: Optional[qtp.Qobj]=None) -> qtp.Qobj:
+                   rho_guess: Optional[qtp.Qobj]=None,
+                   max_iter: int=10000, tol: float=1e-10):
     """
     Executes a maximum likelihood fit to the measured observables, respecting
     the physicality constraints of the density matrix.
 
+    The weighted squared deviation of the expectation values is minimized
+    over the set of density matrices by an accelerated projected gradient
+    descent (FISTA with adaptive restart), see `mle_projected_gradient`.
+
     Args:
         mus: 1-dimensional numpy ndarray containing the measured expectation
-             values for the measurement operators Fs.
+             values for the measurement operators Fs. A 2-dimensional array
+             is interpreted as a batch of independent measurements (e.g.
+             bootstrap resamples) with the expectation values along the
+             second axis, which are reconstructed simultaneously.
         Fs: A list of the measurement operators (as qutip operators) that
             correspond to the expectation values in mus.
         Omega: The covariance matrix of the expectation values mu.
@@ -105,43 +113,123 @@ def mle_tomography(mus: np.ndarray, Fs: List[qtp.Qobj],
                If `None` is passed, then all measurements are assumed to have
                equal variances.
         rho_guess: The initial value of the density matrix for the iterative
-                   optimization algorithm.
-    Returns: The found density matrix as a qutip operator.
+                   optimization algorithm. In batch mode, this can be a list
+                   with an initial value for each measurement.
+        max_iter: Maximum number of iterations.
+        tol: The optimization stops when the Frobenius norm of the change of
+             all density matrices in an iteration is below this value.
+    Returns: The found density matrix as a qutip operator, or a list of
+             density matrices in batch mode.
     """
+    mus = np.asarray(mus, dtype=float)
+    batch = mus.ndim == 2
+    mus = np.atleast_2d(mus)
     d = Fs[0].shape[0]
     if Omega is None:
-        Omega = np.diag(np.ones(len(mus)))
+        OmegaInv = np.ones(mus.shape[1])
     elif len(Omega.shape) == 1:
-        Omega = np.diag(Omega)
-    OmegaInv = inv(Omega)
+        OmegaInv = 1 / np.asarray(Omega)
+    else:
+        OmegaInv = inv(Omega)
 
     if rho_guess is None:
-        params0 = np.ones(d * d)
+        rhos = np.tile(np.eye(d, dtype=complex) / d, (len(mus), 1, 1))
+    else:
+        if isinstance(rho_guess, qtp.Qobj):
+            rho_guess = [rho_guess] * len(mus)
+        rhos = project_density_matrix(np.array(
+            [convert_to_density_matrix(rho).full() for rho in rho_guess]))
+
+    rhos = mle_projected_gradient(mus, np.array([F.full() for F in Fs]),
+                                  OmegaInv, rhos, max_iter, tol)
+    rhos = [qtp.Qobj(rho) for rho in rhos]
+    return rhos if batch else rhos[0]
+
+
+def mle_projected_gradient(mus: np.ndarray, Fs: np.ndarray,
+                           OmegaInv: np.ndarray, rhos: np.ndarray,
+                           max_iter: int=10000, tol: float=1e-10) \
+        -> np.ndarray:
+    """
+    Minimizes (mus - p)^T OmegaInv (mus - p), with p_i = Tr(rho F_i), over
+    the set of density matrices rho, for a batch of measurements.
+
+    Since the cost function is a convex quadratic function of rho and the
+    set of density matrices is convex, the accelerated projected gradient
+    descent converges to the global minimum. The measurement operators are
+    stacked into a single matrix, such that an iteration for all
+    measurements of the batch consists of two matrix products and the
+    projection `project_density_matrix`.
+
+    Args:
+        mus: 2-dimensional array of the expectation values, the first axis
+             corresponds to the batch.
+        Fs: 3-dimensional array of the measurement operators.
+        OmegaInv: The inverse covariance matrix of the expectation values,
+                  or a 1-dimensional array of the inverse variances.
+        rhos: 3-dimensional array of the initial density matrices for each
+              measurement of the batch.
+        max_iter: Maximum number of iterations.
+        tol: Tolerance for the Frobenius norm of the change of the density
+             matrices in an iteration.
+    Returns: 3-dimensional array of the found density matrices.
+    """
+    n, d = Fs.shape[:2]
+    nr_batch = len(mus)
+    # p_i = Tr(rho F_i) = vec(rho) . vec(F_i^T)
+    Fvec = Fs.transpose(0, 2, 1).reshape(n, d * d)
+    Freal = np.concatenate([Fvec.real, -Fvec.imag], axis=1)
+
+    def weigh(r):
+        return r * OmegaInv if OmegaInv.ndim == 1 else r @ OmegaInv
+
+    # the gradient of the cost function is Lipschitz continuous with
+    # constant 2 * max eigenvalue of Freal^T OmegaInv Freal
+    step = 0.5 / np.linalg.eigvalsh(weigh(Freal.T) @ Freal)[-1]
+
+    x = rhos
+    y = rhos
+    t = np.ones(nr_batch)
+    for _ in range(max_iter):
+        p = (y.reshape(nr_batch, d * d) @ Fvec.T).real
+        grad = (weigh(-2 * (mus - p)) @ Fvec.conj()).reshape(nr_batch, d, d)
+        x_new = project_density_matrix(y - step * grad)
+        dx = x_new - x
+        # restart the momentum where it points against the gradient
+        restart = np.einsum('bij,bij->b', (y - x_new).conj(), dx).real > 0
+        t[restart] = 1
+        t_new = (1 + np.sqrt(1 + 4 * t ** 2)) / 2
+        y = x_new + ((t - 1) / t_new)[:, None, None] * dx
+        x, t = x_new, t_new
+        if np.linalg.norm(dx, axis=(1, 2)).max() < tol:
+            break
     else:
-        rho_positive = rho_guess - min(rho_guess.eigenenergies().min(), 0)
-        rho_positive += 1e-9
-        T = np.linalg.cholesky(rho_positive.data.toarray())
-        params0 = np.real(np.concatenate((T[np.tril_indices(d)],
-                                          -1j*T[np.tril_indices(d, -1)])))
-
-    def min_func(params, mus, Fs, OmegaInv, d):
-        T = ltriag_matrix(params, d)
-        rho = T * T.dag()
-        dmus = mus.copy()
-        for i, F in enumerate(Fs):
-            dmus[i] -= (rho * F).tr().real
-        return (dmus.T.dot(OmegaInv).dot(dmus)).real
-
-    def constr_func(params, d):
-        T = ltriag_matrix(params, d)
-        rho = T * T.dag()
-        return rho.tr().real - 1
-
-    params = sp.optimize.minimize(min_func, params0, (mus, Fs, OmegaInv, d),
-                                  method='SLSQP', constraints={'type': 'eq',
-                                      'fun': constr_func, 'args': (d, )}).x
-    T = ltriag_matrix(params, d)
-    return T * T.dag()
+        logging.warning('MLE tomography did not converge in {} iterations.'
+                        .format(max_iter))
+    return x
+
+
+def project_density_matrix(rhos: np.ndarray) -> np.ndarray:
+    """
+    Returns the density matrices closest (in Frobenius norm) to the
+    matrices in rhos, by projecting the eigenvalues of their Hermitian part
+    onto the probability simplex.
+
+    Args:
+        rhos: Array of matrices, the last two axes correspond to the matrix
+              indices.
+    Returns: Array of density matrices of the same shape as rhos.
+    """
+    rhos = (rhos + rhos.conj().swapaxes(-1, -2)) / 2
+    vals, vecs = np.linalg.eigh(rhos)
+    # Euclidean projection onto the simplex, see e.g. arXiv:1309.1541
+    u = vals[..., ::-1]
+    css = np.cumsum(u, axis=-1) - 1
+    cond = u - css / np.arange(1, u.shape[-1] + 1) > 0
+    r = cond.shape[-1] - 1 - np.argmax(cond[..., ::-1], axis=-1)
+    theta = np.take_along_axis(css, r[..., None], axis=-1) / (r[..., None] + 1)
+    vals = np.maximum(vals - theta, 0)
+    return (vecs * vals[..., None, :]) @ vecs.conj().swapaxes(-1, -2)
 
 
 def ltriag_matrix(params: np.ndarray, d: int):
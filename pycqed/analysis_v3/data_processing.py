@@ -174,6 +174,56 @@ def classify_gm(data_dict, keys_out, keys_in, **params):
     # return data_dict
 
 
+def _get_classified_data(data_dict, classified_data):
+    """
+    Returns the entry of classified_data if it is an array, or the array in
+    data_dict if it is a key.
+    """
+    # Check if the entry in classified_data is an array or a string
+    # denoting a key in the data_dict
+    if isinstance(classified_data, str):
+        if classified_data in data_dict:
+            return data_dict[classified_data]
+        else:
+            raise KeyError(f'{classified_data} not found in data_dict.')
+    return classified_data
+
+
+def _get_preselection_mask(classif_data, presel_ro_idxs=None,
+                           presel_period=None, presel_condition=0):
+    """
+    Returns a boolean array which is False for the preselection readouts and
+    for the readouts whose last preceding preselection readout does not
+    satisfy presel_condition, and True otherwise.
+    :param classif_data: array of 0,1 for qubit, and 0,1,2 for qutrit
+    :param presel_ro_idxs: function of the readout index specifying which
+        entries are preselection readouts. It is evaluated once on the array
+        of all indices, and only called for every index separately if it
+        does not support arrays.
+    :param presel_period: if given, every presel_period-th readout, starting
+        with the first one, is a preselection readout. Overrides
+        presel_ro_idxs.
+    :param presel_condition: 0, 1 (, or 2 for qutrit)
+    """
+    classif_data = np.asarray(classif_data)
+    idxs = np.arange(len(classif_data))
+    if presel_period is not None:
+        is_presel = idxs % presel_period == 0
+    else:
+        if presel_ro_idxs is None:
+            presel_ro_idxs = lambda idx: idx % 2 == 0
+        try:
+            is_presel = np.broadcast_to(presel_ro_idxs(idxs), idxs.shape)
+        except (TypeError, ValueError):
+            is_presel = np.array([presel_ro_idxs(idx) for idx in idxs])
+        is_presel = is_presel.astype(bool)
+
+    # index of the last preselection readout up to each readout, -1 if none
+    last_presel = np.maximum.accumulate(np.where(is_presel, idxs, -1))
+    passed = classif_data[np.maximum(last_presel, 0)] == presel_condition
+    return np.logical_not(is_presel) & ((last_presel < 0) | passed)
+
+
 def do_preselection(data_dict, classified_data, keys_out, **params):
     """
     Keeps only the data for which the preselection readout data in
@@ -187,7 +237,11 @@ def do_preselection(data_dict, classified_data, keys_out, **params):
                     data_dict for the processed data to be saved into
     :param params: keyword arguments.:
         presel_ro_idxs (function, default: lambda idx: idx % 2 == 0):
-            specifies which (classified) data entry is a preselection ro
+            specifies which (classified) data entry is a preselection ro.
+            Evaluated once on the array of all indices if possible.
+        presel_period (int, default: None): if given, every
+            presel_period-th readout, starting with the first one, is a
+            preselection ro. Overrides presel_ro_idxs.
         keys_in (list): list of key names or dictionary keys paths in
             data_dict for the data to be processed
         presel_condition (int, default: 0): 0, 1 (, or 2 for qutrit). Keeps
@@ -210,6 +264,7 @@ def do_preselection(data_dict, classified_data, keys_out, **params):
     keys_in = params.get('keys_in', None)
     presel_ro_idxs = hlp_mod.get_param('presel_ro_idxs', data_dict,
                                default_value=lambda idx: idx % 2 == 0, **params)
+    presel_period = hlp_mod.get_param('presel_period', data_dict, **params)
     presel_condition = hlp_mod.get_param('presel_condition', data_dict,
                                  default_value=0, **params)
     if keys_in is not None:
@@ -217,52 +272,75 @@ def do_preselection(data_dict, classified_data, keys_out, **params):
             raise ValueError('classified_data and keys_in do not have '
                              'the same length.')
         data_to_proc_dict = hlp_mod.get_data_to_process(data_dict, keys_in)
-        for i, keyi in enumerate(data_to_proc_dict):
-            # Check if the entry in classified_data is an array or a string
-            # denoting a key in the data_dict
-            if isinstance(classified_data[i], str):
-                if classified_data[i] in data_dict:
-                    classif_data = data_dict[classified_data[i]]
-                else:
-                    raise KeyError(
-                        f'{classified_data[i]} not found in data_dict.')
-            else:
-                classif_data = classified_data[i]
-
-            mask = np.zeros(len(data_to_proc_dict[keyi]))
-            val = True
-            for idx in range(len(data_to_proc_dict[keyi])):
-                if presel_ro_idxs(idx):
-                    val = (classif_data[idx] == presel_condition)
-                    mask[idx] = False
-                else:
-                    mask[idx] = val
-            preselected_data = data_to_proc_dict[keyi][mask]
-            hlp_mod.add_param(keys_out[i], preselected_data, data_dict,
-                                    update_key=params.get('update_key', False))
+        data_to_proc = list(data_to_proc_dict.values())
     else:
-        for i, keyo in enumerate(keys_out):
-            # Check if the entry in classified_data is an array or a string
-            # denoting a key in the data_dict
-            if isinstance(classified_data[i], str):
-                if classified_data[i] in data_dict:
-                    classif_data = data_dict[classified_data[i]]
-                else:
-                    raise KeyError(
-                        f'{classified_data[i]} not found in data_dict.')
-            else:
-                classif_data = classified_data[i]
-
-            mask = np.zeros(len(classif_data))
-            val = True
-            for idx in range(len(classif_data)):
-                if presel_ro_idxs(idx):
-                    val = (classif_data[idx] == 0)
-                    mask[idx] = False
-                else:
-                    mask[idx] = val
-            hlp_mod.add_param(keyo, classif_data[mask], data_dict,
-                                    update_key=params.get('update_key', False))
+        data_to_proc = [_get_classified_data(data_dict, cd)
+                        for cd in classified_data]
+
+    for i, keyo in enumerate(keys_out):
+        classif_data = _get_classified_data(data_dict, classified_data[i])
+        mask = _get_preselection_mask(classif_data, presel_ro_idxs,
+                                      presel_period, presel_condition)
+        hlp_mod.add_param(keyo, np.asarray(data_to_proc[i])[mask], data_dict,
+                          update_key=params.get('update_key', False))
+    return data_dict
+
+
+def do_joint_preselection(data_dict, classified_data, keys_out, **params):
+    """
+    Keeps only the data for which the preselection readout data of all
+    qubits in classified_data satisfies the preselection condition, i.e. the
+    same preselection mask is applied to all measurement objects.
+    :param data_dict: OrderedDict containing data to be processed and where
+                    processed data is to be stored
+    :param classified_data: list of arrays of 0,1 for qubit, and
+                    0,1,2 for qutrit, or list of keys pointing to the binary
+                    (or trinary) arrays in the data_dict
+    :param keys_out: list of key names or dictionary keys paths in
+                    data_dict for the processed data to be saved into
+    :param params: keyword arguments.:
+        presel_ro_idxs (function, default: lambda idx: idx % 2 == 0):
+            see do_preselection
+        presel_period (int, default: None): see do_preselection
+        keys_in (list): list of key names or dictionary keys paths in
+            data_dict for the data to be processed
+        presel_condition (int or list, default: 0): 0, 1 (, or 2 for
+            qutrit), or one such value for every entry in classified_data.
+
+    Assumptions:
+        - if any keyo in keys_out contains a '.' string, keyo is assumed to
+        indicate a path in the data_dict.
+        - if keys_in are given, len(keys_out) == len(keys_in), otherwise
+            len(keys_out) == len(classified_data)
+        - all arrays in classified_data and all data to be processed have
+            the same length
+    """
+    keys_in = params.get('keys_in', None)
+    presel_ro_idxs = hlp_mod.get_param('presel_ro_idxs', data_dict,
+                               default_value=lambda idx: idx % 2 == 0, **params)
+    presel_period = hlp_mod.get_param('presel_period', data_dict, **params)
+    presel_condition = hlp_mod.get_param('presel_condition', data_dict,
+                                 default_value=0, **params)
+    if keys_in is not None:
+        data_to_proc_dict = hlp_mod.get_data_to_process(data_dict, keys_in)
+        data_to_proc = list(data_to_proc_dict.values())
+    else:
+        data_to_proc = [_get_classified_data(data_dict, cd)
+                        for cd in classified_data]
+    if len(keys_out) != len(data_to_proc):
+        raise ValueError('keys_out and the data to be processed do not have '
+                         'the same length.')
+
+    classif_data = np.array([_get_classified_data(data_dict, cd)
+                             for cd in classified_data])
+    presel_condition = np.reshape(presel_condition, (-1, 1))
+    # a preselection readout passes if all qubits satisfy their condition
+    joint_data = np.all(classif_data == presel_condition, axis=0).astype(int)
+    mask = _get_preselection_mask(joint_data, presel_ro_idxs, presel_period,
+                                  presel_condition=1)
+    for keyo, data in zip(keys_out, data_to_proc):
+        hlp_mod.add_param(keyo, np.asarray(data)[mask], data_dict,
+                          update_key=params.get('update_key', False))
     return data_dict
 
 
@@ -376,6 +454,50 @@ def correct_readout(data_dict, keys_in, keys_out, state_prob_mtx, **params):
     return data_dict
 
 
+def predict_proba_from_cal_points(data_dict, keys_in, keys_out, **params):
+    """
+    Predicts for each single shot the probabilities of being in the states
+    of the calibration points, in the limit of narrow gaussians (see
+    a_tools.predict_gm_proba_from_cal_points).
+    :param data_dict: OrderedDict containing data to be processed and where
+                    processed data is to be stored
+    :param keys_in: list of key names or dictionary keys paths in
+                    data_dict for the data to be processed, one per
+                    readout channel
+    :param keys_out: list of key names or dictionary keys paths in
+                    data_dict for the processed data to be saved into, one
+                    per calibration state
+    :param params: keyword arguments:
+        cal_points_values (array): (n_cal_states, n_channels) array with
+            the mean of the readout signal of each calibration state in
+            each channel
+
+    Assumptions:
+        - keys_in correspond to the columns of cal_points_values and
+        keys_out to its rows.
+    """
+    cal_points_values = hlp_mod.get_param('cal_points_values', data_dict,
+                                          raise_error=True, **params)
+    cal_points_values = np.asarray(cal_points_values)
+    data_to_proc_dict = hlp_mod.get_data_to_process(data_dict, keys_in)
+
+    if len(data_to_proc_dict) != cal_points_values.shape[1]:
+        raise ValueError('keys_in and the columns of cal_points_values do '
+                         'not have the same length.')
+    if len(keys_out) != cal_points_values.shape[0]:
+        raise ValueError('keys_out and the rows of cal_points_values do '
+                         'not have the same length.')
+
+    data = np.stack(list(data_to_proc_dict.values()), axis=-1)
+    probas = a_tools.predict_gm_proba_from_cal_points(data,
+                                                      cal_points_values)
+    for i, keyo in enumerate(keys_out):
+        hlp_mod.add_param(
+            keyo, probas[:, i],
+            data_dict, update_key=params.get('update_key', False))
+    return data_dict
+
+
 def rotate_iq(data_dict, keys_in, keys_out=None, **params):
     """
     Rotates IQ data based on information in the CalibrationPoints objects.
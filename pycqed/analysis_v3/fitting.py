@@ -3,6 +3,7 @@ log = logging.getLogger(__name__)
 
 from pycqed.analysis_v3 import helper_functions as hlp_mod
 from pycqed.analysis import fitting_models as fit_mods
+from pycqed.analysis.tools import parallel_fitting
 from pycqed.analysis_v3 import saving as save_mod
 from collections import OrderedDict
 import numpy as np
@@ -20,6 +21,14 @@ def run_fitting(data_dict, keys_in='all', **params):
     Fits the data dicts in dat_dict['fit_dicts'] specified by keys_in.
     Only model fitting is implemented here. Minimizing fitting should
     be implemented here.
+
+    The fits are independent and are distributed over a pool of worker
+    processes if fit_executor is 'processes'. The time spent on each fit is
+    stored in the entry 'fit_time' of its fit_dict.
+    :param params: keyword arguments:
+        fit_executor (str, default: 'serial'): 'serial' or 'processes'
+        fit_n_workers (int, default: number of CPUs): number of processes
+        save_fit_results (bool, default: True): whether to save the results
     """
     fit_res_dict = {}
     if 'fit_dicts' not in data_dict:
@@ -31,12 +40,26 @@ def run_fitting(data_dict, keys_in='all', **params):
         fit_dicts = {fk: fd for fk, fd in data_dict['fit_dicts'].items() if
                      fk in keys_in}
 
-    for fit_key, fit_dict in fit_dicts.items():
-        fit_one_dict(fit_dict)
+    jobs = []
+    for fit_dict in fit_dicts.values():
+        model, guess_pars = prepare_fit_dict(fit_dict)
+        jobs.append((model, guess_pars, fit_dict['fit_xvals'],
+                     fit_dict['fit_yvals'], fit_dict.get('fit_kwargs', {})))
+    results = parallel_fitting.fit_jobs(
+        jobs, executor=hlp_mod.get_param('fit_executor', data_dict,
+                                         default_value='serial', **params),
+        n_workers=hlp_mod.get_param('fit_n_workers', data_dict, **params))
+
+    for (fit_key, fit_dict), (fit_res, fit_time) in zip(fit_dicts.items(),
+                                                        results):
+        fit_dict['fit_res'] = fit_res
+        fit_dict['fit_time'] = fit_time
         for par in fit_dict['fit_res'].params:
             if fit_dict['fit_res'].params[par].stderr is None:
                 fit_dict['fit_res'].params[par].stderr = 0
         fit_res_dict[fit_key] = fit_dict['fit_res']
+    log.debug('Fit times: ' + ', '.join(
+        [f'{fk}: {fd["fit_time"]:.3f} s' for fk, fd in fit_dicts.items()]))
 
     if params.get('save_fit_results', True):
         getattr(save_mod, 'save_fit_results')(data_dict, fit_res_dict,
@@ -47,6 +70,18 @@ def fit_one_dict(fit_dict, **params):
     """
     Does fitting to one fit_dict. Updates the fit_dict with the entry 'fit_res.'
     """
+    model, guess_pars = prepare_fit_dict(fit_dict)
+    fit_kwargs = fit_dict.get('fit_kwargs', {})
+    fit_dict['fit_res'] = model.fit(**fit_dict['fit_xvals'],
+                                    **fit_dict['fit_yvals'],
+                                    params=guess_pars, **fit_kwargs)
+
+
+def prepare_fit_dict(fit_dict):
+    """
+    Returns the model and the guess parameters for the fit specified by
+    fit_dict.
+    """
     guess_dict = fit_dict.get('guess_dict', None)
     guess_pars = fit_dict.get('guess_pars', None)
     guessfn_pars = fit_dict.get('guessfn_pars', {})
@@ -61,7 +96,6 @@ def fit_one_dict(fit_dict, **params):
     if fit_guess_fn is None and fit_dict.get('fit_guess', True):
         fit_guess_fn = model.guess
 
-    fit_kwargs = fit_dict.get('fit_kwargs', {})
     if guess_pars is None:
         if fit_guess_fn is not None:
             # a fit function should return lmfit parameter
@@ -88,8 +122,7 @@ def fit_one_dict(fit_dict, **params):
             for gd_key, val in list(guess_dict.items()):
                 model.set_param_hint(gd_key, **val)
             guess_pars = model.make_params()
-    fit_dict['fit_res'] = model.fit(**fit_xvals, **fit_yvals,
-                                    params=guess_pars, **fit_kwargs)
+    return model, guess_pars
 
 
 def prepare_cos_fit_dict(data_dict, keys_in=None, **params):
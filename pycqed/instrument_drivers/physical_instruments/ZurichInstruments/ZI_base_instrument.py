@@ -1241,17 +1241,37 @@ class ZI_base_instrument(Instrument):
         t1 = time.time()
         print('Set all waveforms to zeros in {:.1f} ms'.format(1.0e3*(t1-t0)))
 
-    def configure_awg_from_string(self, awg_nr: int, program_string: str, timeout: float=15):
+    def configure_awg_from_string(self, awg_nr: int, program_string: str,
+                                  timeout: float=15,
+                                  skip_if_unchanged: bool=False) -> bool:
         """
         Uploads a program string to one of the AWGs in a UHF-QA or AWG-8.
 
         This function is tested to work and give the correct error messages
         when compilation fails.
+
+        If skip_if_unchanged is True, the compilation is skipped if the CRC32
+        hash of the program string equals the one of the program that was
+        last uploaded to the AWG by this instrument object. This is only
+        valid if the program does not read waveforms from files, since
+        changed files would not be detected.
+
+        Returns True if the program was compiled and uploaded and False if
+        the compilation was skipped.
         """
 
         # Check that awg_nr is set in accordance with devtype
         self._check_awg_nr(awg_nr)
 
+        hash_val = crc32(program_string.encode('utf-8'))
+        if skip_if_unchanged and hash_val == self.get(
+                'awgs_{}_sequencer_program_crc32_hash'.format(awg_nr)):
+            print('AWG {} program unchanged, skipping compilation.'.format(
+                awg_nr))
+            return False
+        # invalidate the hash in case the compilation fails
+        self.set('awgs_{}_sequencer_program_crc32_hash'.format(awg_nr), 0)
+
         t0 = time.time()
         success_and_ready = False
 
@@ -1300,7 +1320,6 @@ class ZI_base_instrument(Instrument):
                     success_and_ready = True
                     break
 
-        hash_val = crc32(program_string.encode('utf-8'))
         self.set('awgs_{}_sequencer_program_crc32_hash'.format(awg_nr),
                  hash_val)
 
@@ -1315,6 +1334,8 @@ class ZI_base_instrument(Instrument):
         if self.get('awgs_{}_sequencer_memoryusage'.format(awg_nr)) > 1.0:
             log.warning('{}: Sequencer memory usage exceeds available instruction memory!'.format(self.devname))
 
+        return True
+
     def plot_dio_snapshot(self, bits=range(32)):
         raise NotImplementedError('Virtual method with no implementation!')
 
@@ -0,0 +1,93 @@
+'''
+Module containing a worker thread that executes tasks such as data writing
+and plot updates outside of the acquisition loop of MeasurementControl.
+'''
+import logging
+import queue
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class BackgroundWorker:
+    '''
+    Executes tasks in a worker thread in the order in which they were
+    submitted.
+
+    The queue of pending tasks is bounded. When it is full, submitting a
+    task blocks until the worker has caught up (backpressure), unless the
+    task is optional, in which case it is dropped. Exceptions raised by a
+    task are re-raised in the submitting thread by the next call of
+    submit or join.
+    '''
+
+    def __init__(self, maxsize: int=100, name: str='BackgroundWorker'):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._error = None
+        self._thread = threading.Thread(target=self._work, name=name,
+                                        daemon=True)
+        self._thread.start()
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                func, args, kwargs, optional = task
+                if self._error is not None:
+                    # skip remaining tasks after a failure
+                    continue
+                try:
+                    func(*args, **kwargs)
+                except Exception as e:
+                    if optional:
+                        log.warning(e)
+                    else:
+                        self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            e, self._error = self._error, None
+            raise e
+
+    def submit(self, func, *args, optional: bool=False, **kwargs):
+        '''
+        Schedules func(*args, **kwargs) for execution in the worker thread.
+
+        Args:
+            optional (bool): if True, the task is dropped if the queue is
+                full, and exceptions raised by it are only logged. Used for
+                tasks like plot updates that may be skipped.
+        '''
+        self._raise_error()
+        task = (func, args, kwargs, optional)
+        if optional:
+            try:
+                self._queue.put_nowait(task)
+            except queue.Full:
+                pass
+        else:
+            self._queue.put(task)
+
+    def join(self):
+        '''
+        Blocks until all submitted tasks have been executed.
+        '''
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        '''
+        Executes all submitted tasks and stops the worker thread.
+        '''
+        try:
+            self.join()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+
+    def is_alive(self):
+        return self._thread.is_alive()
@@ -5,6 +5,7 @@ Measurement Control.
 import numpy as np
 from copy import deepcopy
 import time
+from concurrent.futures import ThreadPoolExecutor
 from string import ascii_uppercase
 from pycqed.analysis import analysis_toolbox as a_tools
 from qcodes.instrument.parameter import _BaseParameter
@@ -278,6 +279,7 @@ class Sweep_pts_detector(Detector_Function):
 class Dummy_Detector_Soft(Soft_Detector):
 
     def __init__(self, delay=0, **kw):
+        super().__init__(**kw)
         self.set_kw()
         self.delay = delay
         self.detector_control = 'soft'
@@ -300,6 +302,7 @@ class Dummy_Detector_Soft_diff_shape(Soft_Detector):
     # For testing purpose, returns data in a slightly different shape
 
     def __init__(self, delay=0, **kw):
+        super().__init__(**kw)
         self.set_kw()
         self.delay = delay
         self.detector_control = 'soft'
@@ -398,6 +401,38 @@ class Function_Detector(Soft_Detector):
 # Zurich Instruments UHFQC detector functions
 # --------------------------------------------
 
+class _SampleBuffer:
+    """
+    Buffer for the vectors polled from an acquisition node. The memory is
+    preallocated for the expected number of samples and grows
+    geometrically if more samples arrive, such that appending is linear
+    in the total number of samples.
+    """
+    def __init__(self, size):
+        self._size = max(int(size), 1)
+        self._data = None
+        self.nr_samples = 0
+
+    def append(self, vector):
+        vector = np.asarray(vector)
+        n = self.nr_samples + len(vector)
+        if self._data is None:
+            self._data = np.empty(max(self._size, n),
+                                  dtype=np.result_type(float, vector))
+        elif n > len(self._data):
+            data = np.empty(max(n, 2 * len(self._data)),
+                            dtype=np.result_type(self._data, vector))
+            data[:self.nr_samples] = self._data[:self.nr_samples]
+            self._data = data
+        self._data[self.nr_samples:n] = vector
+        self.nr_samples = n
+
+    def get(self):
+        if self._data is None:
+            return np.array([])
+        return self._data[:self.nr_samples]
+
+
 class UHFQC_Base(Hard_Detector):
     """
     Base Class for all UHF detectors
@@ -419,6 +454,10 @@ class UHFQC_Base(Hard_Detector):
         self.UHF_map = {UHF.name: i
                    for UHF, i in zip(self.UHFs, range(len(self.detectors)))}
 
+    # bounds of the adaptive poll interval in seconds
+    poll_interval_min = 0.001
+    poll_interval_max = 0.05
+
     def poll_data(self):
         if self.AWG is not None:
             self.AWG.stop()
@@ -429,53 +468,68 @@ class UHFQC_Base(Hard_Detector):
         if self.AWG is not None:
             self.AWG.start()
 
-        acq_paths = {UHF.name: UHF._acquisition_nodes for UHF in self.UHFs}
-
-        data = {UHF.name: {k: [] for k, dummy in enumerate(UHF._acquisition_nodes)}
-                for UHF in self.UHFs}
-
-        # Acquire data
-        gotem = {UHF.name: [False] * len(UHF._acquisition_nodes) for UHF in
-                 self.UHFs}
-        accumulated_time = 0
-
-        while accumulated_time < self.UHFs[0].timeout() and \
-                not all(np.concatenate(list(gotem.values()))):
-            dataset = {}
-            for UHF in self.UHFs:
-                if not all(gotem[UHF.name]):
-                    time.sleep(0.01)
-                    dataset[UHF.name] = UHF.poll(0.01)
-            for UHFname in dataset.keys():
-                for n, p in enumerate(acq_paths[UHFname]):
-                    if p in dataset[UHFname]:
-                        for v in dataset[UHFname][p]:
-                            data[UHFname][n] = np.concatenate(
-                                (data[UHFname][n], v['vector']))
-
-                            if len(data[UHFname][n]) >= self.detectors[
-                                self.UHF_map[UHFname]].nr_sweep_points:
-                                gotem[UHFname][n] = True
-            accumulated_time += 0.01 * len(self.UHFs)
-
-        if not all(np.concatenate(list(gotem.values()))):
+        # Acquire data, polling all UHFs concurrently
+        t_stop = time.time() + self.UHFs[0].timeout()
+        if len(self.UHFs) == 1:
+            data = {self.UHFs[0].name: self._poll_UHF(self.UHFs[0], t_stop)}
+        else:
+            with ThreadPoolExecutor(max_workers=len(self.UHFs)) as executor:
+                futures = {UHF.name: executor.submit(self._poll_UHF, UHF,
+                                                     t_stop)
+                           for UHF in self.UHFs}
+            data = {UHFname: f.result() for UHFname, f in futures.items()}
+
+        gotem = [buf.nr_samples >= self.detectors[
+                     self.UHF_map[UHFname]].nr_sweep_points
+                 for UHFname, buffers in data.items() for buf in buffers]
+        if not all(gotem):
             for UHF in self.UHFs:
                 UHF.acquisition_finalize()
-                for n, c in enumerate(UHF._acquisition_nodes):
-                    if n in data[UHF.name]:
-                        n_swp = len(data[UHF.name][n])
-                        tot_swp = self.detectors[
-                            self.UHF_map[UHF.name]].nr_sweep_points
-                        log.info(f"\t: Channel {n}: Got {n_swp} of {tot_swp} "
-                                 f"samples")
-                raise TimeoutError("Error: Didn't get all results!")
-
-        data_raw = {UHF.name: np.array([data[UHF.name][key]
-                    for key in sorted(data[UHF.name].keys())]) for UHF in
-                    self.UHFs}
+                for n, buf in enumerate(data[UHF.name]):
+                    n_swp = buf.nr_samples
+                    tot_swp = self.detectors[
+                        self.UHF_map[UHF.name]].nr_sweep_points
+                    log.info(f"\t: Channel {n}: Got {n_swp} of {tot_swp} "
+                             f"samples")
+            raise TimeoutError("Error: Didn't get all results!")
+
+        data_raw = {UHFname: np.array([buf.get() for buf in buffers])
+                    for UHFname, buffers in data.items()}
 
         return data_raw
 
+    def _poll_UHF(self, UHF, t_stop):
+        """
+        Polls the acquisition nodes of UHF until the expected number of
+        samples has been acquired on all nodes or until t_stop.
+
+        The poll interval is reset to poll_interval_min whenever data
+        arrive and doubled (up to poll_interval_max) after each poll
+        without data, such that short acquisitions are read out quickly
+        and long ones do not keep the CPU busy.
+
+        Returns:
+            list of _SampleBuffer, one per acquisition node
+        """
+        nr_samples = self.detectors[self.UHF_map[UHF.name]].nr_sweep_points
+        buffers = [_SampleBuffer(nr_samples) for _ in UHF._acquisition_nodes]
+        poll_interval = self.poll_interval_min
+        while not all(buf.nr_samples >= nr_samples for buf in buffers):
+            if time.time() > t_stop:
+                break
+            dataset = UHF.poll(poll_interval)
+            got_data = False
+            for buf, p in zip(buffers, UHF._acquisition_nodes):
+                for v in dataset.get(p, []):
+                    buf.append(v['vector'])
+                    got_data = True
+            if got_data:
+                poll_interval = self.poll_interval_min
+            else:
+                poll_interval = min(2 * poll_interval,
+                                    self.poll_interval_max)
+        return buffers
+
     def finish(self):
         if self.AWG is not None:
             self.AWG.stop()
@@ -12,6 +12,7 @@ from pycqed.utilities.get_default_datadir import get_default_datadir
 from pycqed.measurement import sweep_functions as swf
 from pycqed.measurement.mc_parameter_wrapper import wrap_par_to_swf
 from pycqed.measurement.mc_parameter_wrapper import wrap_par_to_det
+from pycqed.measurement.background_worker import BackgroundWorker
 from pycqed.analysis.tools.data_manipulation import get_generation_means
 
 from qcodes.instrument.base import Instrument
@@ -94,6 +95,30 @@ class MeasurementControl(Instrument):
             parameter_class=ManualParameter,
             initial_value=False)
 
+        self.add_parameter(
+            'data_flush_interval', unit='s', vals=vals.Numbers(min_value=0),
+            docstring='Minimal time between two writes of the acquired data '
+            'to the datafile. The data are kept in memory in between and '
+            'are always written at the end of a measurement.',
+            parameter_class=ManualParameter,
+            initial_value=1)
+
+        self.add_parameter(
+            'background_writing', vals=vals.Bool(),
+            docstring='If True, writing data and instrument settings to the '
+            'datafile, live plot updates and instrument monitor updates are '
+            'executed in a worker thread, such that they do not stall the '
+            'acquisition. All data are written when run() returns.',
+            parameter_class=ManualParameter,
+            initial_value=False)
+        self.add_parameter(
+            'background_queue_size', vals=vals.Ints(1),
+            docstring='Maximal number of pending tasks of the background '
+            'worker. When exceeded, the acquisition waits for the worker '
+            '(backpressure) and pending plot updates are skipped.',
+            parameter_class=ManualParameter,
+            initial_value=100)
+
         self.add_parameter('instrument_monitor',
                            parameter_class=ManualParameter,
                            initial_value=None,
@@ -115,6 +140,7 @@ class MeasurementControl(Instrument):
         self._persist_xlabs = None
         self._persist_ylabs = None
         self._analysis_display = None
+        self._background_worker = None
 
     ##############################################
     # Functions used to control the measurements #
@@ -170,6 +196,7 @@ class MeasurementControl(Instrument):
         # needs to be defined here because of the with statement below
         return_dict = {}
         self.last_sweep_pts = None  # used to prevent resetting same value
+        self._data_buffer = None
 
         if self.skip_measurement():
             return return_dict
@@ -178,6 +205,10 @@ class MeasurementControl(Instrument):
                       datadir=self.datadir()) as self.data_object:
             if exp_metadata is not None:
                 self.save_exp_metadata(exp_metadata, self.data_object)
+            if self.background_writing():
+                self._background_worker = BackgroundWorker(
+                    maxsize=self.background_queue_size(),
+                    name='{} writer'.format(self.name))
             try:
                 self.check_keyboard_interrupt()
                 self.get_measurement_begintime()
@@ -203,6 +234,11 @@ class MeasurementControl(Instrument):
                                      .format(self.mode))
             except KeyboardFinish as e:
                 print(e)
+            finally:
+                try:
+                    self.finalize_dataset()
+                finally:
+                    self.stop_background_worker()
             result = self.dset[()]
             self.get_measurement_endtime()
             self.save_MC_metadata(self.data_object)  # timing labels etc
@@ -319,48 +355,37 @@ class MeasurementControl(Instrument):
         # Shape determining block #
         ###########################
 
-        datasetshape = self.dset.shape
         start_idx, stop_idx = self.get_datawriting_indices_update_ctr(new_data)
-        new_datasetshape = (np.max([datasetshape[0], stop_idx]),
-                            datasetshape[1])
-        self.dset.resize(new_datasetshape)
         len_new_data = stop_idx-start_idx
         if len(np.shape(new_data)) == 1:
-            old_vals = self.dset[start_idx:stop_idx,
-                                 len(self.sweep_functions)]
-            new_vals = ((new_data + old_vals*self.soft_iteration) /
-                        (1+self.soft_iteration))
-
-            self.dset[start_idx:stop_idx,
-                      len(self.sweep_functions)] = new_vals
+            self.store_data(start_idx, stop_idx, len(self.sweep_functions),
+                            new_data)
         else:
-            old_vals = self.dset[start_idx:stop_idx,
-                                 len(self.sweep_functions):]
-            new_vals = ((new_data + old_vals * self.soft_iteration) /
-                        (1 + self.soft_iteration))
-            self.dset[start_idx:stop_idx,
-                      len(self.sweep_functions):] = new_vals
+            self.store_data(start_idx, stop_idx,
+                            slice(len(self.sweep_functions), None), new_data)
         sweep_len = len(self.get_sweep_points().T)
 
         ######################
         # DATA STORING BLOCK #
         ######################
+        data = self._data_buffer
         if sweep_len == len_new_data:  # 1D sweep
-            self.dset[:, 0] = self.get_sweep_points().T
+            data[:stop_idx, 0] = self.get_sweep_points().T
         else:
             try:
                 if len(self.sweep_functions) != 1:
                     relevant_swp_points = self.get_sweep_points()[
                         start_idx:start_idx+len_new_data:]
-                    self.dset[start_idx:, 0:len(self.sweep_functions)] = \
+                    data[start_idx:stop_idx, 0:len(self.sweep_functions)] = \
                         relevant_swp_points
                 else:
-                    self.dset[start_idx:, 0] = self.get_sweep_points()[
+                    data[start_idx:stop_idx, 0] = self.get_sweep_points()[
                         start_idx:start_idx+len_new_data:].T
             except Exception:
                 # There are some cases where the sweep points are not
                 # specified that you don't want to crash (e.g. on -off seq)
                 pass
+        self.flush_data()
 
         self.check_keyboard_interrupt()
         self.update_instrument_monitor()
@@ -422,23 +447,12 @@ class MeasurementControl(Instrument):
         
         # used for next iteration
         self.last_sweep_pts = x
-        datasetshape = self.dset.shape
-        # self.iteration = datasetshape[0] + 1
 
         vals = self.detector_function.acquire_data_point()
         start_idx, stop_idx = self.get_datawriting_indices_update_ctr(vals)
-        # Resizing dataset and saving
-
-        new_datasetshape = (np.max([datasetshape[0], stop_idx]),
-                            datasetshape[1])
-        self.dset.resize(new_datasetshape)
         new_data = np.append(x, vals)
-
-        old_vals = self.dset[start_idx:stop_idx, :]
-        new_vals = ((new_data + old_vals*self.soft_iteration) /
-                    (1+self.soft_iteration))
-
-        self.dset[start_idx:stop_idx, :] = new_vals
+        self.store_data(start_idx, stop_idx, slice(None), new_data)
+        self.flush_data()
         # update plotmon
         self.check_keyboard_interrupt()
         self.update_instrument_monitor()
@@ -506,6 +520,7 @@ class MeasurementControl(Instrument):
 
         for attr in ['TwoD_array',
                      'dset',
+                     '_data_buffer',
                      'sweep_points',
                      'sweep_points_2D',
                      'sweep_functions',
@@ -623,7 +638,7 @@ class MeasurementControl(Instrument):
 
     def update_plotmon(self, force_update=False):
         # Note: plotting_max_pts takes precendence over force update
-        if self.live_plot_enabled() and (self.dset.shape[0] <
+        if self.live_plot_enabled() and (self._data_len <
                                          self.plotting_max_pts()):
             i = 0
             try:
@@ -639,14 +654,15 @@ class MeasurementControl(Instrument):
                     nr_sweep_funcs = len(self.sweep_function_names)
                     for y_ind in range(len(self.detector_function.value_names)):
                         for x_ind in range(nr_sweep_funcs):
-                            x = self.dset[:, x_ind]
-                            y = self.dset[:, nr_sweep_funcs+y_ind]
+                            x = self.get_data()[:, x_ind]
+                            y = self.get_data()[:, nr_sweep_funcs+y_ind]
 
                             self.curves[i]['config']['x'] = x
                             self.curves[i]['config']['y'] = y
                             i += 1
                     self._mon_upd_time = time.time()
-                    self.main_QtPlot.update_plot()
+                    self.run_in_background(self.main_QtPlot.update_plot,
+                                           optional=True)
             except Exception as e:
                 logging.warning(e)
 
@@ -692,7 +708,8 @@ class MeasurementControl(Instrument):
                 y_ind = int(i / self.xlen)
                 for j in range(len(self.detector_function.value_names)):
                     z_ind = len(self.sweep_functions) + j
-                    self.TwoD_array[y_ind, x_ind, j] = self.dset[i, z_ind]
+                    self.TwoD_array[y_ind, x_ind, j] = \
+                        self._data_buffer[i, z_ind]
                 self.secondary_QtPlot.traces[j]['config'][
                     'z'] = self.TwoD_array[:, :, j]
                 if (time.time() - self.time_last_2Dplot_update >
@@ -700,7 +717,8 @@ class MeasurementControl(Instrument):
                         or self.iteration == len(self.sweep_points) or
                         force_update):
                     self.time_last_2Dplot_update = time.time()
-                    self.secondary_QtPlot.update_plot()
+                    self.run_in_background(self.secondary_QtPlot.update_plot,
+                                           optional=True)
             except Exception as e:
                 logging.warning(e)
 
@@ -735,12 +753,13 @@ class MeasurementControl(Instrument):
                         self.plotting_interval() or force_update):
                     for j in range(len(self.detector_function.value_names)):
                         y_ind = len(self.sweep_functions) + j
-                        y = self.dset[:, y_ind]
+                        y = self.get_data()[:, y_ind]
                         x = range(len(y))
                         self.secondary_QtPlot.traces[j]['config']['x'] = x
                         self.secondary_QtPlot.traces[j]['config']['y'] = y
                         self.time_last_ad_plot_update = time.time()
-                        self.secondary_QtPlot.update_plot()
+                        self.run_in_background(
+                            self.secondary_QtPlot.update_plot, optional=True)
             except Exception as e:
                 logging.warning(e)
 
@@ -892,8 +911,8 @@ class MeasurementControl(Instrument):
                         ##########################################
                         for x_ind in range(nr_sweep_funcs):
 
-                            x = self.dset[:, x_ind]
-                            y = self.dset[:, y_ind]
+                            x = self.get_data()[:, x_ind]
+                            y = self.get_data()[:, y_ind]
 
                             self.curves[i]['config']['x'] = x
                             self.curves[i]['config']['y'] = y
@@ -917,7 +936,7 @@ class MeasurementControl(Instrument):
                         # Secondary plotmon
                         ##########################################
                         # Measured value vs function evaluation
-                        y = self.dset[:, y_ind]
+                        y = self.get_data()[:, y_ind]
                         x = range(len(y))
                         self.iter_traces[j]['config']['x'] = x
                         self.iter_traces[j]['config']['y'] = y
@@ -935,8 +954,10 @@ class MeasurementControl(Instrument):
                         self.iter_bever_traces[j]['config']['x'] = best_evals_idx
                         self.iter_bever_traces[j]['config']['y'] = best_func_val
 
-                    self.main_QtPlot.update_plot()
-                    self.secondary_QtPlot.update_plot()
+                    self.run_in_background(self.main_QtPlot.update_plot,
+                                           optional=True)
+                    self.run_in_background(self.secondary_QtPlot.update_plot,
+                                           optional=True)
 
                     self.time_last_ad_plot_update = time.time()
 
@@ -955,7 +976,7 @@ class MeasurementControl(Instrument):
                 y_ind = i
                 for j in range(len(self.detector_function.value_names)):
                     z_ind = len(self.sweep_functions) + j
-                    self.TwoD_array[y_ind, :, j] = self.dset[
+                    self.TwoD_array[y_ind, :, j] = self._data_buffer[
                         i*self.xlen:(i+1)*self.xlen, z_ind]
                     self.secondary_QtPlot.traces[j]['config']['z'] = \
                         self.TwoD_array[:, :, j]
@@ -964,7 +985,8 @@ class MeasurementControl(Instrument):
                         self.plotting_interval()
                         or self.iteration == len(self.sweep_points)/self.xlen):
                     self.time_last_2Dplot_update = time.time()
-                    self.secondary_QtPlot.update_plot()
+                    self.run_in_background(self.secondary_QtPlot.update_plot,
+                                           optional=True)
         except Exception as e:
             logging.warning(e)
 
@@ -985,7 +1007,31 @@ class MeasurementControl(Instrument):
     def update_instrument_monitor(self):
         if self.instrument_monitor() is not None:
             inst_mon = self.find_instrument(self.instrument_monitor())
-            inst_mon.update()
+            self.run_in_background(inst_mon.update, optional=True)
+
+    def run_in_background(self, func, *args, optional: bool=False):
+        '''
+        Executes func(*args) in the background worker if background_writing
+        is enabled during a measurement, and directly otherwise.
+
+        Args:
+            optional (bool): whether the task may be skipped if the worker
+                is busy (e.g. plot updates). Exceptions raised by optional
+                tasks in the worker are logged instead of raised.
+        '''
+        if self._background_worker is not None:
+            self._background_worker.submit(func, *args, optional=optional)
+        else:
+            func(*args)
+
+    def stop_background_worker(self):
+        '''
+        Waits until the background worker has executed all pending tasks
+        and stops it. Re-raises exceptions raised in the worker.
+        '''
+        if self._background_worker is not None:
+            worker, self._background_worker = self._background_worker, None
+            worker.close()
 
     ##################################
     # Small helper/utility functions #
@@ -1021,12 +1067,24 @@ class MeasurementControl(Instrument):
             data_group = self.data_object['Experimental Data']
         else:
             data_group = self.data_object.create_group('Experimental Data')
+        nr_cols = (len(self.sweep_functions) +
+                   len(self.detector_function.value_names))
+        # preallocated for the expected number of points to avoid resizing
+        # the dataset for every data point
+        nr_rows = self.get_expected_nr_datapoints()
+        # chunks of about 64 kB
+        chunk_rows = max(1, min(8192 // nr_cols, max(nr_rows, 1)))
         self.dset = data_group.create_dataset(
-            'Data', (0, len(self.sweep_functions) +
-                     len(self.detector_function.value_names)),
-            maxshape=(None, len(self.sweep_functions) +
-                      len(self.detector_function.value_names)),
+            'Data', (nr_rows, nr_cols),
+            maxshape=(None, nr_cols),
+            chunks=(chunk_rows, nr_cols),
             dtype='float64')
+        # in-memory copy of the data, used as soft average accumulator and
+        # written to the dataset in batches by flush_data
+        self._data_buffer = np.zeros((nr_rows, nr_cols))
+        self._data_len = 0
+        self._dirty_rows = None
+        self._last_flush_time = time.time()
         self.get_column_names()
         self.dset.attrs['column_names'] = h5d.encode_to_utf8(self.column_names)
         # Added to tell analysis how to extract the data
@@ -1041,6 +1099,90 @@ class MeasurementControl(Instrument):
         data_group.attrs['value_units'] = h5d.encode_to_utf8(
             self.detector_function.value_units)
 
+    def get_expected_nr_datapoints(self):
+        '''
+        Returns the number of rows of the dataset expected from the sweep
+        points, or 0 if it is not known before the measurement.
+        '''
+        if self.mode == 'adaptive':
+            return 0
+        try:
+            return len(self.get_sweep_points())
+        except Exception:
+            # some sweep functions only set the sweep points in prepare
+            return 0
+
+    def get_data(self):
+        '''
+        Returns the data acquired so far as an array with the same columns
+        as the dataset. The array is a view on the in-memory data of the
+        running measurement and must not be modified.
+        '''
+        return self._data_buffer[:self._data_len]
+
+    def store_data(self, start_idx, stop_idx, columns, new_data):
+        '''
+        Stores new_data in the rows start_idx to stop_idx and the specified
+        columns (int or slice) of the data, averaged with the data of
+        previous soft averages. The data are written to the dataset by
+        flush_data.
+        '''
+        if stop_idx > self._data_buffer.shape[0]:
+            # grow geometrically such that resizing is rare
+            new_rows = max(stop_idx, 2 * self._data_buffer.shape[0])
+            data = np.zeros((new_rows, self._data_buffer.shape[1]))
+            data[:self._data_len] = self._data_buffer[:self._data_len]
+            self._data_buffer = data
+        old_vals = self._data_buffer[start_idx:stop_idx, columns]
+        self._data_buffer[start_idx:stop_idx, columns] = (
+            (new_data + old_vals*self.soft_iteration) /
+            (1+self.soft_iteration))
+        self._data_len = max(self._data_len, stop_idx)
+        if self._dirty_rows is None:
+            self._dirty_rows = [start_idx, stop_idx]
+        else:
+            self._dirty_rows = [min(self._dirty_rows[0], start_idx),
+                                max(self._dirty_rows[1], stop_idx)]
+
+    def flush_data(self, force: bool=False):
+        '''
+        Writes the rows of the data modified since the last call to the
+        dataset if data_flush_interval has passed since the last write or
+        if force is True.
+        '''
+        if self._dirty_rows is None:
+            return
+        if not force and (time.time() - self._last_flush_time <
+                          self.data_flush_interval()):
+            return
+        start_idx, stop_idx = self._dirty_rows
+        # copy, as the buffer may change before the rows are written
+        self.run_in_background(
+            self._write_data_rows, start_idx,
+            self._data_buffer[start_idx:stop_idx].copy(),
+            self._data_buffer.shape[0])
+        self._dirty_rows = None
+        self._last_flush_time = time.time()
+
+    def _write_data_rows(self, start_idx, rows, nr_allocated_rows):
+        if self.dset.shape[0] < start_idx + len(rows):
+            self.dset.resize((nr_allocated_rows, self.dset.shape[1]))
+        self.dset[start_idx:start_idx + len(rows)] = rows
+
+    def finalize_dataset(self):
+        '''
+        Writes all remaining data to the dataset and truncates it to the
+        number of acquired rows.
+        '''
+        if self._data_buffer is None:
+            return
+        self.flush_data(force=True)
+        self.run_in_background(self._truncate_dataset, self._data_len)
+
+    def _truncate_dataset(self, nr_rows):
+        if self.dset.shape[0] != nr_rows:
+            self.dset.resize((nr_rows, self.dset.shape[1]))
+
     def create_experiment_result_dict(self):
         try:
             # only exists as an open dataset when running an
@@ -1166,20 +1308,34 @@ class MeasurementControl(Instrument):
 
             # Below is old style saving of snapshot, exists for the sake of
             # preserving deprecated functionality
-            set_grp = data_object.create_group('Instrument settings')
+            # The values are collected here, such that they reflect the
+            # settings at the start of the measurement, but may be written
+            # in the background.
+            settings = []
             inslist = dict_to_ordered_tuples(self.station.components)
             for (iname, ins) in inslist:
-                instrument_grp = set_grp.create_group(iname)
                 par_snap = ins.snapshot()['parameters']
                 parameter_list = dict_to_ordered_tuples(par_snap)
+                par_vals = []
                 for (p_name, p) in parameter_list:
                     try:
                         val = repr(p['value'])
                     except KeyError:
                         val = ''
-                    instrument_grp.attrs[p_name] = val
+                    par_vals.append((p_name, val))
+                settings.append((iname, par_vals))
+            self.run_in_background(self._write_instrument_settings,
+                                   data_object, settings)
         numpy.set_printoptions(**opt)
 
+    @staticmethod
+    def _write_instrument_settings(data_object, settings):
+        set_grp = data_object.create_group('Instrument settings')
+        for iname, par_vals in settings:
+            instrument_grp = set_grp.create_group(iname)
+            for p_name, val in par_vals:
+                instrument_grp.attrs[p_name] = val
+
     def save_MC_metadata(self, data_object=None, *args):
         '''
         Saves metadata on the MC (such as timings)
@@ -1232,7 +1388,7 @@ class MeasurementControl(Instrument):
 
     def print_progress(self, stop_idx=None):
         if self.verbose():
-            acquired_points = self.dset.shape[0]
+            acquired_points = self._data_len
             total_nr_pts = len(self.get_sweep_points())
             percdone = self.get_percdone()
             elapsed_time = time.time() - self.begintime
@@ -1254,7 +1410,7 @@ class MeasurementControl(Instrument):
         """
         Returns True if enough data has been acquired.
         """
-        acquired_points = self.dset.shape[0]
+        acquired_points = self._data_len
         total_nr_pts = np.shape(self.get_sweep_points())[0]
         if acquired_points < total_nr_pts:
             return False
@@ -1,7 +1,8 @@
 from pycqed.measurement.randomized_benchmarking.two_qubit_clifford_group \
     import SingleQubitClifford, TwoQubitClifford
 from os.path import join, dirname, abspath
-from os import mkdir, listdir
+from os import mkdir, listdir, getpid, replace, remove
+import logging
 import numpy as np
 from zlib import crc32
 
@@ -15,16 +16,23 @@ except FileExistsError:
 class CliffordLookuptables():
     def __init__(self):
         self.create_lut_files()
+        self._hash_indices = {}
+        self._ptm_tables = {}
+        self._inverse_tables = {}
 
     def __call__(self, pauli_transfer_matrix):
-        unique_hash = crc32(pauli_transfer_matrix.astype(int))
+        unique_hash = crc32(pauli_transfer_matrix.round().astype(int))
         if np.array_equal(np.shape(pauli_transfer_matrix), (4, 4)):
-            hash_table = self.get_single_qubit_clifford_hash_table()
+            hash_index = self.get_clifford_hash_index(number_of_qubits=1)
         elif np.array_equal(np.shape(pauli_transfer_matrix), (16, 16)):
-            hash_table = self.get_two_qubit_clifford_hash_table()
+            hash_index = self.get_clifford_hash_index(number_of_qubits=2)
         else:
             raise NotImplementedError()
-        idx = hash_table.index(unique_hash)
+        try:
+            idx = hash_index[unique_hash]
+        except KeyError:
+            raise ValueError('Pauli transfer matrix does not correspond to '
+                             'a Clifford.')
 
         return idx
 
@@ -62,6 +70,137 @@ class CliffordLookuptables():
             print('Opened two_qubit_hash_lut.txt.')
         return self.two_qubit_hash_table
 
+    def get_clifford_hash_index(self, number_of_qubits: int):
+        """
+        Returns a dict mapping the crc32 hash of a pauli transfer matrix to
+        the index of the corresponding Clifford. Allows O(1) lookups
+        instead of searching the hash table.
+        """
+        if number_of_qubits not in self._hash_indices:
+            if number_of_qubits == 1:
+                hash_table = self.get_single_qubit_clifford_hash_table()
+            elif number_of_qubits == 2:
+                hash_table = self.get_two_qubit_clifford_hash_table()
+            else:
+                raise NotImplementedError()
+            self._hash_indices[number_of_qubits] = {
+                h: idx for idx, h in enumerate(hash_table)}
+        return self._hash_indices[number_of_qubits]
+
+    def get_clifford_ptms(self, number_of_qubits: int):
+        """
+        Returns the pauli transfer matrices of all Cliffords of the one or
+        two qubit Clifford group stacked into a single int8 array of shape
+        (group size, 4**n, 4**n). The array is generated on first use and
+        cached in the hash_dir as a binary .npy file, which is generated
+        again if it cannot be read.
+
+        All entries of a Clifford PTM are 0 or +-1 and every row contains a
+        single non-zero entry, so products of these matrices can be
+        computed in int8 without overflow.
+        """
+        if number_of_qubits not in self._ptm_tables:
+            fn = join(hash_dir, self._ptm_file_name(number_of_qubits))
+            generator, group_size = self._clifford_generator(
+                number_of_qubits)
+            ptms = self._load_table(fn, (group_size, 4**number_of_qubits,
+                                         4**number_of_qubits), np.int8)
+            if ptms is None:
+                ptms = np.array(
+                    [generator(idx=idx).pauli_transfer_matrix.round()
+                     for idx in range(group_size)], dtype=np.int8)
+                self._save_table(fn, ptms)
+            self._ptm_tables[number_of_qubits] = ptms
+        return self._ptm_tables[number_of_qubits]
+
+    def get_clifford_inverse_table(self, number_of_qubits: int):
+        """
+        Returns an integer array containing at position i the index of the
+        inverse of Clifford i. The table is generated on first use and
+        cached in the hash_dir as a binary .npy file, which is generated
+        again if it cannot be read.
+        """
+        if number_of_qubits not in self._inverse_tables:
+            fn = join(hash_dir, self._inverse_file_name(number_of_qubits))
+            group_size = self._clifford_generator(number_of_qubits)[1]
+            inverse_table = self._load_table(fn, (group_size,), np.int16)
+            if inverse_table is None:
+                # PTMs of Cliffords are orthogonal, the inverse is the
+                # transpose
+                hash_index = self.get_clifford_hash_index(number_of_qubits)
+                ptms = self.get_clifford_ptms(number_of_qubits)
+                inverse_table = np.array(
+                    [hash_index[crc32(np.ascontiguousarray(ptm.T).astype(
+                        int))] for ptm in ptms], dtype=np.int16)
+                self._save_table(fn, inverse_table)
+            self._inverse_tables[number_of_qubits] = inverse_table
+        return self._inverse_tables[number_of_qubits]
+
+    def multiply(self, idx_0: int, idx_1: int, number_of_qubits: int):
+        """
+        Returns the index of the product Cl(idx_0)*Cl(idx_1), i.e. of the
+        Clifford idx_1 followed by the Clifford idx_0.
+        """
+        ptms = self.get_clifford_ptms(number_of_qubits)
+        return self(ptms[idx_0] @ ptms[idx_1])
+
+    @staticmethod
+    def _load_table(fn, shape, dtype):
+        """
+        Returns the array stored in the .npy file fn, or None if the file
+        does not exist, cannot be read (e.g. if it has been truncated) or
+        does not contain an array of the expected shape and dtype.
+        """
+        try:
+            table = np.load(fn)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError) as e:
+            logging.warning(f'Could not read {fn}, generating it again: {e}')
+            return None
+        if table.shape != shape or table.dtype != dtype:
+            logging.warning(f'Unexpected table in {fn}, generating it again.')
+            return None
+        return table
+
+    @staticmethod
+    def _save_table(fn, table):
+        """
+        Saves the array to the .npy file fn. The array is written to a
+        temporary file which then replaces fn, such that other processes
+        never read a partially written file.
+        """
+        tmp_fn = f'{fn}.{getpid()}.tmp'
+        try:
+            with open(tmp_fn, 'wb') as f:
+                np.save(f, table)
+            replace(tmp_fn, fn)
+        except OSError as e:
+            logging.warning(f'Could not save {fn}: {e}')
+            try:
+                remove(tmp_fn)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _clifford_generator(number_of_qubits: int):
+        if number_of_qubits == 1:
+            return SingleQubitClifford, 24
+        elif number_of_qubits == 2:
+            return TwoQubitClifford, 11520
+        else:
+            raise NotImplementedError()
+
+    @staticmethod
+    def _ptm_file_name(number_of_qubits: int):
+        return {1: 'single_qubit_ptms.npy',
+                2: 'two_qubit_ptms.npy'}[number_of_qubits]
+
+    @staticmethod
+    def _inverse_file_name(number_of_qubits: int):
+        return {1: 'single_qubit_inverse_lut.npy',
+                2: 'two_qubit_inverse_lut.npy'}[number_of_qubits]
+
     def construct_clifford_lookuptable(self, generator, indices):
         lookuptable = []
         for idx in indices:
@@ -196,11 +196,11 @@ def randomized_benchmarking_sequence(n_cl, desired_net_cl=0,
 
 def get_clifford_decomposition(decomposition_name: str):
 
-    if decomposition_name is 'HZ':
+    if decomposition_name == 'HZ':
         return HZ_gate_decomposition
-    elif decomposition_name is 'XY':
+    elif decomposition_name == 'XY':
         return XY_gate_decomposition
-    elif decomposition_name is '5Primitives':
+    elif decomposition_name == '5Primitives':
         return Five_primitives_decomposition
     else:
         raise ValueError('Specify a valid gate decomposition, "HZ", "XY",'
@@ -271,13 +271,15 @@ def randomized_benchmarking_sequence_new(
         rb_clif_ind_intl[1::2] = interleaving_cl
         rb_clifford_indices = rb_clif_ind_intl
 
-    # Calculate the net clifford
-    net_clifford = Cl(0)
+    # Calculate the net clifford by multiplying the cached pauli transfer
+    # matrices, the index is only looked up once at the end.
+    ptms = tqc.CLut.get_clifford_ptms(Cl.number_of_qubits)
+    net_ptm = ptms[0]
     for idx in rb_clifford_indices:
-        cliff = Cl(idx)
         # order of operators applied in is right to left, therefore
         # the new operator is applied on the left side.
-        net_clifford = cliff*net_clifford
+        net_ptm = ptms[idx] @ net_ptm
+    net_clifford = Cl(tqc.CLut(net_ptm))
 
     # determine the inverse of the sequence
     recovery_to_idx_clifford = net_clifford.get_inverse()
@@ -287,3 +289,204 @@ def randomized_benchmarking_sequence_new(
     return rb_clifford_indices
 
 
+##############################################################################
+# Batched RB sequences. All seeds, lengths and simultaneously driven qubits
+# are generated at once and the net cliffords are computed with vectorized
+# table lookups instead of a python loop over the sequence.
+##############################################################################
+
+_product_tables = {}
+# maximum size of the stacked two qubit pauli transfer matrices reduced at
+# once in calculate_net_cliffords
+_max_ptm_chunk_bytes = 2**26
+
+
+def get_clifford_product_table(number_of_qubits: int = 1):
+    """
+    Returns the multiplication table of the clifford group, i.e. an integer
+    array containing at position [i, j] the index of Cl(i)*Cl(j) (clifford j
+    followed by clifford i). Only available for the single qubit clifford
+    group, the two qubit table would contain 11520**2 entries.
+    """
+    if number_of_qubits != 1:
+        raise NotImplementedError()
+    if number_of_qubits not in _product_tables:
+        ptms = tqc.CLut.get_clifford_ptms(number_of_qubits)
+        _product_tables[number_of_qubits] = np.array(
+            [[tqc.CLut(ptm_i @ ptm_j) for ptm_j in ptms] for ptm_i in ptms],
+            dtype=np.int16)
+    return _product_tables[number_of_qubits]
+
+
+def calculate_net_cliffords(clifford_indices, number_of_qubits: int = 1):
+    """
+    Calculates the net clifford of many clifford sequences at once.
+
+    Args:
+        clifford_indices (array of ints): clifford indices, the sequences
+            run along the last axis in the order in which the cliffords are
+            applied in time.
+        number_of_qubits (int): 1 or 2, the clifford group the indices
+            refer to.
+    Returns:
+        array of ints of shape clifford_indices.shape[:-1]
+
+    The sequences are reduced pairwise, such that only log2(n_cl) vectorized
+    steps are needed. Index 0 (the identity) is used for padding. For two
+    qubits, the sequences are reduced in chunks to bound the memory of the
+    stacked pauli transfer matrices.
+    """
+    net_cl = np.asarray(clifford_indices, dtype=int)
+    if number_of_qubits == 1:
+        table = get_clifford_product_table(number_of_qubits)
+        while net_cl.shape[-1] > 1:
+            if net_cl.shape[-1] % 2:
+                net_cl = np.concatenate(
+                    [net_cl, np.zeros(net_cl.shape[:-1] + (1,), dtype=int)],
+                    axis=-1)
+            net_cl = table[net_cl[..., 1::2], net_cl[..., 0::2]].astype(int)
+        if net_cl.shape[-1] == 0:
+            return np.zeros(net_cl.shape[:-1], dtype=int)
+        return net_cl[..., 0]
+    elif number_of_qubits == 2:
+        # multiply the int8 pauli transfer matrices, which stay signed
+        # permutation matrices, and look up the index only at the end.
+        ptms = tqc.CLut.get_clifford_ptms(number_of_qubits)
+        n_cl = net_cl.shape[-1]
+        if n_cl == 0:
+            return np.zeros(net_cl.shape[:-1], dtype=int)
+        seqs = net_cl.reshape(-1, n_cl)
+        chunk = max(1, _max_ptm_chunk_bytes // (ptms[0].nbytes * n_cl))
+        net_cliffords = np.zeros(len(seqs), dtype=int)
+        for start in range(0, len(seqs), chunk):
+            net_ptm = ptms[seqs[start:start + chunk]]
+            while net_ptm.shape[1] > 1:
+                # the last matrix of an odd number is carried over
+                n_pairs = net_ptm.shape[1] // 2
+                products = net_ptm[:, 1:2*n_pairs:2] @ \
+                    net_ptm[:, 0:2*n_pairs:2]
+                if net_ptm.shape[1] % 2:
+                    products = np.concatenate([products, net_ptm[:, -1:]],
+                                              axis=1)
+                net_ptm = products
+            net_cliffords[start:start + chunk] = [
+                tqc.CLut(ptm) for ptm in net_ptm[:, 0]]
+        return net_cliffords.reshape(net_cl.shape[:-1])
+    else:
+        raise NotImplementedError()
+
+
+def calculate_recovery_cliffords(net_cliffords, desired_net_cl=0,
+                                 number_of_qubits: int = 1):
+    """
+    Vectorized version of calculate_recovery_clifford based on the clifford
+    objects: returns the indices of Cl(desired_net_cl)*Cl(net_cl)^-1 for
+    every entry of net_cliffords.
+    """
+    net_cliffords = np.asarray(net_cliffords, dtype=int)
+    inverse_table = tqc.CLut.get_clifford_inverse_table(number_of_qubits)
+    inverses = inverse_table[net_cliffords].astype(int)
+    if number_of_qubits == 1:
+        table = get_clifford_product_table(number_of_qubits)
+        return table[desired_net_cl, inverses].astype(int)
+    ptms = tqc.CLut.get_clifford_ptms(number_of_qubits)
+    rec_ptms = ptms[desired_net_cl] @ ptms[inverses.ravel()]
+    return np.array([tqc.CLut(ptm) for ptm in rec_ptms],
+                    dtype=int).reshape(net_cliffords.shape)
+
+
+def randomized_benchmarking_sequences(
+        n_seeds: int,
+        lengths,
+        nr_parallel: int = 1,
+        desired_net_cl: int = 0,
+        number_of_qubits: int = 1,
+        max_clifford_idx: int = 11520,
+        interleaving_cl: int = None,
+        seed: int = None):
+    """
+    Generates randomized benchmarking sequences for many seeds, sequence
+    lengths and simultaneously driven qubits (or qubit pairs) at once.
+
+    Args:
+        n_seeds        (int) : number of random sequences per length
+        lengths (list of ints): numbers of Cliffords
+        nr_parallel    (int) : number of independent sequences applied in
+            parallel, e.g. the number of qubits in simultaneous RB.
+        desired_net_cl (int) : idx of the desired net clifford
+        number_of_qubits(int): used to determine if Cliffords are drawn
+            from the single qubit or two qubit clifford group.
+        max_clifford_idx (int): used to set the index of the highest random
+            clifford generated.
+        interleaving_cl (int): interleaves the sequences with a specific
+            clifford if desired
+        seed           (int) : seed used to initialize the random number
+            generator.
+    Returns:
+        list containing for every length an integer array of shape
+        (n_seeds, nr_parallel, n_cl + 1) with the clifford indices. The last
+        entry along the last axis is the recovery clifford. With
+        interleaving the shape is (n_seeds, nr_parallel, 2*n_cl + 1).
+
+    Every sequence is equivalent to one generated by
+    randomized_benchmarking_sequence_new, but the net cliffords of all
+    sequences of a length are computed in a single vectorized reduction.
+    """
+    if number_of_qubits == 1:
+        group_size = np.min([24, max_clifford_idx])
+    elif number_of_qubits == 2:
+        group_size = np.min([11520, max_clifford_idx])
+    else:
+        raise NotImplementedError()
+    rng = np.random if seed is None else np.random.RandomState(seed)
+
+    lengths = [int(n_cl) for n_cl in np.atleast_1d(lengths)]
+    sequences = []
+    for n_cl in lengths:
+        seqs = rng.randint(0, group_size, (n_seeds, nr_parallel, n_cl))
+        if interleaving_cl is not None:
+            seqs = np.stack(
+                [seqs, np.full_like(seqs, interleaving_cl)],
+                axis=-1).reshape(n_seeds, nr_parallel, 2*n_cl)
+        # the lengths are reduced separately, since padding them to the
+        # longest one costs memory proportional to len(lengths)*max(lengths)
+        net_cliffords = calculate_net_cliffords(seqs, number_of_qubits)
+        recovery = calculate_recovery_cliffords(
+            net_cliffords, desired_net_cl, number_of_qubits)
+        sequences.append(np.concatenate(
+            [seqs, recovery[..., np.newaxis]], axis=-1))
+    return sequences
+
+
+def decompose_clifford_seqs(clifford_indices, gate_decomp='HZ',
+                            fill_value=''):
+    """
+    Array version of decompose_clifford_seq for single qubit cliffords.
+
+    Args:
+        clifford_indices (array of ints): clifford indices of arbitrary
+            shape, e.g. as returned by randomized_benchmarking_sequences.
+        gate_decomp (str): the physical decomposition for the Cliffords,
+            "HZ", "XY" or "5Primitives".
+        fill_value (str): pulse name used to pad decompositions shorter
+            than the longest one of the decomposition.
+    Returns:
+        array of pulse names of shape clifford_indices.shape + (m,) where m
+        is the maximum number of pulses per clifford, and a boolean mask of
+        the same shape which is False for the padding.
+
+    For a 2D array of sequences, pulses[i][mask[i]] are the pulses of
+    sequence i in time order, i.e. the same list as returned by
+    decompose_clifford_seq.
+    """
+    gate_decomposition = get_clifford_decomposition(gate_decomp)
+    nr_pulses = np.array([len(d) for d in gate_decomposition])
+    pulse_table = np.full((len(gate_decomposition), nr_pulses.max()),
+                          fill_value, dtype=object)
+    for i, decomp in enumerate(gate_decomposition):
+        pulse_table[i, :len(decomp)] = decomp
+    pulse_table = pulse_table.astype(str)
+    mask_table = np.arange(nr_pulses.max()) < nr_pulses[:, np.newaxis]
+
+    clifford_indices = np.asarray(clifford_indices, dtype=int)
+    return pulse_table[clifford_indices], mask_table[clifford_indices]
@@ -83,6 +83,7 @@ mY90 = C1[15]
 
 
 class Clifford(object):
+    number_of_qubits = None
 
     def __init__(self, idx: int):
         self.idx = idx
@@ -94,9 +95,7 @@ class Clifford(object):
         that is the product of both operations.
         """
 
-        net_op = self.pauli_transfer_matrix @ \
-                 other.pauli_transfer_matrix
-        idx = CLut(net_op)
+        idx = CLut.multiply(self.idx, other.idx, self.number_of_qubits)
         return self.__class__(idx)
 
     def __repr__(self):
@@ -108,9 +107,8 @@ class Clifford(object):
             self.gate_decomposition.__str__())
 
     def get_inverse(self):
-        inverse_ptm = np.linalg.inv(self.pauli_transfer_matrix).astype(int)
-        idx = CLut(inverse_ptm)
-        return self.__class__(idx)
+        inverse_table = CLut.get_clifford_inverse_table(self.number_of_qubits)
+        return self.__class__(int(inverse_table[self.idx]))
 
     @property
     def pauli_transfer_matrix(self):
@@ -122,6 +120,7 @@ class Clifford(object):
 
 
 class SingleQubitClifford(Clifford):
+    number_of_qubits = 1
 
     def __init__(self, idx: int):
         assert idx < 24
@@ -148,6 +147,7 @@ class SingleQubitClifford(Clifford):
 
 
 class TwoQubitClifford(Clifford):
+    number_of_qubits = 2
 
     def __init__(self, idx: int):
         assert idx < 11520
@@ -5,6 +5,8 @@
 import os
 import shutil
 import ctypes
+import hashlib
+from copy import deepcopy
 import numpy as np
 import logging
 from qcodes.instrument.base import Instrument
@@ -12,11 +14,14 @@ from qcodes.instrument.parameter import (
     ManualParameter, InstrumentRefParameter)
 import qcodes.utils.validators as vals
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from pycqed.instrument_drivers.virtual_instruments.virtual_awg5014 import \
     VirtualAWG5014
 from pycqed.instrument_drivers.virtual_instruments.virtual_AWG8 import \
     VirtualAWG8
+from pycqed.measurement.waveform_control.waveform_cache import WaveformCache
 # exception catching removed because it does not work in python versions before
 # 3.6
 try:
@@ -195,18 +200,19 @@ class UHFQCPulsar:
         if not isinstance(obj, UHFQCPulsar._supportedAWGtypes):
             return super()._program_awg(obj, awg_sequence, waveforms, repeat_pattern)
 
-        if not self._zi_waves_cleared:
-            _zi_clear_waves()
-            self._zi_waves_cleared = True
-        waves_to_upload = {h: waveforms[h]
-                               for codewords in awg_sequence.values() 
-                                   if codewords is not None
-                               for cw, chids in codewords.items()
-                                   if cw != 'metadata'
-                               for h in chids.values()}
-        self._zi_write_waves(waves_to_upload)
+        use_binary = self._zi_use_binary_upload(obj, awg_sequence)
+        if not use_binary:
+            self._zi_clear_waves_once()
+            waves_to_upload = {h: waveforms[h]
+                                   for codewords in awg_sequence.values()
+                                       if codewords is not None
+                                   for cw, chids in codewords.items()
+                                       if cw != 'metadata'
+                                   for h in chids.values()}
+            self._zi_write_waves(waves_to_upload, awg=obj.name)
 
         defined_waves = set()
+        binary_waves = {}
         wave_definitions = []
         playback_strings = []
 
@@ -229,14 +235,21 @@ class UHFQCPulsar:
 
             wave = (chid_to_hash.get('ch1', None), None,
                     chid_to_hash.get('ch2', None), None)
-            wave_definitions += self._zi_wave_definition(wave,
-                                                         defined_waves)
+            if use_binary:
+                wave_defs, wavenames = self._zi_binary_wave_definition(
+                    wave, waveforms, binary_waves)
+                wave_definitions += wave_defs
+            else:
+                wave_definitions += self._zi_wave_definition(wave,
+                                                             defined_waves)
+                wavenames = None
 
             acq = metadata.get('acq', False)
             playback_strings += self._zi_playback_string(name=obj.name,
                                                          device='uhf', 
                                                          wave=wave, 
-                                                         acq=acq)
+                                                         acq=acq,
+                                                         wavenames=wavenames)
 
             ch_has_waveforms['ch1'] |= wave[0] is not None
             ch_has_waveforms['ch2'] |= wave[2] is not None
@@ -308,7 +321,14 @@ class UHFQCPulsar:
         obj._awg_needs_configuration[0] = False
         obj._awg_program[0] = True
 
-        obj.configure_awg_from_string(awg_nr=0, program_string=awg_str, timeout=600)
+        if obj.configure_awg_from_string(awg_nr=0, program_string=awg_str,
+                                         timeout=600,
+                                         skip_if_unchanged=use_binary):
+            # compilation resets the waveform memory of the AWG
+            self._zi_binary_waves_uploaded[(obj.name, 0)] = {}
+            self._upload_stats(obj.name)['compilations'] += 1
+        if use_binary:
+            self._zi_upload_binary_waves(obj, 0, binary_waves, waveforms)
 
     def _is_awg_running(self, obj):
         if not isinstance(obj, UHFQCPulsar._supportedAWGtypes):
@@ -515,26 +535,28 @@ class HDAWG8Pulsar:
         if not isinstance(obj, HDAWG8Pulsar._supportedAWGtypes):
             return super()._program_awg(obj, awg_sequence, waveforms, repeat_pattern)
         
-        if not self._zi_waves_cleared:
-            _zi_clear_waves()
-            self._zi_waves_cleared = True
-        
-        chids = [f'ch{i+1}{m}' for i in range(8) for m in ['','m']]
-        divisor = {chid: self.get_divisor(chid, obj.name) for chid in chids}
-        
-        waves_to_upload = {h: divisor[chid]*waveforms[h][::divisor[chid]]
-                               for codewords in awg_sequence.values() 
-                                   if codewords is not None 
-                               for cw, chids in codewords.items() 
-                                   if cw != 'metadata'
-                               for chid, h in chids.items()}
-        self._zi_write_waves(waves_to_upload)
+        use_binary = self._zi_use_binary_upload(obj, awg_sequence)
+        if not use_binary:
+            self._zi_clear_waves_once()
+
+            chids = [f'ch{i+1}{m}' for i in range(8) for m in ['','m']]
+            divisor = {chid: self.get_divisor(chid, obj.name)
+                       for chid in chids}
+
+            waves_to_upload = {h: divisor[chid]*waveforms[h][::divisor[chid]]
+                                   for codewords in awg_sequence.values()
+                                       if codewords is not None
+                                   for cw, chids in codewords.items()
+                                       if cw != 'metadata'
+                                   for chid, h in chids.items()}
+            self._zi_write_waves(waves_to_upload, awg=obj.name)
         
         ch_has_waveforms = {'ch{}{}'.format(i + 1, m): False 
                                 for i in range(8) for m in ['','m']}
 
         for awg_nr in self._hdawg_active_awgs(obj):
             defined_waves = set()
+            binary_waves = {}
             codeword_table = {}
             wave_definitions = []
             codeword_table_defs = []
@@ -589,8 +611,15 @@ class HDAWG8Pulsar:
                         chid_to_hash = awg_sequence[element][cw]
                         wave = tuple(chid_to_hash.get(ch, None)
                                     for ch in [ch1id, ch1mid, ch2id, ch2mid])
-                        wave_definitions += self._zi_wave_definition(wave,
-                                                                defined_waves)
+                        if use_binary:
+                            wave_defs, wavenames = \
+                                self._zi_binary_wave_definition(
+                                    wave, waveforms, binary_waves)
+                            wave_definitions += wave_defs
+                        else:
+                            wave_definitions += self._zi_wave_definition(
+                                wave, defined_waves)
+                            wavenames = None
                         
                         if nr_cw != 0:
                             w1, w2 = self._zi_waves_to_wavenames(wave)
@@ -611,7 +640,8 @@ class HDAWG8Pulsar:
 
                     if not internal_mod:
                         playback_strings += self._zi_playback_string(name=obj.name,
-                            device='hdawg', wave=wave, codeword=(nr_cw != 0))
+                            device='hdawg', wave=wave, codeword=(nr_cw != 0),
+                            wavenames=wavenames)
                     else:
                         pb_string, interleave_string = \
                             self._zi_interleaved_playback_string(name=obj.name, 
@@ -635,7 +665,14 @@ class HDAWG8Pulsar:
             obj._awg_needs_configuration[awg_nr] = False
             obj._awg_program[awg_nr] = True
 
-            obj.configure_awg_from_string(awg_nr, awg_str, timeout=600)
+            if obj.configure_awg_from_string(awg_nr, awg_str, timeout=600,
+                                             skip_if_unchanged=use_binary):
+                # compilation resets the waveform memory of the AWG
+                self._zi_binary_waves_uploaded[(obj.name, awg_nr)] = {}
+                self._upload_stats(obj.name)['compilations'] += 1
+            if use_binary:
+                self._zi_upload_binary_waves(obj, awg_nr, binary_waves,
+                                             waveforms)
 
             obj.set('awgs_{}_dio_valid_polarity'.format(awg_nr),
                     prev_dio_valid_polarity)
@@ -930,6 +967,9 @@ class AWG5014Pulsar:
                                          self._awg5014_chan_cfg(obj.name))
         obj.send_awg_file(filename, awg_file)
         obj.load_awg_file(filename)
+        stats = self._upload_stats(obj.name)
+        stats['uploaded_waves'] += len(packed_waveforms)
+        stats['uploaded_bytes'] += len(awg_file)
 
         for par in pars:
             obj.set(par, old_vals[par])
@@ -1040,7 +1080,91 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
                            get_cmd=self._get_inter_element_spacing)
         self.add_parameter('reuse_waveforms', initial_value=False,
                            parameter_class=ManualParameter, vals=vals.Bool())
-                           
+        self.add_parameter('zi_waveform_upload', initial_value='csv',
+                           parameter_class=ManualParameter,
+                           vals=vals.Enum('csv', 'binary'),
+                           docstring="Upload mode for waveforms of ZI "
+                                     "instruments. 'csv': waveforms are "
+                                     "written as CSV files to the LabOne "
+                                     "waves directory and loaded by the "
+                                     "compiler. 'binary': the program "
+                                     "declares placeholder waves and the "
+                                     "waveforms are written to the "
+                                     "waveform nodes of the AWG after "
+                                     "compilation. The program then only "
+                                     "depends on the structure of the "
+                                     "sequence, and its compilation is "
+                                     "skipped if it is unchanged. Only "
+                                     "supported without codewords and "
+                                     "internal modulation.")
+        self.add_parameter('waveform_cache_dir', initial_value=None,
+                           parameter_class=ManualParameter,
+                           vals=vals.MultiType(vals.Strings(),
+                                               vals.Enum(None)),
+                           docstring='Directory of the persistent waveform '
+                                     'cache. If not None and reuse_waveforms '
+                                     'is True, rendered waveforms are stored '
+                                     'on disk and reused across sequences '
+                                     'and runs.')
+        self.add_parameter('waveform_cache_max_size', initial_value=1e9,
+                           unit='B', parameter_class=ManualParameter,
+                           vals=vals.Numbers(0),
+                           docstring='Maximal size of the persistent '
+                                     'waveform cache. The least recently '
+                                     'used waveforms are deleted when it is '
+                                     'exceeded.')
+        self.add_parameter('parallel_programming', initial_value=False,
+                           parameter_class=ManualParameter,
+                           vals=vals.Bool(),
+                           docstring='If True, program_awgs programs the '
+                                     'AWGs concurrently in a thread pool, '
+                                     'such that the compilations and '
+                                     'uploads of different instruments '
+                                     'overlap.')
+        self.add_parameter('incremental_upload', initial_value=False,
+                           parameter_class=ManualParameter,
+                           vals=vals.Bool(),
+                           docstring='If True, program_awgs only uploads '
+                                     'what changed since the last call: '
+                                     'AWGs whose sequence and settings are '
+                                     'identical to the last programmed ones '
+                                     'are not reprogrammed (only if '
+                                     'reuse_waveforms is True, since the '
+                                     'waveform hashes have to identify the '
+                                     'waveform content), and binary ZI '
+                                     'waveforms are only written if their '
+                                     'content changed. Assumes that the '
+                                     'AWGs are not programmed by other '
+                                     'means in the meantime.')
+        self.add_parameter('parallel_compilation', initial_value=False,
+                           parameter_class=ManualParameter,
+                           vals=vals.Bool(),
+                           docstring='If True, '
+                                     'Sequence.generate_waveforms_sequences '
+                                     'resolves the segments and renders '
+                                     'their waveforms in a process pool, '
+                                     'using a PulsarSnapshot of the channel '
+                                     'configuration.')
+        self.add_parameter('compilation_processes', initial_value=None,
+                           parameter_class=ManualParameter,
+                           vals=vals.MultiType(vals.Ints(1),
+                                               vals.Enum(None)),
+                           docstring='Number of worker processes used if '
+                                     'parallel_compilation is True. None '
+                                     'uses the number of CPUs.')
+        self.add_parameter('batch_pulse_rendering', initial_value=False,
+                           parameter_class=ManualParameter,
+                           vals=vals.Bool(),
+                           docstring='If True, Segment.waveforms renders '
+                                     'pulses with identical hashables only '
+                                     'once and adds the rendered waveform '
+                                     'at the position of each of these '
+                                     'pulses. Requires that the hashables '
+                                     'of all pulses in the segment uniquely '
+                                     'define their waveforms and that '
+                                     'chan_wf does not modify the tvals '
+                                     'passed to it.')
+
         self._inter_element_spacing = 'auto'
         self.channels = set() # channel names
         self.awgs = set() # AWG names
@@ -1051,15 +1175,28 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
         self._awgs_prequeried_state = False
 
         self._zi_waves_cleared = False
+        self._zi_written_waves = {}
+        self._zi_binary_waves_uploaded = {}
         self._hash_to_wavename_table = {}
+        # protects the state shared between AWGs when programming in parallel
+        self._zi_lock = threading.RLock()
+        self._awg_locks = {}
+        self.awg_programming_times = {}
+        # upload statistics of the last program_awgs call by AWG name
+        self.upload_stats = {}
+        # AWG name: (program key, has waveforms) of the last programming
+        self._last_awg_programs = {}
 
         self.num_seg = 0
+        self._waveform_cache = None
+        self.waveform_cache_stats = {}
+        self.reset_waveform_cache_stats()
 
         Pulsar._instance = self
 
     @staticmethod
     def get_instance():
-        return Pulsar._instance
+        return getattr(Pulsar, '_instance', None)
 
     # channel handling
     def define_awg_channels(self, awg, channel_name_map=None):
@@ -1166,6 +1303,35 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
         """
         return {awg for awg in self.awgs if self.get('{}_active'.format(awg))}
 
+    def waveform_cache(self):
+        """
+        Returns the persistent WaveformCache in waveform_cache_dir, or None
+        if the persistent cache is disabled. The persistent cache is only
+        used if reuse_waveforms is True, since otherwise the waveform hashes
+        do not describe the waveform content.
+        """
+        if not self.reuse_waveforms() or self.waveform_cache_dir() is None:
+            return None
+        if self._waveform_cache is None or \
+                self._waveform_cache.directory != self.waveform_cache_dir():
+            self._waveform_cache = WaveformCache(
+                self.waveform_cache_dir(), self.waveform_cache_max_size())
+        self._waveform_cache.max_size = self.waveform_cache_max_size()
+        return self._waveform_cache
+
+    def reset_waveform_cache_stats(self):
+        """
+        Resets the counters of the waveform caches used in
+        Sequence.generate_waveforms_sequences:
+            * hits: waveform hashes that were already in the waveform table
+            * persistent_hits: waveforms loaded from the persistent
+              waveform cache
+            * misses: waveforms that had to be taken from a rendered element
+            * rendered_elements: number of elements that have been rendered
+        """
+        self.waveform_cache_stats = {'hits': 0, 'persistent_hits': 0,
+                                     'misses': 0, 'rendered_elements': 0}
+
     def awgs_with_waveforms(self, awg=None):
         """
         Adds an awg to the set of AWGs with waveforms programmed, or returns 
@@ -1253,21 +1419,94 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
         channels_used = self._channels_in_awg_sequences(awg_sequences)
         repeat_dict = self._generate_awg_repeat_dict(sequence.repeat_patterns,
                                                      channels_used)
-        self._zi_waves_cleared = False
+        if not self.reuse_waveforms():
+            # the hashes do not identify the waveform content, so the
+            # waveforms on disk can not be reused
+            self._zi_waves_cleared = False
         self._hash_to_wavename_table = {}
 
-        for awg in awgs:
-            if awg in repeat_dict.keys():
-                self._program_awg(self.AWG_obj(awg=awg),
-                                  awg_sequences.get(awg, {}), waveforms,
-                                  repeat_pattern=repeat_dict[awg])
+        self.awg_programming_times = {}
+        # statistics of the uploads to each AWG, see _new_upload_stats
+        self.upload_stats = {awg: _new_upload_stats() for awg in awgs}
+
+        def program_awg(awg):
+            t0 = time.time()
+            obj = self.AWG_obj(awg=awg)
+            program_key = self._awg_program_key(
+                awg, awg_sequences.get(awg, {}), repeat_dict.get(awg, None))
+            if program_key is not None and \
+                    self._last_awg_programs.get(awg, (None,))[0] == \
+                    program_key:
+                self.upload_stats[awg]['skipped'] = True
+                if self._last_awg_programs[awg][1]:
+                    self.awgs_with_waveforms(awg)
+                self.awg_programming_times[awg] = time.time() - t0
+                return
+            # invalid until the programming has finished
+            self._last_awg_programs.pop(awg, None)
+            with self._awg_lock(obj):
+                if awg in repeat_dict.keys():
+                    self._program_awg(obj, awg_sequences.get(awg, {}),
+                                      waveforms,
+                                      repeat_pattern=repeat_dict[awg])
+                else:
+                    self._program_awg(obj, awg_sequences.get(awg, {}),
+                                      waveforms)
+            if program_key is not None:
+                self._last_awg_programs[awg] = (
+                    program_key, awg in self._awgs_with_waveforms)
+            self.awg_programming_times[awg] = time.time() - t0
+
+        if self.parallel_programming() and len(awgs) > 1:
+            with ThreadPoolExecutor(max_workers=len(awgs)) as executor:
+                futures = [executor.submit(program_awg, awg) for awg in awgs]
+            for future in futures:
+                # raises the exceptions of the worker threads
+                future.result()
+        else:
+            for awg in awgs:
+                program_awg(awg)
+        if self.reuse_waveforms():
+            # the waves directory is not cleared, remove the files of
+            # waveforms which are not used anymore
+            self._zi_remove_unused_waves(set(waveforms))
+        for awg, t in self.awg_programming_times.items():
+            if self.upload_stats[awg]['skipped']:
+                log.info(f'Skipped programming {awg}, sequence unchanged')
             else:
-                self._program_awg(self.AWG_obj(awg=awg),
-                                  awg_sequences.get(awg, {}), waveforms)
-        
+                log.info(f'Programmed {awg} in {t:.2f}s, uploaded '
+                         f'{self.upload_stats[awg]["uploaded_bytes"]} bytes')
+
         self.num_seg = len(sequence.segments)
         self.AWGs_prequeried(False)
 
+    def _awg_program_key(self, awg, awg_sequence, repeat_pattern):
+        """
+        Returns a description of everything that is programmed to the AWG,
+        which is compared to the one of the last programming of the AWG if
+        incremental_upload is True. Returns None if the AWG has to be
+        programmed in any case, i.e., if the waveform hashes do not identify
+        the waveforms.
+        """
+        if not (self.incremental_upload() and self.reuse_waveforms()):
+            return None
+        channels = self.find_awg_channels(awg)
+        for ch in channels:
+            # the distortion kernels are not part of the hashes
+            if self.get(f'{ch}_type') == 'analog' and \
+                    self.get(f'{ch}_distortion') == 'precalculate':
+                return None
+        # the parameters of the AWG and of its channels, whose names do not
+        # have to start with the AWG name (see channel_name_map)
+        prefixes = tuple([f'{awg}_'] + [f'{ch}_' for ch in channels])
+        awg_settings = tuple((name, repr(par.get()))
+                             for name, par in sorted(self.parameters.items())
+                             if name.startswith(prefixes))
+        # copy, since the metadata is removed from the sequence when
+        # programming
+        return (deepcopy(awg_sequence), repr(repeat_pattern),
+                self.zi_waveform_upload(), awg_settings)
+
     def _program_awg(self, obj, awg_sequence, waveforms, repeat_pattern=None):
         """
         Program the AWG with a sequence of segments.
@@ -1295,7 +1534,19 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
         else:
             super()._program_awg(obj, awg_sequence, waveforms)
 
+    def _awg_lock(self, obj):
+        """
+        Returns the lock that serializes the programming of the instrument
+        obj, since its sub-AWGs share the same connection and AWG module.
+        """
+        with self._zi_lock:
+            return self._awg_locks.setdefault(obj.name, threading.Lock())
+
     def _hash_to_wavename(self, h):
+        with self._zi_lock:
+            return self._hash_to_wavename_unlocked(h)
+
+    def _hash_to_wavename_unlocked(self, h):
         alphabet = 'abcdefghijklmnopqrstuvwxyz'
         if h not in self._hash_to_wavename_table:
             hash_int = abs(hash(h))
@@ -1330,9 +1581,13 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
                     defined_waves.add(wc)
         return wave_definition
 
-    def _zi_playback_string(self, name, device, wave, acq=False, codeword=False):
+    def _zi_playback_string(self, name, device, wave, acq=False,
+                            codeword=False, wavenames=None):
         playback_string = []
-        w1, w2 = self._zi_waves_to_wavenames(wave)
+        if wavenames is None:
+            w1, w2 = self._zi_waves_to_wavenames(wave)
+        else:
+            w1, w2 = wavenames
         if not codeword:
             if w1 is None and w2 is not None:
                 # This hack is needed due to a bug on the HDAWG. 
@@ -1436,12 +1691,171 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
                 wavenames.append(self._hash_to_wavename((analog, marker)))
         return wavenames
 
-    def _zi_write_waves(self, waveforms):
+    def _zi_write_waves(self, waveforms, awg=None):
+        """
+        Writes the waveforms as CSV files to the LabOne waves directory.
+        If reuse_waveforms is True, the waveform hashes identify the
+        waveform content and files that have been written for the same hash
+        in a previous call are not written again. The written files are
+        counted in upload_stats of the AWG awg, if given.
+
+        Waveforms are not specific to an AWG, such that AWGs programmed in
+        parallel can share wave files. The files are therefore written while
+        holding _zi_lock and replaced atomically, such that the sequencer
+        compiler of another AWG never reads a partially written file.
+        """
         wave_dir = _zi_wave_dir()
+        stats = self._upload_stats(awg)
         for h, wf in waveforms.items():
-            filename = os.path.join(wave_dir, self._hash_to_wavename(h)+'.csv')
-            fmt = '%.18e' if wf.dtype == np.float else '%d'
-            np.savetxt(filename, wf, delimiter=",", fmt=fmt)
+            with self._zi_lock:
+                wname = self._hash_to_wavename_unlocked(h)
+                filename = os.path.join(wave_dir, wname + '.csv')
+                # the length changes with the divisor of the HDAWG
+                # channels, which is not part of the hash
+                if self.reuse_waveforms() and \
+                        self._zi_written_waves.get(wname) == (h, len(wf)) \
+                        and os.path.exists(filename):
+                    stats['skipped_waves'] += 1
+                    continue
+                fmt = '%.18e' if np.issubdtype(wf.dtype, np.floating) \
+                    else '%d'
+                np.savetxt(filename + '.tmp', wf, delimiter=",", fmt=fmt)
+                os.replace(filename + '.tmp', filename)
+                self._zi_written_waves[wname] = (h, len(wf))
+            stats['uploaded_waves'] += 1
+            stats['uploaded_bytes'] += os.path.getsize(filename)
+
+    def _zi_remove_unused_waves(self, used_hashes):
+        """
+        Removes the wave files written by _zi_write_waves whose hashes are
+        not in used_hashes, such that the LabOne waves directory does not
+        grow with every new sequence if reuse_waveforms is True.
+        """
+        with self._zi_lock:
+            if not self._zi_written_waves:
+                return
+            wave_dir = _zi_wave_dir()
+            for wname, (h, _) in list(self._zi_written_waves.items()):
+                if h in used_hashes:
+                    continue
+                try:
+                    os.remove(os.path.join(wave_dir, wname + '.csv'))
+                except FileNotFoundError:
+                    pass
+                del self._zi_written_waves[wname]
+
+    def _zi_clear_waves_once(self):
+        """
+        Clears the LabOne waves directory if it has not been cleared since
+        the last call of program_awgs (or ever, if reuse_waveforms is True).
+        """
+        with self._zi_lock:
+            if not self._zi_waves_cleared:
+                _zi_clear_waves()
+                self._zi_waves_cleared = True
+                self._zi_written_waves = {}
+
+    def _zi_use_binary_upload(self, obj, awg_sequence):
+        """
+        Returns whether the waveforms of the ZI instrument obj are uploaded
+        to the waveform nodes of the instrument instead of CSV files. Falls
+        back to CSV files for sequences with codewords or internal
+        modulation.
+        """
+        if self.zi_waveform_upload() != 'binary':
+            return False
+        for codewords in awg_sequence.values():
+            if codewords is None:
+                continue
+            if len(set(codewords) - {'metadata', 'no_codeword'}) != 0:
+                log.warning(f'Binary waveform upload not supported with '
+                            f'codewords. Using CSV files for {obj.name}.')
+                return False
+        for ch in self.find_awg_channels(obj.name):
+            if f'{ch}_internal_modulation' in self.parameters and \
+                    self.get(f'{ch}_internal_modulation'):
+                log.warning(f'Binary waveform upload not supported with '
+                            f'internal modulation. Using CSV files for '
+                            f'{obj.name}.')
+                return False
+        return True
+
+    def _zi_binary_wave_definition(self, wave, waveforms, binary_waves):
+        """
+        Defines placeholder waves for both outputs of wave and assigns a
+        waveform index to the pair, under which the waveform data is
+        uploaded after the compilation (see _zi_upload_binary_waves).
+        Outputs without waveform play zeros.
+
+        The wave names are derived from the waveform index and not from the
+        waveform hashes, such that the program only depends on the structure
+        of the sequence and not on the waveform content. This allows to skip
+        the compilation when only waveforms change, e.g. in a sweep.
+
+        Args:
+            wave: tuple of hashes (analog 1, marker 1, analog 2, marker 2)
+            waveforms: dictionary of waveforms indexed by hash
+            binary_waves: dictionary {wave: (index, length)} of the wave
+                pairs of the program, updated in place
+
+        Returns:
+            list of wave definitions and the pair of wave names (w1, w2)
+        """
+        if all(h is None for h in wave):
+            return [], (None, None)
+        wave_definition = []
+        if wave not in binary_waves:
+            index = len(binary_waves)
+            length = max(len(waveforms[h]) for h in wave if h is not None)
+            binary_waves[wave] = (index, length)
+            for i, marker in [(1, wave[1]), (2, wave[3])]:
+                markers = ', true, false' if marker is not None else ''
+                wave_definition.append(
+                    f'wave w{index}_{i} = placeholder({length}{markers});')
+            wave_definition.append(
+                f'assignWaveIndex(w{index}_1, w{index}_2, {index});')
+        index = binary_waves[wave][0]
+        return wave_definition, (f'w{index}_1', f'w{index}_2')
+
+    def _zi_upload_binary_waves(self, obj, awg_nr, binary_waves, waveforms):
+        """
+        Writes the waveforms of the wave pairs defined by
+        _zi_binary_wave_definition to the waveform nodes of the AWG. If
+        reuse_waveforms is True, only waveforms whose hashes differ from the
+        previously uploaded ones are written. If incremental_upload is True,
+        the content of the waveforms is compared in addition, such that
+        unchanged waveforms are not written also if the hashes do not
+        identify the waveforms.
+        """
+        uploaded = self._zi_binary_waves_uploaded.setdefault(
+            (obj.name, awg_nr), {})
+        stats = self._upload_stats(obj.name)
+        for wave, (index, length) in binary_waves.items():
+            prev_wave, prev_digest = uploaded.get(index, (None, None))
+            if self.reuse_waveforms() and prev_wave == wave:
+                stats['skipped_waves'] += 1
+                continue
+            data = _zi_binary_waveform(
+                [None if h is None else waveforms[h] for h in wave], length)
+            digest = None
+            if self.incremental_upload():
+                digest = hashlib.sha1(data).digest()
+                if prev_digest == digest:
+                    uploaded[index] = (wave, digest)
+                    stats['skipped_waves'] += 1
+                    continue
+            obj.setv(f'awgs/{awg_nr}/waveform/waves/{index}', data)
+            uploaded[index] = (wave, digest)
+            stats['uploaded_waves'] += 1
+            stats['uploaded_bytes'] += data.nbytes
+
+    def _upload_stats(self, awg):
+        """
+        Returns the upload statistics of the AWG awg of the current
+        programming, see program_awgs. Returns a dictionary which is
+        not stored if awg is not being programmed.
+        """
+        return self.upload_stats.get(awg, _new_upload_stats())
 
     def _start_awg(self, awg):
         obj = self.AWG_obj(awg=awg)
@@ -1562,6 +1976,51 @@ class Pulsar(AWG5014Pulsar, HDAWG8Pulsar, UHFQCPulsar, Instrument):
         return repeat_dict_per_awg
 
 
+class PulsarSnapshot:
+    """
+    Picklable snapshot of the channel and AWG configuration of a Pulsar.
+
+    Provides the part of the Pulsar interface which Segment uses to resolve
+    segments and render waveforms, such that this can be done in worker
+    processes without access to the instruments (see
+    Sequence.generate_waveforms_sequences).
+    """
+
+    def __init__(self, pulsar):
+        self.name = pulsar.name
+        self.channels = set(pulsar.channels)
+        self.awgs = set(pulsar.awgs)
+        self._values = {}
+        for name, par in pulsar.parameters.items():
+            try:
+                self._values[name] = par.get()
+            except Exception as e:
+                log.debug(f'{self.name}: parameter {name} not included in '
+                          f'snapshot: {e}')
+        self._clocks = {awg: pulsar.clock(awg=awg) for awg in self.awgs}
+
+    def get(self, param_name):
+        return self._values[param_name]
+
+    def clock(self, channel=None, awg=None):
+        if channel is not None and awg is not None:
+            raise ValueError('Both channel and awg arguments passed to '
+                             'PulsarSnapshot.clock()')
+        if channel is None and awg is None:
+            raise ValueError('Neither channel nor awg arguments passed to '
+                             'PulsarSnapshot.clock()')
+        if channel is not None:
+            awg = self.get('{}_awg'.format(channel))
+        return self._clocks[awg]
+
+    def find_awg_channels(self, awg):
+        return [channel for channel in self.channels
+                if self.get('{}_awg'.format(channel)) == awg]
+
+    def reuse_waveforms(self):
+        return self.get('reuse_waveforms')
+
+
 def to_base(n, b, alphabet=None, prev=None):
     if prev is None: prev = []
     if n == 0: 
@@ -1569,6 +2028,23 @@ def to_base(n, b, alphabet=None, prev=None):
         else: return [alphabet[i] for i in prev]
     return to_base(n//b, b, alphabet, prev+[n%b])
 
+
+def _new_upload_stats():
+    """
+    Returns the initial upload statistics of an AWG in
+    Pulsar.upload_stats:
+        * skipped: whether programming the AWG was skipped since its
+          sequence was unchanged (see Pulsar.incremental_upload)
+        * compilations: number of compiled sequencer programs (ZI)
+        * uploaded_waves: number of written waveforms or wave files
+        * skipped_waves: number of waveforms that were not written since
+          they were unchanged
+        * uploaded_bytes: size of the written waveforms or files
+    """
+    return {'skipped': False, 'compilations': 0, 'uploaded_waves': 0,
+            'skipped_waves': 0, 'uploaded_bytes': 0}
+
+
 def _zi_wave_dir():
     if os.name == 'nt':
         dll = ctypes.windll.shell32
@@ -1592,6 +2068,40 @@ def _zi_clear_waves():
             shutil.rmtree(os.path.join(wave_dir, f))
 
 
+def _zi_binary_waveform(wave_data, length):
+    """
+    Converts the waveforms of a pair of outputs to the interleaved 16 bit
+    format of the AWG waveform nodes.
+
+    Args:
+        wave_data: list of waveforms (analog 1, marker 1, analog 2,
+            marker 2), where None stands for a zero waveform. Analog
+            waveforms are normalized to the output amplitude.
+        length: number of samples of the waveforms
+
+    Returns:
+        np.ndarray of dtype int16 with the samples of both outputs and, if
+        any marker waveform is given, the marker bits interleaved
+    """
+    analog1, marker1, analog2, marker2 = wave_data
+    words = [analog1, analog2]
+    if marker1 is not None or marker2 is not None:
+        markers = np.zeros(length, dtype=np.int16)
+        if marker1 is not None:
+            markers += (np.asarray(marker1) > 0).astype(np.int16)
+        if marker2 is not None:
+            markers += 4 * (np.asarray(marker2) > 0).astype(np.int16)
+        words.append(markers)
+    data = np.zeros((len(words), length), dtype=np.int16)
+    for i, wf in enumerate(words):
+        if wf is None:
+            continue
+        if i < 2:
+            wf = np.asarray(wf) * (2**15 - 1)
+        data[i, :len(wf)] = wf
+    return data.reshape(-1, order='F')
+
+
 def _zi_wavename_pair_to_argument(w1, w2):
     if w1 is not None and w2 is not None:
         return f'{w1}, {w2}'
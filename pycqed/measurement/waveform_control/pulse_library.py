@@ -109,7 +109,7 @@ class SSB_DRAG_pulse(pulse.Pulse):
         phase = self.phase
         phase += 360 * self.phaselock * self.mod_frequency * (
                 self.algorithm_time() + self.nr_sigma * self.sigma / 2)
-        hashlist += [self.alpha, self.phi_skew, phase]
+        hashlist += [self.alpha, self.phi_skew, _hash_phase(phase)]
         return hashlist
 
 
@@ -727,9 +727,9 @@ class GaussFilteredCosIQPulse(pulse.Pulse):
         hashlist += [self.mod_frequency, self.gaussian_filter_sigma]
         hashlist += [self.nr_sigma, self.pulse_length]
         phase = self.phase
-        phase += 360 * (not self.phase_lock) * self.mod_frequency \
+        phase += 360 * self.phase_lock * self.mod_frequency \
                  * self.algorithm_time()
-        hashlist += [self.alpha, self.phi_skew, phase]
+        hashlist += [self.alpha, self.phi_skew, _hash_phase(phase)]
         return hashlist
 
 
@@ -830,7 +830,8 @@ class GaussFilteredCosIQPulseMultiChromatic(pulse.Pulse):
         hashlist += self.mod_frequency
         hashlist += [self.gaussian_filter_sigma]
         hashlist += [self.nr_sigma, self.pulse_length]
-        phase = [p + 360 * (not self.phase_lock) * f * self.algorithm_time() \
+        phase = [_hash_phase(p + 360 * self.phase_lock * f *
+                             self.algorithm_time())
                  for p, f in zip(self.phase, self.mod_frequency)]
         hashlist += self.alpha
         hashlist += self.phi_skew
@@ -939,6 +940,15 @@ class CosPulse(pulse.Pulse):
         return hashlist
 
 
+def _hash_phase(phase):
+    """
+    Returns a phase in degrees as used in pulse hashables: rounded to 1e-6
+    degrees to remove floating point errors and wrapped to [0, 360), such
+    that pulses with equivalent phases have the same hashables.
+    """
+    return np.round(phase, 6) % 360.
+
+
 def apply_modulation(ienv, qenv, tvals, mod_frequency,
                      phase=0., phi_skew=0., alpha=1., tval_phaseref=0.):
     """
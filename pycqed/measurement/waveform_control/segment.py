@@ -140,57 +140,43 @@ class Segment:
         self.elements = odict()
 
         visited_pulses = []
-        ref_pulses_dict = {}
+        visited_names = set()
         i = 0
 
+        # dependency graph: maps each reference (pulse name or
+        # 'segment_start') to the list of pulses referring to it
         pulses = self.gen_refpoint_dict()
 
         # add pulses that refer to segment start
-        for pulse in pulses['segment_start']:
+        frontier = []
+        for pulse in pulses.get('segment_start', []):
             if pulse.pulse_obj.name in pulses:
-                ref_pulses_dict.update({pulse.pulse_obj.name: pulse})
+                frontier.append(pulse)
             t0 = pulse.delay - pulse.ref_point_new * pulse.pulse_obj.length
             pulse.pulse_obj.algorithm_time(t0)
             visited_pulses.append((t0, i, pulse))
+            visited_names.add(pulse.pulse_obj.name)
             i += 1
 
         if len(visited_pulses) == 0:
             raise ValueError('No pulse references to the segment start!')
 
-        ref_pulses_dict_all = deepcopy(ref_pulses_dict)
-        # add remaining pulses
-        while len(ref_pulses_dict) > 0:
-            ref_pulses_dict_new = {}
-            for name, pulse in ref_pulses_dict.items():
-                for p in pulses[name]:
+        # Add remaining pulses in topological order, one level of the
+        # dependency graph at a time. A pulse with multiple reference pulses
+        # is only resolved once all of them have been resolved in a
+        # previous level.
+        resolved = {p.pulse_obj.name: p for p in frontier}
+        while len(frontier) > 0:
+            frontier_new = []
+            for pulse in frontier:
+                for p in pulses[pulse.pulse_obj.name]:
                     if isinstance(p.ref_pulse, list):
-                        if p.pulse_obj.name in [vp[2].pulse_obj.name for vp
-                                                in visited_pulses]:
+                        if p.pulse_obj.name in visited_names:
                             continue
-                        if not all([ref_pulse in ref_pulses_dict_all for
-                                    ref_pulse in p.ref_pulse]):
+                        if not all(ref_pulse in resolved for
+                                   ref_pulse in p.ref_pulse):
                             continue
-
-                        t0_list = []
-                        delay_list = [p.delay] * len(p.ref_pulse) if not isinstance(p.delay, list) else p.delay
-                        ref_point_list = [p.ref_point] * len(p.ref_pulse) if not isinstance(p.ref_point, list) \
-                            else p.ref_point
-
-                        for (ref_pulse, delay, ref_point) in zip(p.ref_pulse, delay_list, ref_point_list):
-                            t0_list.append(ref_pulses_dict_all[ref_pulse].pulse_obj.algorithm_time() + delay -
-                                           p.ref_point_new * p.pulse_obj.length +
-                                           ref_point * ref_pulses_dict_all[ref_pulse].pulse_obj.length)
-
-                        if p.ref_function == 'max':
-                            t0 = max(t0_list)
-                        elif p.ref_function == 'min':
-                            t0 = min(t0_list)
-                        elif p.ref_function == 'mean':
-                            t0 = np.mean(t0_list)
-                        else:
-                            raise ValueError('Passed invalid value for ' +
-                                'ref_function. Allowed values are: max, min, mean.' +
-                                ' Default value: max')
+                        t0 = self._multi_ref_t0(p, resolved)
                     else:
                         t0 = pulse.pulse_obj.algorithm_time() + p.delay - \
                             p.ref_point_new * p.pulse_obj.length + \
@@ -198,16 +184,17 @@ class Segment:
 
                     p.pulse_obj.algorithm_time(t0)
 
-                    # add p.name to reference list if it is used as a key
-                    # in pulses
+                    # p is a node of the next level if other pulses refer
+                    # to it
                     if p.pulse_obj.name in pulses:
-                        ref_pulses_dict_new.update({p.pulse_obj.name: p})
+                        frontier_new.append(p)
 
                     visited_pulses.append((t0, i, p))
+                    visited_names.add(p.pulse_obj.name)
                     i += 1
 
-            ref_pulses_dict = ref_pulses_dict_new
-            ref_pulses_dict_all.update(ref_pulses_dict_new)
+            frontier = frontier_new
+            resolved.update({p.pulse_obj.name: p for p in frontier})
 
         if len(visited_pulses) != len(self.unresolved_pulses):
             log.error(f"{len(visited_pulses), len(self.unresolved_pulses)}")
@@ -365,6 +352,36 @@ class Segment:
             new_samples = self.time2sample(new_end - el_start, awg=awg)
             self.element_start_end[el][awg][1] = new_samples
 
+    @staticmethod
+    def _multi_ref_t0(p, resolved):
+        """
+        Returns the start time of an UnresolvedPulse p which refers to
+        multiple pulses, combined according to p.ref_function.
+        :param p: UnresolvedPulse with a list of reference pulses
+        :param resolved: dict of resolved UnresolvedPulses by pulse name,
+            containing all reference pulses of p
+        """
+        t0_list = []
+        delay_list = [p.delay] * len(p.ref_pulse) if not isinstance(p.delay, list) else p.delay
+        ref_point_list = [p.ref_point] * len(p.ref_pulse) if not isinstance(p.ref_point, list) \
+            else p.ref_point
+
+        for (ref_pulse, delay, ref_point) in zip(p.ref_pulse, delay_list, ref_point_list):
+            t0_list.append(resolved[ref_pulse].pulse_obj.algorithm_time() + delay -
+                           p.ref_point_new * p.pulse_obj.length +
+                           ref_point * resolved[ref_pulse].pulse_obj.length)
+
+        if p.ref_function == 'max':
+            return max(t0_list)
+        elif p.ref_function == 'min':
+            return min(t0_list)
+        elif p.ref_function == 'mean':
+            return np.mean(t0_list)
+        else:
+            raise ValueError('Passed invalid value for ' +
+                'ref_function. Allowed values are: max, min, mean.' +
+                ' Default value: max')
+
     def gen_refpoint_dict(self):
         """
         Returns a dictionary of UnresolvedPulses with their reference_points as 
@@ -725,6 +742,9 @@ class Segment:
             channels = set(self.pulsar.channels)
         if elements is None:
             elements = set(self.elements)
+        batched = self.pulsar.get('batch_pulse_rendering')
+        # waveforms rendered in this call, see _cached_pulse_waveforms
+        rendered = {}
 
         awg_wfs = {}
         for awg in awgs:
@@ -771,12 +791,19 @@ class Segment:
                     pulse_end = self.time2sample(
                         pulse.element_time(element_start_time) + pulse.length,
                         awg=awg)
-                    for channel in pulse_channels:
-                        chan_tvals[channel] = tvals[channel].copy(
-                        )[pulse_start:pulse_end]
-
-                    # calculate pulse waveforms
-                    pulse_wfs = pulse.waveforms(chan_tvals)
+                    if batched:
+                        for channel in pulse_channels:
+                            chan_tvals[channel] = tvals[channel][
+                                pulse_start:pulse_end]
+                        pulse_wfs = self._cached_pulse_waveforms(
+                            pulse, chan_tvals, pulse_start, element_start_time,
+                            self.pulsar.clock(awg=awg), rendered)
+                    else:
+                        for channel in pulse_channels:
+                            chan_tvals[channel] = tvals[channel][
+                                pulse_start:pulse_end].copy()
+                        # calculate pulse waveforms
+                        pulse_wfs = pulse.waveforms(chan_tvals)
 
                     # insert the waveforms at the correct position in wfs
                     for channel in pulse_channels:
@@ -863,6 +890,61 @@ class Segment:
 
         return awg_wfs
 
+    @staticmethod
+    def _cached_pulse_waveforms(pulse, chan_tvals, pulse_start,
+                                element_start_time, clock, rendered):
+        """
+        Returns the waveforms of a pulse, reusing the waveforms of identical
+        pulses rendered before.
+
+        A rendered waveform is stored in the dictionary rendered with the
+        pulse hashables as key, where the hashables are taken with respect to
+        the first sample of the pulse. Pulses which start on the sample grid
+        thus share the waveform irrespective of their position in the
+        segment. Pulses without (hashable) hashables are always rendered.
+
+        Args:
+            pulse (Pulse): the pulse to render
+            chan_tvals (dict of np.ndarray): sample start times of the pulse
+                for each channel, all on the same sample grid
+            pulse_start (int): index of the first pulse sample in the element
+            element_start_time (float): start time of the element
+            clock (float): sample rate of the AWG
+            rendered (dict): waveforms rendered before
+        Returns:
+            dict of np.ndarray: the waveforms of the pulse for each channel
+            in chan_tvals. Must not be modified in place.
+        """
+        nr_samples = len(next(iter(chan_tvals.values())))
+        if nr_samples == 0:
+            return pulse.waveforms(chan_tvals)
+        offset = pulse.element_time(element_start_time) * clock - pulse_start
+        if abs(offset) < 1e-6:
+            tstart = pulse.algorithm_time()
+        else:
+            tstart = next(iter(chan_tvals.values()))[0]
+
+        wfs = {}
+        keys = {}
+        for channel in chan_tvals:
+            try:
+                hashables = pulse.hashables(tstart, channel)
+                key = (type(pulse), clock, nr_samples, tuple(hashables))
+                hash(key)
+            except (NotImplementedError, TypeError):
+                hashables, key = [], None
+            if len(hashables) and key in rendered:
+                wfs[channel] = rendered[key]
+            else:
+                keys[channel] = key if len(hashables) else None
+        if len(keys):
+            pulse_wfs = pulse.waveforms({c: chan_tvals[c] for c in keys})
+            for channel, key in keys.items():
+                wfs[channel] = pulse_wfs[channel]
+                if key is not None:
+                    rendered[key] = pulse_wfs[channel]
+        return wfs
+
     def get_element_codewords(self, element, awg=None):
         codewords = set()
         if awg is not None:
@@ -1149,6 +1231,51 @@ class Segment:
         output += f'\n% {num_single_qb} single-qubit gates, {num_two_qb} two-qubit gates, {num_virtual} virtual gates'
         return output
 
+    def copy(self, name=None):
+        """
+        Returns a copy of the segment which shares the pulse objects with
+        this segment. In contrast to deepcopy, the time needed does not
+        depend on the pulse parameters, which makes it suitable for copying
+        many segments, e.g., in Sequence.merge.
+
+        Adding pulses to or resolving one of the segments does not affect
+        the other one. Resolving the segment sets the timing and phases of
+        the shared pulse objects, which does not depend on the segment they
+        are resolved in. Pulse parameters must not be changed in place
+        after copying, since the change would apply to both segments.
+
+        :param name: name of the new segment. Defaults to the name of this
+            segment.
+        :return: new Segment
+        """
+        cls = self.__class__
+        new_seg = cls.__new__(cls)
+        new_seg.__dict__.update(self.__dict__)
+        if name is not None:
+            new_seg.name = name
+        new_seg.unresolved_pulses = list(self.unresolved_pulses)
+        new_seg.elements = odict(
+            (el, list(pulses)) for el, pulses in self.elements.items())
+        new_seg.element_start_end = {
+            el: {awg: list(v) for awg, v in d.items()}
+            for el, d in self.element_start_end.items()}
+        new_seg.elements_on_awg = {
+            awg: list(els) for awg, els in self.elements_on_awg.items()}
+        new_seg.trigger_pars = dict(self.trigger_pars)
+        new_seg._pulse_names = set(self._pulse_names)
+        new_seg.acquisition_elements = set(self.acquisition_elements)
+        return new_seg
+
+    def __getstate__(self):
+        # the reference to pulsar cannot be pickled
+        state = self.__dict__.copy()
+        state.pop('pulsar', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pulsar = ps.Pulsar.get_instance()
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         new_seg = cls.__new__(cls)
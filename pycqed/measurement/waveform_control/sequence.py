@@ -4,13 +4,19 @@
 # author: Michael Kerschbaum
 # created: 04/2019
 
+import os
 import numpy as np
 import pycqed.measurement.waveform_control.pulsar as ps
 from collections import OrderedDict as odict
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 import logging
 log = logging.getLogger(__name__)
 
+# PulsarSnapshot used by the segments in a compilation worker process
+_worker_pulsar = None
+
+
 class Sequence:
     """
     A Sequence consists of several segments, which can be played back on the 
@@ -49,48 +55,185 @@ class Sequence:
 
     def generate_waveforms_sequences(self, awgs=None):
         """
-        Calculates and returns 
+        Calculates and returns
             * a dictionary of waveforms used in the sequence, indexed
                 by their hash value
             * For each awg, a list of elements, each element consisting of
                 a waveform-hash for each codeword and each channel
+
+        The waveforms of an element are rendered in a single pass over all
+        its channels and codewords, if one of its hashes is not yet in the
+        waveform table. If the persistent waveform cache of the pulsar is
+        enabled, waveforms are looked up there before rendering and newly
+        rendered waveforms are stored in it. Hash hits and misses are
+        counted in pulsar.waveform_cache_stats.
+
+        If pulsar.parallel_compilation is True, the segments are resolved
+        and the elements are rendered in a process pool. The workers use a
+        PulsarSnapshot of the channel configuration instead of the pulsar.
         """
         waveforms = {}
         sequences = {}
-        for seg in self.segments.values():
-            seg.resolve_segment()
-            seg.gen_elements_on_awg()
+        self.pulsar.reset_waveform_cache_stats()
+        wf_cache = self.pulsar.waveform_cache()
+        pool = self._compilation_pool()
+        try:
+            self._resolve_segments(pool)
+
+            if awgs is None:
+                awgs = set()
+                for seg in self.segments.values():
+                    awgs |= set(seg.elements_on_awg)
+
+            # waveforms to be taken from rendered elements, by
+            # (segment name, awg, element name)
+            missing = odict()
+            missing_hashes = set()
+            for awg in awgs:
+                sequences[awg] = odict()
+                for segname, seg in self.segments.items():
+                    # Store the name of the segment
+                    sequences[awg][segname] = None
+                    for elname in seg.elements_on_awg.get(awg, []):
+                        sequences[awg][elname] = {'metadata': {}}
+                        for cw in seg.get_element_codewords(elname, awg=awg):
+                            sequences[awg][elname][cw] = {}
+                            for ch in seg.get_element_channels(elname,
+                                                               awg=awg):
+                                h = seg.calculate_hash(elname, cw, ch)
+                                chid = self.pulsar.get(f'{ch}_id')
+                                sequences[awg][elname][cw][chid] = h
+                                if h in waveforms or h in missing_hashes:
+                                    self.pulsar.waveform_cache_stats[
+                                        'hits'] += 1
+                                    continue
+                                persistent = wf_cache is not None and \
+                                    self._persistent_hash(ch)
+                                if persistent:
+                                    wf = wf_cache.get(h)
+                                    if wf is not None:
+                                        self.pulsar.waveform_cache_stats[
+                                            'persistent_hits'] += 1
+                                        waveforms[h] = wf
+                                        continue
+                                self.pulsar.waveform_cache_stats[
+                                    'misses'] += 1
+                                missing_hashes.add(h)
+                                missing.setdefault(
+                                    (segname, awg, elname), []).append(
+                                    (h, cw, chid, ch, persistent))
+                        if elname in seg.acquisition_elements:
+                            sequences[awg][elname]['metadata']['acq'] = True
+                        else:
+                            sequences[awg][elname]['metadata']['acq'] = False
+
+            for (segname, awg, elname), el_wfs in self._render_elements(
+                    list(missing), pool):
+                seg = self.segments[segname]
+                for h, cw, chid, ch, persistent in missing[
+                        (segname, awg, elname)]:
+                    wf = el_wfs.get(cw, {}).get(chid, None)
+                    if wf is None:
+                        # no pulse of this codeword on this channel
+                        wf = np.zeros(seg.get_element_samples(elname, ch))
+                    waveforms[h] = wf
+                    if persistent:
+                        wf_cache.put(h, wf)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return waveforms, sequences
 
-        if awgs is None:
-            awgs = set()
+    def _persistent_hash(self, ch):
+        """
+        Returns whether the waveform hashes of channel ch identify the
+        waveform across runs. This is not the case for precalculated
+        distortions, whose kernels are not part of the hash.
+        """
+        return not (self.pulsar.get(f'{ch}_type') == 'analog' and
+                    self.pulsar.get(f'{ch}_distortion') == 'precalculate')
+
+    def _compilation_pool(self):
+        """
+        Returns a process pool for compiling the segments if
+        pulsar.parallel_compilation is True and there is more than one
+        segment, and None otherwise.
+        """
+        if not self.pulsar.parallel_compilation() or \
+                len(self.segments) < 2:
+            return None
+        processes = self.pulsar.compilation_processes()
+        if processes is None:
+            processes = os.cpu_count()
+        processes = min(processes, len(self.segments))
+        return ProcessPoolExecutor(
+            processes, initializer=_init_compilation_worker,
+            initargs=(ps.PulsarSnapshot(self.pulsar),))
+
+    def _resolve_segments(self, pool=None):
+        """
+        Resolves all segments and generates their elements_on_awg, in the
+        process pool if one is passed. The state of the segments resolved
+        in the workers is copied back into the segments of the sequence.
+        """
+        if pool is None:
             for seg in self.segments.values():
-                awgs |= set(seg.elements_on_awg)
-
-        for awg in awgs:
-            sequences[awg] = odict()
-            for segname, seg in self.segments.items():
-                # Store the name of the segment
-                sequences[awg][segname] = None
-                for elname in seg.elements_on_awg.get(awg, []):
-                    sequences[awg][elname] = {'metadata': {}}
-                    for cw in seg.get_element_codewords(elname, awg=awg):
-                        sequences[awg][elname][cw] = {}
-                        for ch in seg.get_element_channels(elname, awg=awg):
-                            h = seg.calculate_hash(elname, cw, ch)
-                            chid = self.pulsar.get(f'{ch}_id')
-                            sequences[awg][elname][cw][chid] = h
-                            if h not in waveforms:
-                                wf = seg.waveforms(awgs={awg}, 
-                                    elements={elname}, channels={ch}, 
-                                    codewords={cw})
-                                waveforms[h] = wf.popitem()[1].popitem()[1]\
-                                                 .popitem()[1].popitem()[1]
-                    if elname in seg.acquisition_elements:
-                        sequences[awg][elname]['metadata']['acq'] = True
-                    else:
-                        sequences[awg][elname]['metadata']['acq'] = False
-        return waveforms, sequences
-                
+                seg.resolve_segment()
+                seg.gen_elements_on_awg()
+            return
+        segments = list(self.segments.values())
+        resolved_segments = pool.map(_resolve_segment, segments)
+        for seg, resolved_seg in zip(segments, resolved_segments):
+            seg.__dict__.update({k: v for k, v in
+                                 resolved_seg.__dict__.items()
+                                 if k != 'pulsar'})
+
+    def _render_elements(self, elements, pool=None):
+        """
+        Renders elements of the sequence, in the process pool if one is
+        passed.
+        Args:
+            elements (list): (segment name, awg, element name) of the
+                elements to render
+            pool: ProcessPoolExecutor or None
+
+        Returns:
+            iterator over ((segment name, awg, element name), element
+            waveforms) in the order of elements, see _render_element
+        """
+        if pool is None:
+            for segname, awg, elname in elements:
+                yield (segname, awg, elname), self._render_element(
+                    self.segments[segname], awg, elname)
+            return
+        # each segment is sent to a worker only once
+        seg_elements = odict()
+        for segname, awg, elname in elements:
+            seg_elements.setdefault(segname, []).append((awg, elname))
+        rendered = pool.map(
+            _render_segment_elements,
+            [self.segments[segname] for segname in seg_elements],
+            seg_elements.values())
+        for (segname, awg_elements), el_wfs_list in zip(
+                seg_elements.items(), rendered):
+            for (awg, elname), el_wfs in zip(awg_elements, el_wfs_list):
+                self.pulsar.waveform_cache_stats['rendered_elements'] += 1
+                yield (segname, awg, elname), el_wfs
+
+    def _render_element(self, seg, awg, elname):
+        """
+        Renders all channels and codewords of an element on an AWG at once.
+        Args:
+            seg (Segment): resolved segment containing the element
+            awg (str): name of the AWG
+            elname (str): name of the element
+
+        Returns:
+            dictionary {codeword: {channel_id: waveform}}
+        """
+        self.pulsar.waveform_cache_stats['rendered_elements'] += 1
+        return _render_element(seg, awg, elname)
+
     def n_acq_elements(self, per_segment=False):
         """
         Gets the number of acquisition elements in the sequence.
@@ -197,7 +340,7 @@ class Sequence:
         elif len(sequences) == 1:
             # special case, return current sequence:
             return sequences
-        sequences = [deepcopy(s) for s in sequences]
+        sequences = [s.copy() for s in sequences]
         merged_seqs = [sequences[0]]
         if segment_limit is None:
             segment_limit = np.inf
@@ -318,6 +461,29 @@ class Sequence:
             string_repr += str(seg) + "\n"
         return string_repr
     
+    def copy(self, name=None):
+        """
+        Returns a copy of the sequence containing copies of its segments,
+        which share the pulse objects with the segments of this sequence
+        (see Segment.copy). Used by merge to avoid deep copies of all
+        pulses.
+        Args:
+            name (str): name of the new sequence. Defaults to the name of
+                this sequence.
+
+        Returns: new Sequence
+        """
+        cls = self.__class__
+        new_seq = cls.__new__(cls)
+        new_seq.__dict__.update(self.__dict__)
+        if name is not None:
+            new_seq.name = name
+        new_seq.segments = odict(
+            (segname, seg.copy()) for segname, seg in self.segments.items())
+        new_seq.awg_sequence = deepcopy(self.awg_sequence)
+        new_seq.repeat_patterns = deepcopy(self.repeat_patterns)
+        return new_seq
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         new_seq = cls.__new__(cls)
@@ -342,4 +508,41 @@ class Sequence:
             segments = [self.segments[s] for s in segments]
         for s in segments:
             plots.append(s.plot(**segment_plot_kwargs))
-        return plots
\ No newline at end of file
+        return plots
+
+
+def _render_element(seg, awg, elname):
+    """
+    Renders all channels and codewords of an element of a resolved segment
+    on an AWG, see Sequence._render_element.
+    """
+    wfs = seg.waveforms(awgs={awg}, elements={elname})
+    for (_, name), el_wfs in wfs.get(awg, {}).items():
+        if name == elname:
+            return el_wfs
+    return {}
+
+
+def _init_compilation_worker(pulsar_snapshot):
+    global _worker_pulsar
+    _worker_pulsar = pulsar_snapshot
+
+
+def _resolve_segment(seg):
+    """
+    Resolves a segment in a compilation worker process.
+    """
+    seg.pulsar = _worker_pulsar
+    seg.resolve_segment()
+    seg.gen_elements_on_awg()
+    return seg
+
+
+def _render_segment_elements(seg, awg_elements):
+    """
+    Renders a list of (awg, element name) of a resolved segment in a
+    compilation worker process.
+    """
+    seg.pulsar = _worker_pulsar
+    return [_render_element(seg, awg, elname)
+            for awg, elname in awg_elements]
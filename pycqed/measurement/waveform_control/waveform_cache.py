@@ -0,0 +1,121 @@
+# A WaveformCache stores rendered waveforms on disk, indexed by the hash
+# tuples returned by Segment.calculate_hash, such that waveforms can be
+# reused across sequences and across runs.
+#
+# created: 10/2026
+
+import os
+import hashlib
+import numpy as np
+import logging
+log = logging.getLogger(__name__)
+
+
+class WaveformCache:
+    """
+    Persistent store of waveforms as .npy files with least-recently-used
+    eviction. Waveforms are returned as read-only memory maps.
+
+    The least recently used waveforms are identified by the modification
+    time of their files, which is updated on every access. The store
+    therefore does not need an index file and can be shared between runs.
+    """
+
+    _extension = '.npy'
+
+    def __init__(self, directory, max_size=1e9):
+        """
+        Initializes a WaveformCache object
+        Args:
+            directory (str): directory in which the waveforms are stored.
+                Created if it does not exist.
+            max_size (float): maximal total size of the stored waveforms in
+                bytes. When exceeded, the least recently used waveforms are
+                deleted.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(os.path.getsize(f) for f in self._files())
+
+    @staticmethod
+    def key(h):
+        """
+        Returns a file name stem for the hash tuple h which, in contrast to
+        the built-in hash, is stable across python sessions.
+        """
+        return hashlib.sha1(repr(h).encode()).hexdigest()
+
+    def _path(self, h):
+        return os.path.join(self.directory, self.key(h) + self._extension)
+
+    def _files(self):
+        return [os.path.join(self.directory, f)
+                for f in os.listdir(self.directory)
+                if f.endswith(self._extension)]
+
+    def __contains__(self, h):
+        return os.path.exists(self._path(h))
+
+    def __len__(self):
+        return len(self._files())
+
+    def get(self, h, default=None):
+        """
+        Returns the waveform stored for hash h as read-only memory map, or
+        default if the waveform is not in the cache.
+        """
+        path = self._path(h)
+        try:
+            wf = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return default
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return wf
+
+    def put(self, h, wf):
+        """
+        Stores the waveform wf for hash h and evicts the least recently
+        used waveforms if the cache exceeds max_size.
+        """
+        path = self._path(h)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(wf))
+        os.replace(tmp_path, path)
+        self._size += os.path.getsize(path)
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self, max_size=None):
+        """
+        Deletes the least recently used waveforms until the total size of
+        the cache is below max_size (defaults to self.max_size).
+        """
+        if max_size is None:
+            max_size = self.max_size
+        files = [(os.path.getmtime(f), os.path.getsize(f), f)
+                 for f in self._files()]
+        self._size = sum(size for _, size, _ in files)
+        for _, size, f in sorted(files):
+            if self._size <= max_size:
+                break
+            try:
+                os.remove(f)
+            except OSError as e:
+                # e.g. file still memory mapped on Windows
+                log.debug(f'Could not evict {f}: {e}')
+                continue
+            self._size -= size
+
+    def clear(self):
+        """
+        Deletes all waveforms from the cache.
+        """
+        self.evict(max_size=0)
@@ -30,7 +30,63 @@ def rabisim(efun, g, t, dt):
         f_vec[i+1, :] = f(f_vec[i], t)
     return f_vec
 
-qamp = lambda vec: np.abs(vec[:, 1])**2
+qamp = lambda vec: np.abs(vec[..., 1])**2
+
+
+def rabisim_batch(energies, g, dt):
+    """
+    Vectorized version of rabisim for energies sampled on the time grid.
+
+    The propagators expm(dt*1j*ham(e, g)) are evaluated analytically,
+    cos(dt*w) + 1j*sin(dt*w)/w*ham(e, g) with w = sqrt(e**2/4 + g**2), for
+    all energies and time steps at once, and multiplied up with a parallel
+    prefix product over the time axis.
+    Inputs:
+            energies, Array (..., nr_times) of the energy parameter at the
+                      times (1, 1+dt, ..., t) of the evolution.
+            g,        Coupling parameter, scalar or array broadcastable to
+                      energies.
+            dt,       Stepsize of the time evolution
+    Outputs:
+            f_vec,  Array (..., nr_times, 2) of the evolution for times
+                    (1, 1+dt, ..., t), as returned by rabisim.
+    """
+    energies, g = np.broadcast_arrays(np.asarray(energies, dtype=float),
+                                      np.asarray(g, dtype=float))
+    w = np.sqrt(0.25*energies**2 + g**2)
+    cos = np.cos(dt*w)
+    # sin(dt*w)/w, also for w = 0
+    sinc = dt*np.sinc(dt*w/np.pi)
+    # propagator entries [[p00, p01], [p10, p11]]
+    p00 = cos + 0.5j*sinc*energies
+    p11 = cos - 0.5j*sinc*energies
+    p01 = 1j*sinc*g
+    p10 = p01.copy()
+    # cumulative products props[i] @ ... @ props[0], with the 2x2 matrix
+    # products written out elementwise
+    nr_times = energies.shape[-1]
+    shift = 1
+    while shift < nr_times - 1:
+        a, b, c, d = [x[..., :-shift] for x in (p00, p01, p10, p11)]
+        e, f, h, k = [x[..., shift:] for x in (p00, p01, p10, p11)]
+        p00[..., shift:], p01[..., shift:], p10[..., shift:], \
+            p11[..., shift:] = (e*a + f*c, e*b + f*d, h*a + k*c, h*b + k*d)
+        shift *= 2
+    f_vec = np.empty(energies.shape + (2,), dtype=np.complex128)
+    f_vec[..., 0, :] = [1, 0]
+    f_vec[..., 1:, 0] = p00[..., :-1]
+    f_vec[..., 1:, 1] = p10[..., :-1]
+    return f_vec
+
+
+def _step_function_values(sf, ts):
+    try:
+        vals = np.asarray(sf(ts), dtype=float)
+        if vals.shape == ts.shape:
+            return vals
+    except Exception:
+        pass
+    return np.array([sf(t) for t in ts], dtype=float)
 
 
 def chevron(e0, emin, emax, n, g, t, dt, sf):
@@ -44,14 +100,14 @@ def chevron(e0, emin, emax, n, g, t, dt, sf):
             t,      Final time of the evolution.
             dt,     Stepsize of the time evolution.
             sf,     Step function of the distortion kernel.
+    The evolutions for all energies are calculated at once with
+    rabisim_batch.
     """
-    energy_func = lambda energy, t: e0*(1.-(energy*sf(t))**2)
     energy_vec = np.arange(1+emin, 1+emax, (emax-emin)/(n-1))
-    chevron_vec = []
-    for ee in energy_vec:
-        chevron_vec.append(
-            qamp(rabisim(lambda t: energy_func(ee, t), g, t, dt)))
-    return np.array(chevron_vec)
+    ts = np.arange(1., t+0.5*dt, dt)
+    sf_vals = _step_function_values(sf, ts)
+    energies = e0*(1.-(energy_vec[:, None]*sf_vals)**2)
+    return qamp(rabisim_batch(energies, g, dt))
 
 
 def chevron_slice(e0, energy, g, t, dt, sf):
@@ -64,5 +120,6 @@ def chevron_slice(e0, energy, g, t, dt, sf):
             dt,     Stepsize of the time evolution.
             sf,     Step function of the distortion kernel.
     """
-    energy_func = lambda energy, t: e0*(1.-(energy*sf(t))**2)
-    return qamp(rabisim(lambda t: energy_func(energy, t), g, t, dt))
+    ts = np.arange(1., t+0.5*dt, dt)
+    sf_vals = _step_function_values(sf, ts)
+    return qamp(rabisim_batch(e0*(1.-(energy*sf_vals)**2), g, dt))
@@ -61,29 +61,110 @@ def transmon_hamiltonian(ec: float, ej: float, ng: float = 0.,
     return ham
 
 
-def transmon_levels(ec: float, ej: float, ng: float = 0., dim_charge: int = 31):
+def transmon_levels(ec, ej, ng=0., dim_charge: int = 31):
     """Calculate the eigenfrequencies of the transmon Hamiltonian.
 
+    The Hamiltonians for all values of the (broadcast) parameter arrays are
+    diagonalized in a single call to the stacked eigensolver
+    `np.linalg.eigvalsh`, which only reads their tridiagonal lower triangle.
+
     Args:
-        ec: Charging energy of the Hamiltonian.
-        ej: Josephson energy of the Hamiltonian.
-        ng: Charge offset of the Hamiltonian.
+        ec: Charging energy of the Hamiltonian. Scalar or array.
+        ej: Josephson energy of the Hamiltonian. Scalar or array.
+        ng: Charge offset of the Hamiltonian. Scalar or array.
         dim_charge: Number of charge states to use in calculations.
 
     Returns:
-        A list of eigenvalues of the transmon Hamiltonian with the ground-state
-        energy subtracted and removed.
+        An array of eigenvalues of the transmon Hamiltonian with the
+        ground-state energy subtracted and removed. For array arguments, the
+        last axis enumerates the eigenvalues and the leading axes correspond
+        to the broadcast shape of the arguments.
     """
-    ham = transmon_hamiltonian(ec, ej, ng, dim_charge)
-    evals = np.sort(np.linalg.eigvalsh(ham))
-    return evals[1:] - evals[0]
+    ec, ej, ng = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                       for x in (ec, ej, ng)])
+    charge = np.arange(dim_charge) - np.floor(dim_charge / 2) + ng[..., None]
+    idxs = np.arange(dim_charge)
+    ham = np.zeros(ec.shape + (dim_charge, dim_charge))
+    ham[..., idxs, idxs] = 4 * ec[..., None] * charge**2
+    ham[..., idxs[1:], idxs[:-1]] = -0.5 * ej[..., None]
+    evals = np.linalg.eigvalsh(ham, UPLO='L')
+    return evals[..., 1:] - evals[..., :1]
 
 
-def transmon_ec_ej(fge: float, anh: float, ng: float = 0.,
-                   dim_charge: int = 31):
+def _solve_batched(func, x0, args, max_iter: int = 50, rtol: float = 1e-10):
+    """Solve a batch of independent systems of equations func(x) = 0.
+
+    Uses Newton's method with a forward-difference Jacobian, where func is
+    evaluated for the whole batch (and all Jacobian columns) at once.
+    Problems for which Newton's method does not converge are solved
+    individually with `scipy.optimize.fsolve`.
+
+    Args:
+        func: Function func(x, *args) returning an array of shape (n, k) for
+            x of shape (n, k) and args of shape (n,).
+        x0: Initial values of shape (n, k).
+        args: List of additional arguments of func, arrays of shape (n,).
+        max_iter: Maximum number of Newton iterations.
+        rtol: Relative tolerance of the Newton steps.
+
+    Returns:
+        The solutions, an array of shape (n, k).
+    """
+    x = np.array(x0, dtype=float)
+    n, k = x.shape
+    active = np.arange(n)
+    for _ in range(max_iter):
+        xa = x[active]
+        h = 1e-7 * np.maximum(np.abs(xa), 1e-3)
+        xs = np.tile(xa, (k + 1, 1, 1))
+        xs[1:] += np.eye(k)[:, None, :] * h
+        fs = func(xs.reshape((k + 1) * len(active), k),
+                  *[np.tile(a[active], k + 1) for a in args])
+        fs = fs.reshape((k + 1, len(active), k))
+        jac = np.moveaxis((fs[1:] - fs[0]) / h.T[:, :, None], 0, 2)
+        try:
+            dx = np.linalg.solve(jac, -fs[0][..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            break
+        finite = np.all(np.isfinite(dx), axis=1)
+        x[active[finite]] += dx[finite]
+        converged = finite & np.all(np.abs(dx) <= rtol * np.abs(xa), axis=1)
+        active = active[~converged]
+        if len(active) == 0:
+            break
+    for i in active:
+        x[i] = sp.optimize.fsolve(
+            lambda xi: func(xi[None], *[a[i:i + 1] for a in args])[0],
+            x0[i])
+    return x
+
+
+def _solve_inversion(func, x0, *args):
+    """Solve func(x, *args) = 0 for broadcast array arguments.
+
+    Args:
+        func: see `_solve_batched`.
+        x0: List of the initial values of the k unknowns, each scalar or
+            array.
+        args: Scalars or arrays passed to func.
+
+    Returns:
+        A tuple of the k solutions, of the broadcast shape of x0 and args.
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float)
+                                   for a in list(x0) + list(args)])
+    shape = arrays[0].shape
+    k = len(x0)
+    x = _solve_batched(func, np.stack([a.ravel() for a in arrays[:k]], axis=1),
+                       [a.ravel() for a in arrays[k:]])
+    return tuple(xi.reshape(shape)[()] for xi in x.T)
+
+
+def transmon_ec_ej(fge, anh, ng=0., dim_charge: int = 31):
     """Calculate the Hamiltonian parameters of a transmon.
 
-    Inverts the function `transmon_levels`.
+    Inverts the function `transmon_levels`. The arguments can be arrays, in
+    which case all the inversions are solved simultaneously.
 
     Args:
         fge: The first transition frequency of the transmon.
@@ -94,24 +175,24 @@ def transmon_ec_ej(fge: float, anh: float, ng: float = 0.,
     Returns:
         The charging energy and the Josephson energy of the transmon.
     """
+    fge, anh = [np.asarray(a, dtype=float) for a in (fge, anh)]
 
-    def func(ec_ej_, fge_anh_, ng_, dim_charge_):
-        fs = transmon_levels(*ec_ej_, ng_, dim_charge_)
-        return - fge_anh_ + [fs[0], fs[1] - 2 * fs[0]]
+    def func(ec_ej_, fge_, anh_, ng_):
+        fs = transmon_levels(ec_ej_[:, 0], ec_ej_[:, 1], ng_, dim_charge)
+        return np.stack([fs[:, 0] - fge_, fs[:, 1] - 2 * fs[:, 0] - anh_],
+                        axis=1)
 
     ec0 = -anh
     ej0 = -(fge - anh)**2 / 8 / anh
-    ec_ej = sp.optimize.fsolve(func, np.array([ec0, ej0]),
-                               args=(np.array([fge, anh]), ng, dim_charge))
-    return ec_ej[0], ec_ej[1]
+    return _solve_inversion(func, [ec0, ej0], fge, anh, ng)
 
 
-def transmon_ej_anh(fge: float, ec: float, ng: float = 0.,
-                    dim_charge: int = 31):
+def transmon_ej_anh(fge, ec, ng=0., dim_charge: int = 31):
     """Calculate the Josephson energy and the anharmonicity of a transmon.
 
     Inverts the function `transmon_levels`. Useful for finding the Josephson
-    energy at a new flux bias point.
+    energy at a new flux bias point. The arguments can be arrays, in which
+    case all the inversions are solved simultaneously.
 
     Args:
         fge: The first transition frequency of the transmon.
@@ -122,24 +203,24 @@ def transmon_ej_anh(fge: float, ec: float, ng: float = 0.,
     Returns:
         The Josephson energy and the anharmonicity of the transmon.
     """
+    fge, ec = [np.asarray(a, dtype=float) for a in (fge, ec)]
 
-    def func(ej_anh_, fge_ec, ng_, dim_charge_):
-        fs = transmon_levels(fge_ec[1], ej_anh_[0], ng_, dim_charge_)
-        return [fs[0] - fge_ec[0], fs[1] - 2 * fs[0] - ej_anh_[1]]
+    def func(ej_anh_, fge_, ec_, ng_):
+        fs = transmon_levels(ec_, ej_anh_[:, 0], ng_, dim_charge)
+        return np.stack([fs[:, 0] - fge_,
+                         fs[:, 1] - 2 * fs[:, 0] - ej_anh_[:, 1]], axis=1)
 
     ej0 = (fge + ec)**2 / 8 / ec
     anh0 = -ec
-    ej_anh = sp.optimize.fsolve(func, np.array([ej0, anh0]),
-                                args=([fge, ec], ng, dim_charge))
-    return ej_anh[0], ej_anh[1]
+    return _solve_inversion(func, [ej0, anh0], fge, ec, ng)
 
 
-def transmon_ej_fge(fef: float, ec: float, ng: float = 0.,
-                    dim_charge: int = 31):
+def transmon_ej_fge(fef, ec, ng=0., dim_charge: int = 31):
     """Calculate the Josephson energy and the excitation frequency of a transmon
 
     Inverts the function `transmon_levels`. Useful for finding the Josephson
-    energy at a new flux bias point.
+    energy at a new flux bias point. The arguments can be arrays, in which
+    case all the inversions are solved simultaneously.
 
     Args:
         fef: The second transition frequency of the transmon.
@@ -150,16 +231,16 @@ def transmon_ej_fge(fef: float, ec: float, ng: float = 0.,
     Returns:
         The Josephson energy and the anharmonicity of the transmon.
     """
+    fef, ec = [np.asarray(a, dtype=float) for a in (fef, ec)]
 
-    def func(ej_fge_, fef_ec, ng_, dim_charge_):
-        fs = transmon_levels(fef_ec[1], ej_fge_[0], ng_, dim_charge_)
-        return [fs[0] - ej_fge_[1], fs[1] - fs[0] - fef_ec[0]]
+    def func(ej_fge_, fef_, ec_, ng_):
+        fs = transmon_levels(ec_, ej_fge_[:, 0], ng_, dim_charge)
+        return np.stack([fs[:, 0] - ej_fge_[:, 1], fs[:, 1] - fs[:, 0] - fef_],
+                        axis=1)
 
     ej0 = (fef + 2 * ec)**2 / 8 / ec
     fge0 = fef + ec
-    ej_fge = sp.optimize.fsolve(func, np.array([ej0, fge0]),
-                                args=([fef, ec], ng, dim_charge))
-    return ej_fge[0], ej_fge[1]
+    return _solve_inversion(func, [ej0, fge0], fef, ec, ng)
 
 
 def charge_dispersion_ge_ef(fge: Optional[float] = None,
@@ -180,6 +261,8 @@ def charge_dispersion_ge_ef(fge: Optional[float] = None,
         ng: Charge offset of the Hamiltonian.
         dim_charge: Number of charge states to use in calculations.
 
+    The parameters can be arrays.
+
     Returns:
         Charge dispersion of the first and second transition of the transmon.
     """
@@ -199,8 +282,8 @@ def charge_dispersion_ge_ef(fge: Optional[float] = None,
                          '`charge_dispersion_ge_ef`')
 
     dfreqs = transmon_levels(ec, ej, ng, dim_charge)
-    dfreqs -= transmon_levels(ec, ej, ng + 0.5, dim_charge)
-    return dfreqs[0], dfreqs[0] - dfreqs[1]
+    dfreqs -= transmon_levels(ec, ej, np.add(ng, 0.5), dim_charge)
+    return dfreqs[..., 0][()], (dfreqs[..., 0] - dfreqs[..., 1])[()]
 
 
 @functools.lru_cache()
@@ -295,13 +378,35 @@ def transmon_resonator_fge_anh_frg_chi(ec: float, ej: float, frb: float,
     return f10, f20 - 2 * f10, f01, (f11 - f10 - f01) / 2
 
 
+def _transmon_resonator_observables(ec_ej_frb_gb, ng, dim_charge: int = 31,
+                                    dim_resonator: int = 10):
+    """Evaluate `transmon_resonator_fge_anh_frg_chi` for a batch of parameters.
+
+    The coupled Hamiltonians are diagonalized one by one, as the cost is
+    dominated by the dense eigendecomposition of each of them.
+
+    Args:
+        ec_ej_frb_gb: Array of shape (n, 4) of the Hamiltonian parameters.
+        ng: Array of shape (n,) of the charge offsets.
+        dim_charge: Number of charge states to use in calculations.
+        dim_resonator: Number of photon number states to use in calculations.
+
+    Returns:
+        An array of shape (n, 4) of the observable frequencies.
+    """
+    return np.array([transmon_resonator_fge_anh_frg_chi(
+        *pars, ng_, dim_charge, dim_resonator)
+        for pars, ng_ in zip(ec_ej_frb_gb, ng)])
+
+
 def transmon_resonator_ec_ej_frb_gb(fge: float, anh: float, frg: float,
                                     chi: float, ng: float = 0.,
                                     dim_charge: int = 31,
                                     dim_resonator: int = 10):
     """Calculate Hamiltonian parameters of a coupled transmon-resonator system.
 
-    Inverts the function `transmon_resonator_fge_anh_frg_chi`.
+    Inverts the function `transmon_resonator_fge_anh_frg_chi`. The arguments
+    can be arrays, see `_transmon_resonator_observables`.
 
     Args:
         fge: The first transition frequency of the transmon.
@@ -317,19 +422,20 @@ def transmon_resonator_ec_ej_frb_gb(fge: float, anh: float, frg: float,
         transmon, 3) the bare resonator frequency, and 4) the bare coupling
         strength.
     """
+    fge, anh, frg, chi = [np.asarray(a, dtype=float)
+                          for a in (fge, anh, frg, chi)]
 
-    def func(ec_ej_frb_gb_, fge_anh_frg_chi, ng_, dim_charge_, dim_resonator_):
-        return -fge_anh_frg_chi + transmon_resonator_fge_anh_frg_chi(
-            *ec_ej_frb_gb_, ng_, dim_charge_, dim_resonator_)
+    def func(ec_ej_frb_gb_, fge_, anh_, frg_, chi_, ng_):
+        return _transmon_resonator_observables(
+            ec_ej_frb_gb_, ng_, dim_charge, dim_resonator) - \
+            np.stack([fge_, anh_, frg_, chi_], axis=1)
 
     ec0 = -anh
     ej0 = -(fge - anh)**2 / 8 / anh
     frb0 = frg
     gb0 = np.sqrt(np.abs((fge + anh - frg) * (fge - frg) * chi / anh))
-    ec_ej_frb_gb = sp.optimize.fsolve(func, np.array([ec0, ej0, frb0, gb0]),
-                                      args=(np.array([fge, anh, frg, chi]),
-                                            ng, dim_charge, dim_resonator))
-    return tuple(ec_ej_frb_gb)
+    return _solve_inversion(func, [ec0, ej0, frb0, gb0], fge, anh, frg, chi,
+                            ng)
 
 
 def transmon_resonator_ej_anh_frg_chi(fge: float, ec: float, frb: float,
@@ -342,7 +448,8 @@ def transmon_resonator_ej_anh_frg_chi(fge: float, ec: float, frb: float,
 
     Calculates the Josephson energy, the transmon anharmonicity with the
     resonator in the ground state, the resonator frequency for the qubit in
-    the ground state and the dispersive shift of the resonator.
+    the ground state and the dispersive shift of the resonator. The arguments
+    can be arrays, see `_transmon_resonator_observables`.
 
     Args:
         ec: Charging energy of the Hamiltonian.
@@ -358,22 +465,22 @@ def transmon_resonator_ej_anh_frg_chi(fge: float, ec: float, frb: float,
         3) the resonator frequency for transmon ground state, and 4) the
         dispersive shift.
     """
+    fge, ec, frb, gb = [np.asarray(a, dtype=float)
+                        for a in (fge, ec, frb, gb)]
 
-    def func(ej_anh_frg_chi_, fge_ec_frb_gb, ng_, dim_charge_, dim_resonator_):
-        fge_, ec_, frb_, gb_ = fge_ec_frb_gb
-        ej, anh, frg, chi = ej_anh_frg_chi_
-        calc_fge_anh_frg_chi = transmon_resonator_fge_anh_frg_chi(
-            ec_, ej, frb_, gb_, ng_, dim_charge_, dim_resonator_)
-        return calc_fge_anh_frg_chi - np.array([fge_, anh, frg, chi])
+    def func(ej_anh_frg_chi_, fge_, ec_, frb_, gb_, ng_):
+        ej, anh, frg, chi = ej_anh_frg_chi_.T
+        calc_fge_anh_frg_chi = _transmon_resonator_observables(
+            np.stack([ec_, ej, frb_, gb_], axis=1), ng_, dim_charge,
+            dim_resonator)
+        return calc_fge_anh_frg_chi - np.stack([fge_, anh, frg, chi], axis=1)
 
     anh0 = -ec
     ej0 = (fge + ec)**2 / 8 / ec
     frg0 = frb
     chi0 = -gb**2 * (fge - ec) / (fge - frb) / (fge - frb - ec) / 16
-    ej_anh_frg_chi = sp.optimize.fsolve(func, np.array([ej0, anh0, frg0, chi0]),
-                                        args=(np.array([fge, ec, frb, gb]),
-                                              ng, dim_charge, dim_resonator))
-    return tuple(ej_anh_frg_chi)
+    return _solve_inversion(func, [ej0, anh0, frg0, chi0], fge, ec, frb, gb,
+                            ng)
 
 
 def transmon_resonator_ej_anh_frb_chi(fge: float, ec: float, frg: float,
@@ -386,7 +493,8 @@ def transmon_resonator_ej_anh_frb_chi(fge: float, ec: float, frg: float,
 
     Calculates the Josephson energy, the transmon anharmonicity with the
     resonator in the ground state, the bare resonator frequency and the
-    dispersive shift of the resonator.
+    dispersive shift of the resonator. The arguments can be arrays, see
+    `_transmon_resonator_observables`.
 
     Args:
         ec: Charging energy of the Hamiltonian.
@@ -401,22 +509,22 @@ def transmon_resonator_ej_anh_frb_chi(fge: float, ec: float, frg: float,
         A tuple of 1) transmon Josephson energy, 2) qubit anharmonicity,
         3) bare resonator frequency, and 4) the dispersive shift.
     """
+    fge, ec, frg, gb = [np.asarray(a, dtype=float)
+                        for a in (fge, ec, frg, gb)]
 
-    def func(ej_anh_frb_chi_, fge_ec_frg_gb, ng_, dim_charge_, dim_resonator_):
-        fge_, ec_, frg_, gb_ = fge_ec_frg_gb
-        ej, anh, frb, chi = ej_anh_frb_chi_
-        calc_fge_anh_frg_chi = transmon_resonator_fge_anh_frg_chi(
-            ec_, ej, frb, gb_, ng_, dim_charge_, dim_resonator_)
-        return calc_fge_anh_frg_chi - np.array([fge_, anh, frg_, chi])
+    def func(ej_anh_frb_chi_, fge_, ec_, frg_, gb_, ng_):
+        ej, anh, frb, chi = ej_anh_frb_chi_.T
+        calc_fge_anh_frg_chi = _transmon_resonator_observables(
+            np.stack([ec_, ej, frb, gb_], axis=1), ng_, dim_charge,
+            dim_resonator)
+        return calc_fge_anh_frg_chi - np.stack([fge_, anh, frg_, chi], axis=1)
 
     anh0 = -ec
     ej0 = (fge + ec)**2 / 8 / ec
     frb0 = frg
     chi0 = -gb**2 * (fge - ec) / (fge - frg) / (fge - frg - ec) / 16
-    ej_anh_frb_chi = sp.optimize.fsolve(func, np.array([ej0, anh0, frb0, chi0]),
-                                        args=(np.array([fge, ec, frg, gb]),
-                                              ng, dim_charge, dim_resonator))
-    return tuple(ej_anh_frb_chi)
+    return _solve_inversion(func, [ej0, anh0, frb0, chi0], fge, ec, frg, gb,
+                            ng)
 
 
 @np.vectorize
@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from pycqed.analysis import analysis_toolbox as a_tools
+from pycqed.analysis import three_state_rotation as tsr
+
+
+class Test_predict_gm_proba_from_cal_points(unittest.TestCase):
+
+    def test_points_inside_cal_points(self):
+        cal_points = np.array([[0., 0.], [1., 0.2], [0.3, 1.]])
+        probas = np.random.dirichlet(np.ones(3), size=100)
+        X = probas @ cal_points
+        np.testing.assert_array_almost_equal(
+            a_tools.predict_gm_proba_from_cal_points(X, cal_points), probas)
+
+    def test_points_outside_cal_points(self):
+        cal_points = np.array([[0., 0.], [1., 0.5]])
+        X = np.array([[-1., 0.], [2., 2.], [0.5, 0.25], [0.5, 5.]])
+        # L1 distance: the first channel dominates for the last point
+        probas = a_tools.predict_gm_proba_from_cal_points(X, cal_points)
+        np.testing.assert_array_almost_equal(
+            probas, [[1, 0], [0, 1], [0.5, 0.5], [0.5, 0.5]])
+
+    def test_minimal_l1_distance(self):
+        # compare the distances with a brute force search over the simplex
+        cal_points = np.array([[0., 0.], [1., 0.2], [0.3, 1.]])
+        X = np.random.normal(0.4, 0.6, size=(20, 2))
+        probas = a_tools.predict_gm_proba_from_cal_points(X, cal_points)
+        np.testing.assert_array_almost_equal(probas.sum(axis=1), 1)
+        self.assertTrue(np.all(probas >= 0))
+        p0, p1 = np.meshgrid(np.linspace(0, 1, 201), np.linspace(0, 1, 201))
+        grid = np.stack([p0.ravel(), p1.ravel(), 1 - p0.ravel() - p1.ravel()],
+                        axis=1)
+        grid = grid[grid[:, 2] >= 0]
+        for x, p in zip(X, probas):
+            dist = np.sum(np.abs(x - p @ cal_points))
+            dist_grid = np.sum(np.abs(x - grid @ cal_points), axis=1)
+            self.assertLessEqual(dist, dist_grid.min() + 1e-12)
+
+
+class Test_rotate_and_normalize_data_TwoD(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        rng = np.random.RandomState(0)
+        self.I = rng.normal(size=(30, 12))
+        self.Q = 0.5 * self.I + 0.3 * rng.normal(size=(30, 12))
+        self.cal_zero_points = [-4, -3]
+        self.cal_one_points = [-2, -1]
+
+    def test_IQ_equals_columnwise(self):
+        for cal_pts in [(self.cal_zero_points, self.cal_one_points),
+                        (None, None)]:
+            rotated = a_tools.rotate_and_normalize_data_IQ_TwoD(
+                np.array([self.I, self.Q]), *cal_pts)[0]
+            for col in range(self.I.shape[1]):
+                np.testing.assert_array_almost_equal(
+                    rotated[:, col], a_tools.rotate_and_normalize_data_IQ(
+                        np.array([self.I[:, col], self.Q[:, col]]),
+                        *cal_pts)[0])
+
+    def test_1ch_equals_columnwise(self):
+        normalized = a_tools.rotate_and_normalize_data_1ch_TwoD(
+            self.I, self.cal_zero_points, self.cal_one_points)
+        for col in range(self.I.shape[1]):
+            np.testing.assert_array_almost_equal(
+                normalized[:, col], a_tools.rotate_and_normalize_data_1ch(
+                    self.I[:, col], self.cal_zero_points,
+                    self.cal_one_points))
+
+    def test_three_states_equals_columnwise(self):
+        raw_data = np.stack([self.I, self.Q], axis=-1)
+        cal_pts_idxs = [[-6, -5], self.cal_zero_points, self.cal_one_points]
+        cal_points = np.array([np.mean(raw_data[idxs], axis=0)
+                               for idxs in cal_pts_idxs])
+        probas = tsr.predict_proba_avg_ro_TwoD(
+            raw_data, np.swapaxes(cal_points, 0, 1))
+        for col in range(self.I.shape[1]):
+            np.testing.assert_array_almost_equal(
+                probas[:, col], tsr.predict_proba_avg_ro(
+                    raw_data[:, col], cal_points[:, col]))
@@ -0,0 +1,107 @@
+import unittest
+import lmfit
+import numpy as np
+
+from pycqed.analysis import fitting_models as fit_mods
+from pycqed.analysis.tools import batch_fitting as bf
+
+
+def exp_decay(t, amplitude, tau, offset):
+    return amplitude * np.exp(-t / tau) + offset
+
+
+def complex_lorentzian(f, A, f0, kappa):
+    return A / (1 + 2j * (f - f0) / kappa)
+
+
+class Test_batch_fitting(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        rng = np.random.RandomState(0)
+        self.t = np.linspace(0, 50e-6, 41)
+        self.taus = np.linspace(5e-6, 20e-6, 15)
+        self.data = [exp_decay(self.t, 1, tau, 0.05) +
+                     0.01 * rng.randn(len(self.t)) for tau in self.taus]
+
+        self.freqs = np.linspace(5.9e9, 6.1e9, 61)
+        self.centers = 6e9 + 5e7 * np.sin(np.arange(12) / 3)
+        self.data_gauss = [np.exp(-(self.freqs - c)**2 / (2 * 1e7**2)) +
+                           0.01 * rng.randn(len(self.freqs))
+                           for c in self.centers]
+
+    def assert_results_equal(self, res_batch, res_serial, par_names):
+        self.assertIs(type(res_batch), lmfit.model.ModelResult)
+        for p in par_names:
+            stderr = res_serial.params[p].stderr
+            self.assertLess(abs(res_batch.params[p].value -
+                                res_serial.params[p].value), 1e-3 * stderr)
+            np.testing.assert_allclose(res_batch.params[p].stderr, stderr,
+                                       rtol=1e-3)
+        np.testing.assert_allclose(res_batch.chisqr, res_serial.chisqr,
+                                   rtol=1e-6)
+        np.testing.assert_allclose(res_batch.best_fit, res_serial.best_fit,
+                                   rtol=1e-6, atol=1e-9)
+
+    def test_batch_fit_broadcasting_model(self):
+        model = lmfit.Model(exp_decay, independent_vars=['t'])
+        guesses = [model.make_params(amplitude=0.8, tau=10e-6, offset=0)
+                   for _ in self.data]
+        results = bf.batch_fit(model, guesses, self.data, {'t': self.t})
+        for res, data, guess in zip(results, self.data, guesses):
+            res_serial = model.fit(data, t=self.t, params=guess)
+            self.assert_results_equal(res, res_serial,
+                                      ['amplitude', 'tau', 'offset'])
+            self.assertEqual(res.best_values.keys(),
+                             res_serial.best_values.keys())
+        np.testing.assert_allclose(
+            [res.best_values['tau'] for res in results], self.taus,
+            rtol=0.05)
+
+    def test_batch_fit_scalar_model_with_derived_parameters(self):
+        # lmfit's gaussian lineshape does not broadcast its parameters and
+        # the model contains the derived parameters fwhm and height
+        model = fit_mods.GaussianModel_v2()
+        guesses = [model.guess(data=d, x=self.freqs) for d in self.data_gauss]
+        results = bf.batch_fit(model, guesses, self.data_gauss,
+                               {'x': self.freqs})
+        for res, data, guess in zip(results, self.data_gauss, guesses):
+            res_serial = model.fit(data, x=self.freqs, params=guess)
+            self.assert_results_equal(res, res_serial,
+                                      ['amplitude', 'center', 'sigma'])
+            np.testing.assert_allclose(res.params['fwhm'].stderr,
+                                       res_serial.params['fwhm'].stderr,
+                                       rtol=1e-3)
+
+    def test_batch_fit_unsupported(self):
+        model = lmfit.Model(exp_decay, independent_vars=['t'])
+        guesses = [model.make_params(amplitude=0.8, tau=10e-6, offset=0)
+                   for _ in self.data]
+        # constrained function argument
+        guesses[0]['offset'].expr = '0.1*amplitude'
+        self.assertEqual(
+            bf.batch_fit(model, guesses, self.data, {'t': self.t}),
+            [None] * len(self.data))
+        # composite model
+        model = lmfit.models.ExponentialModel() + lmfit.models.ConstantModel()
+        guesses = [model.make_params(amplitude=1, decay=10e-6, c=0)
+                   for _ in self.data]
+        self.assertEqual(
+            bf.batch_fit(model, guesses, self.data, {'x': self.t}),
+            [None] * len(self.data))
+
+    def test_batch_fit_complex(self):
+        # complex data and models are not batched, as the residuals have to
+        # be split into real and imaginary parts
+        model = lmfit.Model(complex_lorentzian)
+        f = np.linspace(-1, 1, 51)
+        f0s = [-0.6, -0.2, 0.2, 0.6]
+        guesses = [model.make_params(A=1, f0=f0 - 0.1, kappa=0.15)
+                   for f0 in f0s]
+        data = [complex_lorentzian(f, 1, f0, 0.3) for f0 in f0s]
+        self.assertEqual(bf.batch_fit(model, guesses, data, {'f': f}),
+                         [None] * len(data))
+        # real data with a complex model
+        self.assertEqual(
+            bf.batch_fit(model, guesses, [np.abs(d) for d in data],
+                         {'f': f}), [None] * len(data))
@@ -0,0 +1,37 @@
+import unittest
+import lmfit
+import numpy as np
+
+from pycqed.analysis import fitting_models as fit_mods
+from pycqed.analysis.tools import parallel_fitting as pf
+
+
+class Test_parallel_fitting(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        x = np.linspace(-1, 1, 101)
+        model = fit_mods.GaussianModel_v2()
+        self.jobs = []
+        for i in range(8):
+            y = np.exp(-(x - 0.1 * i)**2 / 0.05) + 0.01 * np.sin(7 * i * x)
+            self.jobs.append((model, model.guess(y, x=x), {'x': x},
+                              {'data': y}, {}))
+        # models of lambdas cannot be pickled and are fitted serially
+        lin_model = lmfit.Model(lambda x, a: a * x)
+        self.jobs.append((lin_model, lin_model.make_params(a=1), {'x': x},
+                          {'data': 3 * x}, {}))
+
+    def test_processes_equal_serial(self):
+        serial = pf.fit_jobs(self.jobs, executor='serial')
+        parallel = pf.fit_jobs(self.jobs, executor='processes', n_workers=2)
+        self.assertEqual(len(parallel), len(self.jobs))
+        for (res_s, _), (res_p, fit_time) in zip(serial, parallel):
+            self.assertIs(type(res_p), lmfit.model.ModelResult)
+            self.assertEqual(res_s.best_values, res_p.best_values)
+            self.assertGreater(fit_time, 0)
+        self.assertAlmostEqual(parallel[-1][0].best_values['a'], 3)
+
+    def test_unknown_executor(self):
+        with self.assertRaises(ValueError):
+            pf.fit_jobs(self.jobs, executor='threads')
@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+import numpy as np
+from pycqed.analysis import process_tomography as pt
+
+
+class Test_QPT_Coefficients(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with mock.patch.object(pt, '_coefficients', None):
+            cls.coeffs = pt.get_qpt_coefficients()
+            # the cached coefficients are returned the second time
+            cls.cached_coeffs = pt.get_qpt_coefficients()
+
+    def test_coefficients(self):
+        self.assertEqual(self.coeffs.shape, (256, 1296, 4))
+        self.assertIs(self.cached_coeffs, self.coeffs)
+        rng = np.random.RandomState(0)
+        for m, n, l, k, j in zip(*[rng.randint(r, size=20) for r in
+                                   [16, 16, 36, 36, 4]]):
+            self.assertAlmostEqual(self.coeffs[16*m + n, 36*l + k, j],
+                                   pt.qpt_matrix_term(l, n, k, j, m))
+
+    def test_qpt_matrix(self):
+        rng = np.random.RandomState(0)
+        betas = rng.normal(size=(3, 4, 36))
+        with mock.patch.object(pt, '_coefficients', self.coeffs):
+            matrix = pt.qpt_matrix(betas)
+            self.assertEqual(matrix.shape, (3*1296, 256))
+            for b, i, s in zip(*[rng.randint(r, size=20) for r in
+                                 [3, 1296, 256]]):
+                self.assertAlmostEqual(
+                    matrix[b*1296 + i, s],
+                    pt.qtp_matrix_element(s, i, betas[b, :, i // 36]))
+
+    def test_bootstrap_weights(self):
+        weights = pt.bootstrap_weights(10, 5)
+        self.assertEqual(weights.shape, (10, 5))
+        np.testing.assert_allclose(weights.sum(axis=0), 1)
@@ -1,3 +1,4 @@
+import itertools
 import unittest
 import numpy as np
 import pycqed as pq
@@ -202,3 +203,46 @@ class Test_multiplexed_readout_analysis(unittest.TestCase):
         a = ma.Multiplexed_Readout_Analysis(t_start=t_start, t_stop=t_stop,
                                             qubit_names=['QR', 'QL'])
         np.testing.assert_equal(a.proc_data_dict['qubit_names'], ['QR', 'QL'])
+
+
+class Test_MultiQubit_SingleShot_probability_table(unittest.TestCase):
+
+    def test_probability_table_bincount_matches_masks(self):
+        rng = np.random.RandomState(0)
+        n_readouts = 3
+        qubits = ['qb1', 'qb2', 'qb3']
+        shots = {qb: rng.rand(n_readouts*500) < 0.3 for qb in qubits}
+        shot_filter = rng.rand(n_readouts*500) < 0.9
+        preselection = {(qb, -1): False for qb in qubits}
+        # the empty observable is first such that no qubit has been checked
+        observables = [{}, preselection]
+        for states in itertools.product([False, True], repeat=len(qubits)):
+            observables.append(dict(zip(qubits, states)))
+            observables[-1].update(preselection)
+        observables.append({'qb1': True, ('qb2', 1): False})
+
+        # few bits per shot use a dense histogram, many bits a sparse one
+        few_bits_observables = [{}, {'qb1': True},
+                                {'qb2': False, ('qb3', 1): True}]
+
+        msa = ra.MultiQubit_SingleShot_Analysis
+        for obs in [observables, few_bits_observables]:
+            for filt in [None, shot_filter]:
+                table = msa.probability_table(shots, obs, n_readouts, filt)
+                table_masks = msa._probability_table_masks(
+                    shots, obs, n_readouts, filt)
+                self.assertEqual(table.shape, (n_readouts, len(obs)))
+                np.testing.assert_array_almost_equal(table, table_masks)
+                if filt is not None:
+                    np.testing.assert_array_almost_equal(
+                        table[:, 0], 1)
+
+    def test_probability_table_counts(self):
+        shots = {'qb1': np.array([0, 0, 1, 1, 0, 1, 1, 1]),
+                 'qb2': np.array([0, 1, 0, 1, 1, 1, 0, 0])}
+        observables = [{'qb1': False}, {'qb1': True, 'qb2': True},
+                       {('qb1', 1): True}, {'qb1': True, ('qb1', 0): False}]
+        table = ra.MultiQubit_SingleShot_Analysis.probability_table(
+            shots, observables, 2)
+        np.testing.assert_array_almost_equal(
+            table, [[0.5, 0, 0.75, 0], [0.25, 0.5, 0.5, 0]])
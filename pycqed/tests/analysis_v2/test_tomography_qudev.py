@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+import qutip as qtp
+from pycqed.analysis_v2 import tomography_qudev as tomo
+
+
+class Test_MLE_Tomography(unittest.TestCase):
+
+    def setUp(self):
+        # measurement operators: projectors onto the eigenstates of the
+        # two-qubit Pauli operators
+        self.Fs = [(qtp.qeye(4) + P) / 2 for P in
+                   tomo.generate_pauli_set(2)[1]]
+        psi = np.array([1, 0, 0, 1j]) / np.sqrt(2)
+        self.rho = qtp.Qobj(np.outer(psi, psi.conj()))
+        self.mus = np.array([(self.rho * F).tr().real for F in self.Fs])
+
+    def test_reconstructs_state(self):
+        rho = tomo.mle_tomography(self.mus, self.Fs)
+        np.testing.assert_allclose(rho.full(), self.rho.full(), atol=1e-6)
+
+    def test_physical(self):
+        rng = np.random.RandomState(0)
+        mus = self.mus + rng.normal(scale=0.05, size=len(self.mus))
+        rho = tomo.mle_tomography(mus, self.Fs)
+        self.assertAlmostEqual(rho.tr().real, 1)
+        self.assertGreater(rho.eigenenergies().min(), -1e-12)
+        # not worse than the least squares estimate projected to the
+        # physical states
+        rho_ls = tomo.least_squares_tomography(mus, self.Fs)
+        rho_ls = qtp.Qobj(tomo.project_density_matrix(rho_ls.full()))
+        cost = lambda r: np.sum(
+            (mus - [(r * F).tr().real for F in self.Fs]) ** 2)
+        self.assertLessEqual(cost(rho), cost(rho_ls) + 1e-12)
+
+    def test_batch(self):
+        rng = np.random.RandomState(0)
+        mus = self.mus + rng.normal(scale=0.05, size=(5, len(self.mus)))
+        rhos = tomo.mle_tomography(mus, self.Fs)
+        self.assertEqual(len(rhos), 5)
+        for m, rho in zip(mus, rhos):
+            np.testing.assert_allclose(
+                rho.full(), tomo.mle_tomography(m, self.Fs).full(), atol=1e-6)
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from collections import OrderedDict
+
+from pycqed.analysis_v3 import data_processing as dat_proc
+
+
+def preselection_mask_loop(classif_data, presel_ro_idxs, presel_condition):
+    # reference: per-index loop of the original implementation
+    mask = np.zeros(len(classif_data), dtype=bool)
+    val = True
+    for idx in range(len(classif_data)):
+        if presel_ro_idxs(idx):
+            val = (classif_data[idx] == presel_condition)
+            mask[idx] = False
+        else:
+            mask[idx] = val
+    return mask
+
+
+class Test_preselection(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        rng = np.random.RandomState(0)
+        self.qb1 = rng.randint(0, 2, 60)
+        self.qb2 = rng.randint(0, 3, 60)
+        self.presel_ro_idxs = [
+            # evaluated on the array of all indices
+            lambda idx: idx % 2 == 0,
+            lambda idx: idx % 3 == 0,
+            # only supporting scalar indices
+            lambda idx: idx in {1, 2, 7, 8, 30, 59},
+            lambda idx: idx % 4 == 0 or idx % 5 == 0,
+        ]
+
+    def test_mask_equals_loop(self):
+        for presel_ro_idxs in self.presel_ro_idxs:
+            for data, condition in [(self.qb1, 0), (self.qb1, 1),
+                                    (self.qb2, 2)]:
+                np.testing.assert_array_equal(
+                    dat_proc._get_preselection_mask(
+                        data, presel_ro_idxs,
+                        presel_condition=condition),
+                    preselection_mask_loop(data, presel_ro_idxs, condition))
+
+    def test_mask_presel_period(self):
+        np.testing.assert_array_equal(
+            dat_proc._get_preselection_mask(self.qb1, presel_period=3,
+                                            presel_condition=1),
+            preselection_mask_loop(self.qb1, lambda idx: idx % 3 == 0, 1))
+
+    def test_do_preselection(self):
+        data_dict = OrderedDict([('qb1', self.qb1), ('qb2', self.qb2)])
+        dat_proc.do_preselection(data_dict, ['qb1', 'qb2'],
+                                 ['qb1_presel', 'qb2_presel'],
+                                 presel_condition=1)
+        for qbn in ['qb1', 'qb2']:
+            np.testing.assert_array_equal(
+                data_dict[f'{qbn}_presel'],
+                data_dict[qbn][preselection_mask_loop(
+                    data_dict[qbn], lambda idx: idx % 2 == 0, 1)])
+
+    def test_do_joint_preselection(self):
+        data_dict = OrderedDict([('qb1', self.qb1), ('qb2', self.qb2)])
+        for presel_ro_idxs in self.presel_ro_idxs:
+            dat_proc.do_joint_preselection(
+                data_dict, ['qb1', 'qb2'], ['qb1_presel', 'qb2_presel'],
+                presel_ro_idxs=presel_ro_idxs, presel_condition=[0, 2],
+                update_key=True)
+            # a preselection readout passes if both qubits satisfy their
+            # own condition
+            joint = np.logical_and(self.qb1 == 0, self.qb2 == 2)
+            mask = preselection_mask_loop(joint, presel_ro_idxs, True)
+            np.testing.assert_array_equal(data_dict['qb1_presel'],
+                                          self.qb1[mask])
+            np.testing.assert_array_equal(data_dict['qb2_presel'],
+                                          self.qb2[mask])
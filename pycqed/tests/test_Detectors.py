@@ -201,3 +201,48 @@ class Test_Detectors(unittest.TestCase):
         self.mock_parabola.close()
         del self.station.components['MC']
         del self.station.components['mock_parabola']
+
+
+class Test_UHFQC_poll_data(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        import pycqed.instrument_drivers.physical_instruments.\
+            ZurichInstruments.UHFQuantumController as UHF
+        self.UHFs = [UHF.UHFQC(name=f'UHF{i}', server='emulator',
+                               device=f'dev{2110 + i}', interface='1GbE')
+                     for i in range(2)]
+
+    def make_detector(self, samples, nr_sweep_points):
+        detectors = []
+        for uhf in self.UHFs:
+            uhf.qudev_acquisition_initialize(
+                samples=samples, averages=1, loop_cnt=1, channels=(0, 1))
+            d = det.UHFQC_Base(UHFQC=uhf)
+            d.nr_sweep_points = nr_sweep_points
+            detectors.append(d)
+        return det.UHFQC_Base(detectors=detectors)
+
+    def test_poll_data(self):
+        d = self.make_detector(samples=100, nr_sweep_points=1050)
+        data = d.poll_data()
+        self.assertEqual(set(data), {uhf.name for uhf in self.UHFs})
+        for uhf in self.UHFs:
+            # all polled samples are kept, including those of the last poll
+            self.assertEqual(data[uhf.name].shape, (2, 1100))
+
+    def test_poll_data_timeout(self):
+        d = self.make_detector(samples=1, nr_sweep_points=10**9)
+        for uhf in self.UHFs:
+            uhf.timeout(0)
+        try:
+            with self.assertRaises(TimeoutError):
+                d.poll_data()
+        finally:
+            for uhf in self.UHFs:
+                uhf.timeout(30)
+
+    @classmethod
+    def tearDownClass(self):
+        for uhf in self.UHFs:
+            uhf.close()
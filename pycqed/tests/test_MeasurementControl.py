@@ -449,6 +449,59 @@ class Test_MeasurementControl(unittest.TestCase):
         np.testing.assert_array_almost_equal(x, sweep_pts)
         np.testing.assert_array_almost_equal(y0, y_exp, decimal=5)
 
+    def test_background_writing(self):
+        self.mock_parabola.noise(0)
+        self.mock_parabola.y(0)
+        self.mock_parabola.z(0)
+        sweep_pts = np.linspace(0, 10, 30)
+        self.MC.background_writing(True)
+        self.MC.data_flush_interval(0)
+        try:
+            self.MC.soft_avg(2)
+            self.MC.set_sweep_function(self.mock_parabola.x)
+            self.MC.set_sweep_points(sweep_pts)
+            self.MC.set_detector_function(self.mock_parabola.parabola)
+            dat = self.MC.run('1D_soft_background')
+
+            self.MC.soft_avg(1)
+            self.MC.set_sweep_function(None_Sweep(sweep_control='hard'))
+            self.MC.set_sweep_points(sweep_pts)
+            self.MC.set_detector_function(det.Dummy_Detector_Hard())
+            dat_hard = self.MC.run('1D_hard_background')
+        finally:
+            self.MC.background_writing(False)
+            self.MC.data_flush_interval(1)
+        self.assertIsNone(self.MC._background_worker)
+        dset = dat["dset"]
+        np.testing.assert_array_almost_equal(dset[:, 0], sweep_pts)
+        np.testing.assert_array_almost_equal(dset[:, 1], sweep_pts**2,
+                                             decimal=5)
+        dset = dat_hard["dset"]
+        np.testing.assert_array_almost_equal(dset[:, 0], sweep_pts)
+        np.testing.assert_array_almost_equal(
+            dset[:, 1], np.sin(sweep_pts / np.pi))
+
+    def test_soft_sweep_1D_batched_flush(self):
+        self.mock_parabola.noise(0)
+        self.mock_parabola.y(0)
+        self.mock_parabola.z(0)
+        sweep_pts = np.linspace(0, 10, 30)
+        # data are only written to the file at the end of the measurement
+        self.MC.data_flush_interval(1e3)
+        self.MC.soft_avg(3)
+        self.MC.set_sweep_function(self.mock_parabola.x)
+        self.MC.set_sweep_points(sweep_pts)
+        self.MC.set_detector_function(self.mock_parabola.parabola)
+        try:
+            dat = self.MC.run('1D_soft_batched')
+        finally:
+            self.MC.data_flush_interval(1)
+        dset = dat["dset"]
+        self.assertEqual(dset.shape, (30, 2))
+        np.testing.assert_array_almost_equal(dset[:, 0], sweep_pts)
+        np.testing.assert_array_almost_equal(dset[:, 1], sweep_pts**2,
+                                             decimal=5)
+
     def test_adaptive_measurement_nelder_mead(self):
         self.MC.soft_avg(1)
         self.mock_parabola.noise(0)
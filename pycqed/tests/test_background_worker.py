@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from pycqed.measurement.background_worker import BackgroundWorker
+
+
+class Test_BackgroundWorker(unittest.TestCase):
+
+    def test_tasks_executed_in_order(self):
+        worker = BackgroundWorker(maxsize=2)
+        results = []
+        for i in range(20):
+            worker.submit(results.append, i)
+        worker.close()
+        self.assertEqual(results, list(range(20)))
+        self.assertFalse(worker.is_alive())
+
+    def test_error_raised_in_submitting_thread(self):
+        worker = BackgroundWorker()
+
+        def fail():
+            raise ValueError('write failed')
+        worker.submit(fail)
+        with self.assertRaises(ValueError):
+            worker.join()
+        # the worker can be used after the error has been raised
+        results = []
+        worker.submit(results.append, 1)
+        worker.close()
+        self.assertEqual(results, [1])
+
+    def test_optional_tasks(self):
+        worker = BackgroundWorker(maxsize=1)
+        release = threading.Event()
+        worker.submit(release.wait)
+        worker.submit(lambda: None)  # fills the queue
+        results = []
+        # dropped instead of blocking, as the queue is full
+        worker.submit(results.append, 1, optional=True)
+        release.set()
+
+        def fail():
+            raise ValueError('plot update failed')
+        worker.submit(fail, optional=True)
+        worker.close()
+        self.assertEqual(results, [])
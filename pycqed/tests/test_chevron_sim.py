@@ -0,0 +1,36 @@
+import numpy as np
+from unittest import TestCase
+
+from pycqed.simulations import chevron_sim
+
+
+class TestChevronSim(TestCase):
+
+    def test_rabisim_batch(self):
+        e0, g, t, dt = 0.2, 0.01, 100, 1.
+        sf = lambda t: 1 - 0.05*np.exp(-t/30.)
+        ts = np.arange(1., t+0.5*dt, dt)
+        for energy in [0.7, 1., 1.3]:
+            efun = lambda t: e0*(1.-(energy*sf(t))**2)
+            np.testing.assert_allclose(
+                chevron_sim.rabisim_batch(efun(ts), g, dt),
+                chevron_sim.rabisim(efun, g, t, dt), atol=1e-12)
+        # resonant and uncoupled propagation
+        np.testing.assert_allclose(
+            chevron_sim.rabisim_batch(np.zeros(10), 0., dt),
+            chevron_sim.rabisim(lambda t: 0., 0., 10, dt), atol=1e-15)
+
+    def test_chevron(self):
+        e0, emin, emax, n, g, t, dt = 0.2, -0.3, 0.3, 11, 0.01, 100, 1.
+        # step function which does not accept arrays
+        sf = lambda t: 1. if t < 50 else 0.98
+        chevron = chevron_sim.chevron(e0, emin, emax, n, g, t, dt, sf)
+        energy_vec = np.arange(1+emin, 1+emax, (emax-emin)/(n-1))
+        self.assertEqual(chevron.shape, (len(energy_vec), t))
+        for energy, chevron_slice in zip(energy_vec, chevron):
+            efun = lambda t: e0*(1.-(energy*sf(t))**2)
+            expected = chevron_sim.qamp(chevron_sim.rabisim(efun, g, t, dt))
+            np.testing.assert_allclose(chevron_slice, expected, atol=1e-12)
+            np.testing.assert_allclose(
+                chevron_sim.chevron_slice(e0, energy, g, t, dt, sf),
+                expected, atol=1e-12)
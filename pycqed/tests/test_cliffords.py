@@ -1,6 +1,8 @@
+import os
+import tempfile
 import numpy as np
 from unittest import expectedFailure
-from unittest import TestCase
+from unittest import TestCase, mock
 from zlib import crc32
 
 from pycqed.measurement.randomized_benchmarking.clifford_group import(
@@ -15,6 +17,8 @@ from pycqed.measurement.randomized_benchmarking.clifford_decompositions \
 
 from pycqed.measurement.randomized_benchmarking import \
     two_qubit_clifford_group as tqc
+from pycqed.measurement.randomized_benchmarking import \
+    CliffordLookuptables as clut
 from pycqed.measurement.randomized_benchmarking.generate_clifford_hash_tables import construct_clifford_lookuptable
 
 
@@ -259,6 +263,40 @@ class TestCliffordCalculus(TestCase):
             Cl_inv = Cl.get_inverse()
             self.assertEqual((Cl_inv*Cl).idx, 0)
 
+    def test_cached_clifford_tables(self):
+        ptms = tqc.CLut.get_clifford_ptms(number_of_qubits=2)
+        inverse_table = tqc.CLut.get_clifford_inverse_table(
+            number_of_qubits=2)
+        self.assertEqual(np.shape(ptms), (11520, 16, 16))
+        for i in test_indices_2Q:
+            np.testing.assert_array_equal(
+                ptms[i], tqc.TwoQubitClifford(i).pauli_transfer_matrix)
+            self.assertEqual(
+                tqc.CLut(ptms[inverse_table[i]] @ ptms[i]), 0)
+
+    def test_corrupted_clifford_tables(self):
+        expected = [tqc.CLut.get_clifford_ptms(number_of_qubits=1),
+                    tqc.CLut.get_clifford_inverse_table(number_of_qubits=1)]
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(clut, 'hash_dir', tmp_dir), \
+                mock.patch.object(tqc.CLut, '_ptm_tables', {}), \
+                mock.patch.object(tqc.CLut, '_inverse_tables', {}):
+            fns = [os.path.join(tmp_dir, tqc.CLut._ptm_file_name(1)),
+                   os.path.join(tmp_dir, tqc.CLut._inverse_file_name(1))]
+            # a truncated file and a file with a table of the wrong shape
+            np.save(fns[0], expected[0])
+            with open(fns[0], 'r+b') as f:
+                f.truncate(100)
+            np.save(fns[1], expected[1][:5])
+            tables = [tqc.CLut.get_clifford_ptms(number_of_qubits=1),
+                      tqc.CLut.get_clifford_inverse_table(number_of_qubits=1)]
+            for table, exp, fn in zip(tables, expected, fns):
+                np.testing.assert_array_equal(table, exp)
+                # the regenerated tables replace the corrupted files
+                np.testing.assert_array_equal(np.load(fn), exp)
+            self.assertEqual(sorted(os.listdir(tmp_dir)),
+                             sorted(os.path.basename(fn) for fn in fns))
+
 class TestCliffordGateDecomposition(TestCase):
     def test_single_qubit_gate_decomposition(self):
         for i in range(24):
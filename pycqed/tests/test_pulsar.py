@@ -0,0 +1,278 @@
+import os
+import tempfile
+import numpy as np
+from unittest import TestCase, mock
+
+import pycqed.instrument_drivers.physical_instruments.ZurichInstruments.ZI_HDAWG8 as HDAWG
+import pycqed.measurement.waveform_control.pulsar as ps
+from pycqed.measurement.waveform_control.segment import Segment
+from pycqed.measurement.waveform_control.sequence import Sequence
+
+
+def drag_pulse(name, amplitude=0.1, phase=0, **kw):
+    pulse = {'name': name,
+             'pulse_type': 'SSB_DRAG_pulse',
+             'I_channel': 'HD_ch1',
+             'Q_channel': 'HD_ch2',
+             'amplitude': amplitude,
+             'sigma': 10e-9,
+             'nr_sigma': 4,
+             'mod_frequency': 100e6,
+             'phase': phase}
+    pulse.update(kw)
+    return pulse
+
+
+class TestPulsarZIBinaryUpload(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.hd = HDAWG.ZI_HDAWG8(name='HD', server='emulator',
+                                 device='dev8026', interface='1GbE')
+        for i in range(8):
+            cls.hd.set('sigouts_{}_range'.format(i), 1.0)
+        cls.pulsar = ps.Pulsar('Pulsar')
+        cls.pulsar.define_awg_channels(cls.hd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pulsar.close()
+        cls.hd.close()
+
+    def setUp(self):
+        self.pulsar.zi_waveform_upload('binary')
+        self.pulsar.reuse_waveforms(False)
+        self.pulsar.incremental_upload(False)
+
+    def make_sequence(self, amplitudes):
+        seq = Sequence('test_sequence')
+        for s, amp in enumerate(amplitudes):
+            seq.add(Segment('seg{}'.format(s), [
+                drag_pulse('p{}'.format(i), amplitude=amp, phase=10 * i)
+                for i in range(2)]))
+        return seq
+
+    def uploaded_wave(self, index):
+        node = '/dev8026/awgs/0/waveform/waves/{}'.format(index)
+        return self.hd.daq.nodes[node]['value']
+
+    def test_binary_waveform(self):
+        analog = np.array([0., 0.5, -0.5, 1.])
+        data = ps._zi_binary_waveform([analog, None, None, None], 4)
+        np.testing.assert_array_equal(
+            data, [0, 0, 16383, 0, -16383, 0, 32767, 0])
+
+        marker = np.array([0, 1, 1, 0])
+        data = ps._zi_binary_waveform([None, None, analog, marker], 4)
+        self.assertEqual(data.dtype, np.int16)
+        np.testing.assert_array_equal(data[2::3], [0, 4, 4, 0])
+
+    def test_binary_upload(self):
+        seq = self.make_sequence([0.1, 0.2])
+        waveforms, awg_sequences = seq.generate_waveforms_sequences()
+        self.pulsar.program_awgs(seq)
+        for i, seg in enumerate(seq.segments.values()):
+            el = seg.elements_on_awg['HD'][0]
+            h1 = seg.calculate_hash(el, 'no_codeword', 'HD_ch1')
+            h2 = seg.calculate_hash(el, 'no_codeword', 'HD_ch2')
+            expected = ps._zi_binary_waveform(
+                [waveforms[h1], None, waveforms[h2], None],
+                len(waveforms[h1]))
+            np.testing.assert_array_equal(self.uploaded_wave(i), expected)
+
+    def test_skip_unchanged_compilation(self):
+        self.pulsar.program_awgs(self.make_sequence([0.1, 0.2]))
+        count = self.hd._awgModule.get_compilation_count(0)
+        seq = self.make_sequence([0.3, 0.4])
+        waveforms, _ = seq.generate_waveforms_sequences()
+        self.pulsar.program_awgs(seq)
+        self.assertEqual(self.hd._awgModule.get_compilation_count(0), count)
+        seg = seq.segments['seg1']
+        el = seg.elements_on_awg['HD'][0]
+        h = seg.calculate_hash(el, 'no_codeword', 'HD_ch1')
+        np.testing.assert_array_equal(
+            self.uploaded_wave(1)[::2],
+            (waveforms[h] * (2**15 - 1)).astype(np.int16))
+
+        # a different sequence structure requires a compilation
+        self.pulsar.program_awgs(self.make_sequence([0.3, 0.4, 0.5]))
+        self.assertEqual(self.hd._awgModule.get_compilation_count(0),
+                         count + 1)
+
+    def test_incremental_binary_upload(self):
+        self.pulsar.reuse_waveforms(True)
+        self.pulsar.program_awgs(self.make_sequence([0.1, 0.2]))
+        uploaded = []
+        setv = self.hd.setv
+        self.hd.setv = lambda path, value: (uploaded.append(path),
+                                            setv(path, value))
+        try:
+            # only the waveforms of the second segment change
+            self.pulsar.program_awgs(self.make_sequence([0.1, 0.3]))
+        finally:
+            del self.hd.setv
+        self.assertEqual(uploaded, ['awgs/0/waveform/waves/1'])
+
+    def test_skip_unchanged_awg(self):
+        self.pulsar.reuse_waveforms(True)
+        self.pulsar.incremental_upload(True)
+        self.pulsar.program_awgs(self.make_sequence([0.1, 0.2]))
+        self.assertFalse(self.pulsar.upload_stats['HD']['skipped'])
+        count = self.hd._awgModule.get_compilation_count(0)
+        uploaded = []
+        setv = self.hd.setv
+        self.hd.setv = lambda path, value: (uploaded.append(path),
+                                            setv(path, value))
+        try:
+            self.pulsar.program_awgs(self.make_sequence([0.1, 0.2]))
+            self.assertTrue(self.pulsar.upload_stats['HD']['skipped'])
+            self.assertIn('HD', self.pulsar.awgs_with_waveforms())
+            self.assertEqual(uploaded, [])
+
+            seq = self.make_sequence([0.1, 0.3])
+            self.pulsar.program_awgs(seq)
+        finally:
+            del self.hd.setv
+        self.assertEqual(self.hd._awgModule.get_compilation_count(0), count)
+        self.assertEqual(uploaded, ['awgs/0/waveform/waves/1'])
+        stats = self.pulsar.upload_stats['HD']
+        self.assertFalse(stats['skipped'])
+        self.assertEqual(stats['compilations'], 0)
+        self.assertEqual(stats['uploaded_waves'], 1)
+        self.assertEqual(stats['skipped_waves'], 1)
+        self.assertEqual(stats['uploaded_bytes'],
+                         self.uploaded_wave(1).nbytes)
+
+    def test_incremental_upload_compares_content(self):
+        # without reuse_waveforms, the hashes do not change with the
+        # waveforms and the content is compared
+        self.pulsar.incremental_upload(True)
+        self.pulsar.program_awgs(self.make_sequence([0.1, 0.2]))
+        uploaded = []
+        setv = self.hd.setv
+        self.hd.setv = lambda path, value: (uploaded.append(path),
+                                            setv(path, value))
+        try:
+            self.pulsar.program_awgs(self.make_sequence([0.1, 0.3]))
+        finally:
+            del self.hd.setv
+        self.assertFalse(self.pulsar.upload_stats['HD']['skipped'])
+        self.assertEqual(uploaded, ['awgs/0/waveform/waves/1'])
+
+    def test_incremental_csv_upload(self):
+        self.pulsar.zi_waveform_upload('csv')
+        self.pulsar.reuse_waveforms(True)
+        with tempfile.TemporaryDirectory() as wave_dir, \
+                mock.patch.object(ps, '_zi_wave_dir', lambda: wave_dir):
+            self.pulsar._zi_waves_cleared = False
+            self.pulsar.program_awgs(self.make_sequence([0.1, 0.2]))
+            mtimes = {f: os.stat(os.path.join(wave_dir, f)).st_mtime_ns
+                      for f in os.listdir(wave_dir)}
+            self.assertEqual(len(mtimes), 4)
+            # only the waveforms of the second segment change, the files of
+            # the old ones are removed
+            self.pulsar.program_awgs(self.make_sequence([0.1, 0.3]))
+            files = os.listdir(wave_dir)
+            self.assertEqual(len(files), 4)
+            self.assertEqual(len(self.pulsar._zi_written_waves), 4)
+            unchanged = [f for f in files if f in mtimes and
+                         os.stat(os.path.join(wave_dir, f)).st_mtime_ns
+                         == mtimes[f]]
+            self.assertEqual(len(unchanged), 2)
+        self.pulsar._zi_waves_cleared = False
+
+
+class TestPulsarParallelProgramming(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.hds = [HDAWG.ZI_HDAWG8(name='HD{}'.format(i), server='emulator',
+                                   device='dev80{}'.format(27 + i),
+                                   interface='1GbE') for i in range(2)]
+        cls.pulsar = ps.Pulsar('Pulsar')
+        for hd in cls.hds:
+            for i in range(8):
+                hd.set('sigouts_{}_range'.format(i), 1.0)
+            cls.pulsar.define_awg_channels(hd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pulsar.close()
+        for hd in cls.hds:
+            hd.close()
+
+    def setUp(self):
+        self.pulsar.zi_waveform_upload('binary')
+
+    def tearDown(self):
+        self.pulsar.parallel_programming(False)
+
+    def make_sequence(self, amplitude):
+        seq = Sequence('test_sequence')
+        for s in range(2):
+            seq.add(Segment('seg{}'.format(s), [
+                drag_pulse('p{}'.format(hd.name), amplitude=amplitude,
+                           I_channel='{}_ch1'.format(hd.name),
+                           Q_channel='{}_ch2'.format(hd.name),
+                           element_name='el{}'.format(hd.name),
+                           ref_point='start')
+                for hd in self.hds]))
+        return seq
+
+    def test_parallel_programming(self):
+        self.pulsar.program_awgs(self.make_sequence(0.1))
+        serial = [(hd.daq.nodes['/{}/awgs/0/waveform/waves/{}'.format(
+                       hd.devname, i)]['value'].copy(),
+                   hd.awgs_0_sequencer_program_crc32_hash())
+                  for hd in self.hds for i in range(2)]
+
+        self.pulsar.parallel_programming(True)
+        self.pulsar.program_awgs(self.make_sequence(0.2))
+        self.pulsar.program_awgs(self.make_sequence(0.1))
+        self.assertEqual(set(self.pulsar.awg_programming_times),
+                         {hd.name for hd in self.hds})
+        parallel = [(hd.daq.nodes['/{}/awgs/0/waveform/waves/{}'.format(
+                         hd.devname, i)]['value'],
+                     hd.awgs_0_sequencer_program_crc32_hash())
+                    for hd in self.hds for i in range(2)]
+        for (wf_s, crc_s), (wf_p, crc_p) in zip(serial, parallel):
+            np.testing.assert_array_equal(wf_s, wf_p)
+            self.assertEqual(crc_s, crc_p)
+
+
+class TestPulsarRenamedChannels(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.hd = HDAWG.ZI_HDAWG8(name='HD', server='emulator',
+                                 device='dev8029', interface='1GbE')
+        for i in range(8):
+            cls.hd.set('sigouts_{}_range'.format(i), 1.0)
+        cls.pulsar = ps.Pulsar('Pulsar')
+        cls.pulsar.define_awg_channels(
+            cls.hd, channel_name_map={'ch1': 'qb1_I', 'ch2': 'qb1_Q'})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pulsar.close()
+        cls.hd.close()
+
+    def make_sequence(self):
+        seq = Sequence('test_sequence')
+        seq.add(Segment('seg0', [drag_pulse('p0', I_channel='qb1_I',
+                                            Q_channel='qb1_Q')]))
+        return seq
+
+    def test_reprogram_on_channel_setting(self):
+        self.pulsar.zi_waveform_upload('binary')
+        self.pulsar.reuse_waveforms(True)
+        self.pulsar.incremental_upload(True)
+        self.pulsar.program_awgs(self.make_sequence())
+        self.pulsar.program_awgs(self.make_sequence())
+        self.assertTrue(self.pulsar.upload_stats['HD']['skipped'])
+        # the parameters of renamed channels do not start with the AWG name
+        self.pulsar.qb1_I_internal_modulation(True)
+        self.pulsar.program_awgs(self.make_sequence())
+        self.assertFalse(self.pulsar.upload_stats['HD']['skipped'])
+        self.pulsar.program_awgs(self.make_sequence())
+        self.assertTrue(self.pulsar.upload_stats['HD']['skipped'])
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 import pycqed as pq
 import numpy as np
 import qutip as qtp
@@ -157,4 +158,71 @@ class Test_rb_decomposition(unittest.TestCase):
                     x = gproduct.full()/gproduct.full()[0][0]
                     self.assertTrue(np.all((
                         np.allclose(np.real(x), np.eye(4)),
-                        np.allclose(np.imag(x), np.zeros(4)))))
\ No newline at end of file
+                        np.allclose(np.imag(x), np.zeros(4)))))
+
+    def test_recovery_batched_single_qubit_rb(self):
+        sequences = rb.randomized_benchmarking_sequences(
+            n_seeds=10, lengths=[0, 1, 50, 100], nr_parallel=3,
+            desired_net_cl=0)
+        for n_cl, cl_seqs in zip([0, 1, 50, 100], sequences):
+            self.assertEqual(cl_seqs.shape, (10, 3, n_cl + 1))
+            np.testing.assert_array_equal(
+                rb.calculate_net_cliffords(cl_seqs), 0)
+            for decomp in ['HZ', 'XY']:
+                pulses, mask = rb.decompose_clifford_seqs(
+                    cl_seqs, gate_decomp=decomp)
+                for cl_seq, pulse_keys, m in zip(
+                        cl_seqs.reshape(-1, n_cl + 1),
+                        pulses.reshape((-1, n_cl + 1, pulses.shape[-1])),
+                        mask.reshape((-1, n_cl + 1, mask.shape[-1]))):
+                    self.assertEqual(list(pulse_keys[m]),
+                                     rb.decompose_clifford_seq(
+                                         cl_seq, gate_decomp=decomp))
+
+                    gproduct = qtp.tensor(qtp.identity(2))
+                    for pk in pulse_keys[m]:
+                        gproduct = self.standard_pulses[pk]*gproduct
+
+                    x = gproduct.full()/gproduct.full()[0][0]
+                    self.assertTrue(np.all((
+                        np.allclose(np.real(x), np.eye(2)),
+                        np.allclose(np.imag(x), np.zeros(2)))))
+
+    def test_batched_rb_sequences_net_clifford(self):
+        for number_of_qubits in [1, 2]:
+            ptms = tqc.CLut.get_clifford_ptms(number_of_qubits)
+            sequences = rb.randomized_benchmarking_sequences(
+                n_seeds=5, lengths=[1, 7, 20], nr_parallel=2,
+                desired_net_cl=3, number_of_qubits=number_of_qubits,
+                interleaving_cl=2, seed=0)
+            for n_cl, cl_seqs in zip([1, 7, 20], sequences):
+                self.assertEqual(cl_seqs.shape, (5, 2, 2*n_cl + 1))
+                np.testing.assert_array_equal(cl_seqs[..., 1:-1:2], 2)
+                for cl_seq in cl_seqs.reshape(-1, 2*n_cl + 1):
+                    net_ptm = ptms[0]
+                    for idx in cl_seq:
+                        net_ptm = ptms[idx] @ net_ptm
+                    self.assertEqual(tqc.CLut(net_ptm), 3)
+            # same seed reproduces the sequences
+            for a, b in zip(sequences, rb.randomized_benchmarking_sequences(
+                    n_seeds=5, lengths=[1, 7, 20], nr_parallel=2,
+                    desired_net_cl=3, number_of_qubits=number_of_qubits,
+                    interleaving_cl=2, seed=0)):
+                np.testing.assert_array_equal(a, b)
+
+    def test_net_cliffords_two_qubit_chunks(self):
+        rng = np.random.RandomState(0)
+        ptms = tqc.CLut.get_clifford_ptms(2)
+        for n_cl in [1, 6, 7]:
+            cl_seqs = rng.randint(0, 11520, (3, 4, n_cl))
+            net_cliffords = rb.calculate_net_cliffords(cl_seqs, 2)
+            # one sequence per chunk
+            with mock.patch.object(rb, '_max_ptm_chunk_bytes', 1):
+                np.testing.assert_array_equal(
+                    rb.calculate_net_cliffords(cl_seqs, 2), net_cliffords)
+            for cl_seq, net_cl in zip(cl_seqs.reshape(-1, n_cl),
+                                      net_cliffords.ravel()):
+                net_ptm = ptms[0]
+                for idx in cl_seq:
+                    net_ptm = ptms[idx] @ net_ptm
+                self.assertEqual(tqc.CLut(net_ptm), net_cl)
@@ -0,0 +1,224 @@
+import os
+import tempfile
+import numpy as np
+from unittest import TestCase, mock
+
+from pycqed.instrument_drivers.virtual_instruments.virtual_AWG8 import \
+    VirtualAWG8
+import pycqed.measurement.waveform_control.pulsar as ps
+from pycqed.measurement.waveform_control import pulse_library as pl
+from pycqed.measurement.waveform_control.segment import Segment
+from pycqed.measurement.waveform_control.sequence import Sequence
+
+
+def drag_pulse(name, amplitude=0.1, phase=0, **kw):
+    pulse = {'name': name,
+             'pulse_type': 'SSB_DRAG_pulse',
+             'I_channel': 'AWG8_ch1',
+             'Q_channel': 'AWG8_ch2',
+             'amplitude': amplitude,
+             'sigma': 10e-9,
+             'nr_sigma': 4,
+             'mod_frequency': 100e6,
+             'phase': phase}
+    pulse.update(kw)
+    return pulse
+
+
+class TestSequence(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.awg = VirtualAWG8('AWG8')
+        for i in range(8):
+            cls.awg.set('sigouts_{}_range'.format(i), 1.0)
+        cls.pulsar = ps.Pulsar('Pulsar')
+        cls.pulsar.define_awg_channels(cls.awg)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pulsar.close()
+        cls.awg.close()
+
+    def setUp(self):
+        self.pulsar.reuse_waveforms(False)
+        self.pulsar.waveform_cache_dir(None)
+        self.pulsar.batch_pulse_rendering(False)
+        self.pulsar.AWGs_prequeried(True)
+
+    def tearDown(self):
+        self.pulsar.AWGs_prequeried(False)
+
+    def make_sequence(self, n_segments=3, n_pulses=4):
+        seq = Sequence('test_sequence')
+        for s in range(n_segments):
+            seq.add(Segment('seg{}'.format(s), [
+                drag_pulse('p{}'.format(i), amplitude=0.1 + 0.01 * s,
+                           phase=10 * i) for i in range(n_pulses)]))
+        return seq
+
+    def test_element_render_matches_channel_render(self):
+        seq = self.make_sequence()
+        waveforms, sequences = seq.generate_waveforms_sequences()
+        for seg in seq.segments.values():
+            for el in seg.elements_on_awg['AWG8']:
+                for ch in ['AWG8_ch1', 'AWG8_ch2']:
+                    wfs = seg.waveforms(awgs={'AWG8'}, elements={el},
+                                        channels={ch},
+                                        codewords={'no_codeword'})
+                    expected = wfs.popitem()[1].popitem()[1].popitem()[1]\
+                        .popitem()[1]
+                    h = seg.calculate_hash(el, 'no_codeword', ch)
+                    np.testing.assert_array_equal(waveforms[h], expected)
+
+    def test_waveform_cache_stats(self):
+        seq = self.make_sequence(n_segments=3)
+        seq.generate_waveforms_sequences()
+        stats = self.pulsar.waveform_cache_stats
+        self.assertEqual(stats['rendered_elements'], 3)
+        self.assertEqual(stats['misses'], 6)
+        self.assertEqual(stats['hits'], 0)
+
+        # identical segments share their waveforms when reusing waveforms
+        self.pulsar.reuse_waveforms(True)
+        seq = Sequence('test_sequence', [
+            Segment('seg{}'.format(s), [drag_pulse('p0')]) for s in range(3)])
+        waveforms, _ = seq.generate_waveforms_sequences()
+        stats = self.pulsar.waveform_cache_stats
+        self.assertEqual(len(waveforms), 2)
+        self.assertEqual(stats['rendered_elements'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hits'], 4)
+
+    def test_persistent_waveform_cache(self):
+        self.pulsar.reuse_waveforms(True)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.pulsar.waveform_cache_dir(cache_dir)
+            seq = self.make_sequence(n_segments=2)
+            waveforms, _ = seq.generate_waveforms_sequences()
+            stats = self.pulsar.waveform_cache_stats
+            self.assertEqual(stats['persistent_hits'], 0)
+            self.assertEqual(stats['misses'], 4)
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+
+            seq = self.make_sequence(n_segments=2)
+            cached_waveforms, _ = seq.generate_waveforms_sequences()
+            stats = self.pulsar.waveform_cache_stats
+            self.assertEqual(stats['persistent_hits'], 4)
+            self.assertEqual(stats['misses'], 0)
+            self.assertEqual(stats['rendered_elements'], 0)
+            for h, wf in waveforms.items():
+                np.testing.assert_array_equal(cached_waveforms[h], wf)
+            self.pulsar.waveform_cache_dir(None)
+            del cached_waveforms
+
+    def test_resolve_timing_multiple_references(self):
+        seg = Segment('seg', [
+            drag_pulse('p0'),
+            drag_pulse('p1', ref_pulse='p0', ref_point='start',
+                       pulse_delay=100e-9),
+            drag_pulse('p2', ref_pulse='p0'),
+            drag_pulse('p3', ref_pulse=['p1', 'p2'], ref_function='max'),
+            drag_pulse('p4', ref_pulse=['p1', 'p2'], ref_function='min',
+                       ref_point='start'),
+        ])
+        seg.resolve_timing()
+        length = seg.unresolved_pulses[0].pulse_obj.length
+        t0 = {p.pulse_obj.name: p.pulse_obj.algorithm_time()
+              for p in seg.unresolved_pulses}
+        self.assertAlmostEqual(t0['p1'], t0['p0'] + 100e-9)
+        self.assertAlmostEqual(t0['p2'], t0['p0'] + length)
+        self.assertAlmostEqual(t0['p3'], t0['p1'] + length)
+        self.assertAlmostEqual(t0['p4'], t0['p2'])
+        # unresolved pulses are ordered by their middle
+        self.assertEqual([p.pulse_obj.name for p in seg.unresolved_pulses],
+                         ['p0', 'p2', 'p4', 'p1', 'p3'])
+
+    def test_parallel_compilation(self):
+        self.pulsar.reuse_waveforms(True)
+        waveforms, sequences = self.make_sequence(
+            n_segments=4).generate_waveforms_sequences()
+        stats = dict(self.pulsar.waveform_cache_stats)
+        self.pulsar.parallel_compilation(True)
+        self.pulsar.compilation_processes(2)
+        try:
+            seq = self.make_sequence(n_segments=4)
+            par_waveforms, par_sequences = seq.generate_waveforms_sequences()
+        finally:
+            self.pulsar.parallel_compilation(False)
+            self.pulsar.compilation_processes(None)
+        self.assertEqual(self.pulsar.waveform_cache_stats, stats)
+        self.assertEqual(par_sequences, sequences)
+        self.assertEqual(set(par_waveforms), set(waveforms))
+        for h, wf in waveforms.items():
+            np.testing.assert_array_equal(par_waveforms[h], wf)
+        # the resolved segments are available in the calling process
+        for seg in seq.segments.values():
+            self.assertIs(seg.pulsar, self.pulsar)
+            self.assertIn('AWG8', seg.elements_on_awg)
+
+    def test_merge_shares_pulses(self):
+        seqs = [self.make_sequence(n_segments=2) for _ in range(3)]
+        merged = Sequence.merge(seqs, segment_limit=4)
+        self.assertEqual([s.n_segments() for s in merged], [4, 2])
+        self.assertEqual(list(merged[0].segments),
+                         ['seg0', 'seg1', 'seg0_copy_from_merge_1',
+                          'seg1_copy_from_merge_1'])
+        # the input sequences are unchanged
+        for seq in seqs:
+            self.assertEqual(list(seq.segments), ['seg0', 'seg1'])
+            self.assertEqual(seq.name, 'test_sequence')
+            for segname, seg in seq.segments.items():
+                self.assertEqual(seg.name, segname)
+        seg = merged[0].segments['seg0_copy_from_merge_1']
+        orig_seg = seqs[1].segments['seg0']
+        self.assertIsNot(seg, orig_seg)
+        self.assertIs(seg.unresolved_pulses[0].pulse_obj,
+                      orig_seg.unresolved_pulses[0].pulse_obj)
+
+        # resolving the merged sequence does not affect the inputs
+        waveforms, _ = merged[0].generate_waveforms_sequences()
+        self.assertEqual(orig_seg.elements, {})
+        self.assertEqual(orig_seg.elements_on_awg, {})
+        waveforms_orig, _ = seqs[1].generate_waveforms_sequences()
+        for segname, orig_seg in seqs[1].segments.items():
+            seg = merged[0].segments[segname + '_copy_from_merge_1']
+            self.assertEqual(seg.elements_on_awg, orig_seg.elements_on_awg)
+            for el in seg.elements_on_awg['AWG8']:
+                np.testing.assert_array_equal(
+                    waveforms[seg.calculate_hash(
+                        el, 'no_codeword', 'AWG8_ch1')],
+                    waveforms_orig[orig_seg.calculate_hash(
+                        el, 'no_codeword', 'AWG8_ch1')])
+
+    def test_batch_pulse_rendering(self):
+        pulses = [drag_pulse('p0')]
+        for i in range(1, 40):
+            # pulses are 4 modulation periods long, such that the phases of
+            # all pulses are equivalent
+            pulses.append(drag_pulse('p{}'.format(i), ref_pulse='p0',
+                                     amplitude=0.1 + 0.05 * (i % 2),
+                                     pulse_delay=40e-9 * (i - 1)))
+        pulses.append(drag_pulse('p_shifted', ref_pulse='p0',
+                                 pulse_delay=1e-9 / 7))
+        pulses.append(drag_pulse('p_unlocked', ref_pulse='p0',
+                                 phaselock=False, phase=45,
+                                 pulse_delay=15e-9))
+        seg = Segment('seg', pulses)
+        seg.resolve_segment()
+        seg.gen_elements_on_awg()
+        wfs = seg.waveforms()
+        self.pulsar.batch_pulse_rendering(True)
+        with mock.patch.object(pl.SSB_DRAG_pulse, 'chan_wf', autospec=True,
+                               side_effect=pl.SSB_DRAG_pulse.chan_wf) as cwf:
+            batched_wfs = seg.waveforms()
+        # two amplitudes, the shifted and the unlocked pulse on two channels
+        self.assertEqual(cwf.call_count, 8)
+        self.assertEqual(set(batched_wfs['AWG8']), set(wfs['AWG8']))
+        for el, el_wfs in wfs['AWG8'].items():
+            for cw, cw_wfs in el_wfs.items():
+                self.assertEqual(set(batched_wfs['AWG8'][el][cw]),
+                                 set(cw_wfs))
+                for chid, wf in cw_wfs.items():
+                    np.testing.assert_allclose(
+                        batched_wfs['AWG8'][el][cw][chid], wf, atol=1e-12)
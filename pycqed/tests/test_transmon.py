@@ -0,0 +1,52 @@
+import numpy as np
+from unittest import TestCase
+
+from pycqed.simulations import transmon
+
+
+class TestTransmon(TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.ec = rng.uniform(0.15, 0.35, 20)
+        self.ej = rng.uniform(10, 30, 20)
+        self.ng = rng.uniform(0, 1, 20)
+
+    def test_batched_levels(self):
+        levels = transmon.transmon_levels(self.ec, self.ej, self.ng)
+        self.assertEqual(levels.shape, (20, 30))
+        for lvls, ec, ej, ng in zip(levels, self.ec, self.ej, self.ng):
+            evals = np.linalg.eigvalsh(transmon.transmon_hamiltonian(
+                ec, ej, ng))
+            np.testing.assert_allclose(lvls, evals[1:] - evals[0],
+                                       rtol=1e-12, atol=1e-12)
+        # broadcasting
+        levels = transmon.transmon_levels(self.ec[:, None], self.ej[None, :])
+        self.assertEqual(levels.shape, (20, 20, 30))
+        np.testing.assert_allclose(
+            levels[3, 5], transmon.transmon_levels(self.ec[3], self.ej[5]),
+            rtol=1e-12)
+
+    def test_batched_inversion(self):
+        levels = transmon.transmon_levels(self.ec, self.ej, self.ng)
+        fge = levels[:, 0]
+        anh = levels[:, 1] - 2 * levels[:, 0]
+        ec, ej = transmon.transmon_ec_ej(fge, anh, self.ng)
+        np.testing.assert_allclose(ec, self.ec, rtol=1e-9)
+        np.testing.assert_allclose(ej, self.ej, rtol=1e-9)
+        ej, anh_calc = transmon.transmon_ej_anh(fge, self.ec, self.ng)
+        np.testing.assert_allclose(ej, self.ej, rtol=1e-9)
+        np.testing.assert_allclose(anh_calc, anh, rtol=1e-9)
+        ej, fge_calc = transmon.transmon_ej_fge(levels[:, 1] - fge, self.ec,
+                                                self.ng)
+        np.testing.assert_allclose(ej, self.ej, rtol=1e-9)
+        np.testing.assert_allclose(fge_calc, fge, rtol=1e-9)
+        # scalar arguments return scalars
+        ec, ej = transmon.transmon_ec_ej(fge[0], anh[0], self.ng[0])
+        self.assertTrue(np.isscalar(ec))
+        self.assertAlmostEqual(ej, self.ej[0])
+        # lists are accepted like arrays
+        ec, ej = transmon.transmon_ec_ej(list(fge[:2]), list(anh[:2]),
+                                         list(self.ng[:2]))
+        np.testing.assert_allclose(ec, self.ec[:2], rtol=1e-9)
+        np.testing.assert_allclose(ej, self.ej[:2], rtol=1e-9)
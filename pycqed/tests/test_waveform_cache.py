@@ -0,0 +1,57 @@
+import os
+import time
+import tempfile
+import numpy as np
+from unittest import TestCase
+
+from pycqed.measurement.waveform_control.waveform_cache import WaveformCache
+
+
+class TestWaveformCache(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = WaveformCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_put_get(self):
+        h = (160, 'ch1', 0.1, 2.4e9)
+        wf = np.linspace(0, 1, 160)
+        self.assertIsNone(self.cache.get(h))
+        self.cache.put(h, wf)
+        self.assertIn(h, self.cache)
+        np.testing.assert_array_equal(self.cache.get(h), wf)
+        # the cache persists across instances
+        cache = WaveformCache(self.tmp_dir.name)
+        np.testing.assert_array_equal(cache.get(h), wf)
+
+    def test_key_is_stable(self):
+        h = (160, 'ch1', ('SSB_DRAG_pulse', 1e-8))
+        self.assertEqual(WaveformCache.key(h), WaveformCache.key(tuple(h)))
+        self.assertNotEqual(WaveformCache.key(h),
+                            WaveformCache.key((161,) + h[1:]))
+
+    def test_lru_eviction(self):
+        wf = np.zeros(1000)
+        self.cache.put(0, wf)
+        wf_size = os.path.getsize(self.cache._path(0))
+        self.cache.max_size = 2.5 * wf_size
+        t = time.time()
+        os.utime(self.cache._path(0), (t - 20, t - 20))
+        self.cache.put(1, wf)
+        os.utime(self.cache._path(1), (t - 10, t - 10))
+        # accessing waveform 0 makes waveform 1 the least recently used one
+        self.cache.get(0)
+        self.cache.put(2, wf)
+        self.assertIn(0, self.cache)
+        self.assertNotIn(1, self.cache)
+        self.assertIn(2, self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_clear(self):
+        for i in range(3):
+            self.cache.put(i, np.ones(10))
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)